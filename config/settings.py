@@ -79,6 +79,20 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Матрица эмбеддингов курсов для /api/courses/<id>/similar/ (manage.py build_course_embeddings)
+COURSE_EMBEDDINGS_DIR = os.environ.get('COURSE_EMBEDDINGS_DIR', str(BASE_DIR / 'data' / 'course_embeddings'))
+
+# Онлайн-тегирование POST /api/tag/: процессов тегирования, размер пачки и ожидание её наполнения
+TAGGING_WORKERS = int(os.environ.get('TAGGING_WORKERS', 1))
+TAGGING_BATCH_SIZE = int(os.environ.get('TAGGING_BATCH_SIZE', 16))
+TAGGING_BATCH_WAIT_MS = float(os.environ.get('TAGGING_BATCH_WAIT_MS', 5))
+# Сколько секунд запрос ждёт теги (демон и очередь микробатчера вместе), дальше - 503
+TAGGING_TIMEOUT = float(os.environ.get('TAGGING_TIMEOUT', 10))
+# Прогревать тегировщик при старте приложения, а не на первом запросе
+TAGGING_WARM_UP = os.environ.get('TAGGING_WARM_UP', '0') == '1'
+# Сокет демона тегирования (recommendations/tagging_daemon.py); пусто - тегировать в процессе Django
+TAGGING_DAEMON_SOCKET = os.environ.get('TAGGING_DAEMON_SOCKET', '')
+
 AUTH_USER_MODEL = 'core.User'
 
 LOGIN_URL = '/login/'
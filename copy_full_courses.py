@@ -5,8 +5,13 @@
 """
 
 import os
+import sys
 import shutil
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "recommendations"))
+
+from json_stream import iter_json_records
+
 def copy_courses_file():
     """Копирует полный файл tagged_courses.json в папку recommendations"""
     
@@ -30,23 +35,28 @@ def copy_courses_file():
     file_size = os.path.getsize(source_file)
     print(f"   Размер: {file_size / 1024:.2f} KB")
     
-    # Проверяем JSON
+    # Проверяем JSON потоково: файл не загружается в память целиком
     try:
         import json
-        with open(source_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(f"   Количество курсов: {len(data)}")
-            print(f"\n✅ Файл валидный и готов к использованию!")
-            
-            # Показываем несколько примеров курсов
-            print(f"\n📚 Примеры курсов:")
-            for i, course in enumerate(data[:3]):
-                print(f"   {i+1}. {course['name']}")
-                print(f"      Категория: {course['tags']['direction']['name']}")
-                print(f"      Сложность: {course['tags']['difficulty']}")
-                print()
-            
-            return True
+        courses_count = 0
+        examples = []
+        for course in iter_json_records(source_file):
+            courses_count += 1
+            if len(examples) < 3:
+                examples.append(course)
+
+        print(f"   Количество курсов: {courses_count}")
+        print(f"\n✅ Файл валидный и готов к использованию!")
+
+        # Показываем несколько примеров курсов
+        print(f"\n📚 Примеры курсов:")
+        for i, course in enumerate(examples):
+            print(f"   {i+1}. {course['name']}")
+            print(f"      Категория: {course['tags']['direction']['name']}")
+            print(f"      Сложность: {course['tags']['difficulty']}")
+            print()
+
+        return True
             
     except json.JSONDecodeError as e:
         print(f"❌ Ошибка в JSON файле: {e}")
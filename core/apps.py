@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        if settings.TAGGING_WARM_UP:
+            import threading
+            from core.tagging import get_tagging_service
+            threading.Thread(target=get_tagging_service, name='tagging-warm-up', daemon=True).start()
@@ -0,0 +1,67 @@
+"""
+Эмбеддинги курсов для поиска похожих (хранилище из recommendations/course_embeddings.py)
+"""
+
+import hashlib
+import threading
+
+from django.conf import settings
+
+from core import tagging  # noqa: F401  (добавляет recommendations в sys.path)
+from course_embeddings import CourseEmbedder, EmbeddingStore
+
+_store = None
+_embedder = None
+_lock = threading.Lock()
+
+
+def course_text(course):
+    return f"{course.title or ''} {course.description or ''}"
+
+
+def text_hash(course):
+    """Хэш текста, по которому строится вектор курса; по нему build_course_embeddings находит изменённые курсы"""
+    return hashlib.sha256(course_text(course).encode('utf-8')).hexdigest()
+
+
+def get_store():
+    """Общее на процесс хранилище векторов"""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = EmbeddingStore(settings.COURSE_EMBEDDINGS_DIR)
+    return _store
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                _embedder = CourseEmbedder()
+    return _embedder
+
+
+def update_course_vector(course):
+    """
+    Пересчитать вектор одного курса (по текущей статистике IDF хранилища)
+    Загружает модели Natasha, поэтому вызывается из manage.py build_course_embeddings, а не из веб-запросов
+    """
+    store, embedder = get_store(), get_embedder()
+    lemmas = embedder.lemmas(course_text(course))
+    documents, document_frequency = store.idf_stats(lemmas)
+    store.upsert(course.id, embedder.vector(lemmas, documents + 1, document_frequency), lemmas, text_hash(course))
+
+
+def remove_course_vector(course_id):
+    get_store().remove(course_id)
+
+
+def is_indexed(course_id):
+    return course_id in get_store()
+
+
+def similar_course_ids(course, k=10):
+    """[(id, похожесть)] ближайших курсов; для курса без вектора - пустой список (запись и модели не трогаются)"""
+    return get_store().most_similar(course.id, k)
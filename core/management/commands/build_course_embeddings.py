@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from core.models import Course
+from core.embeddings import (get_store, get_embedder, course_text, text_hash, update_course_vector,
+                             remove_course_vector)
+
+
+class Command(BaseCommand):
+    help = ('Обновляет эмбеддинги курсов (для /api/courses/<id>/similar/): пересчитываются только новые '
+            'и изменённые с прошлого запуска курсы, векторы удалённых убираются; '
+            'с --force матрица пересобирается целиком, с --course обновляются только указанные курсы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Строк, читаемых из базы за раз')
+        parser.add_argument('--course', type=int, action='append', dest='course_ids',
+                            help='id курса для инкрементального обновления (можно несколько раз)')
+        parser.add_argument('--force', action='store_true', help='Пересобрать векторы всех курсов')
+
+    def handle(self, *args, **options):
+        if options['course_ids']:
+            self._update(options['course_ids'])
+            return
+
+        courses = Course.objects.only('id', 'title', 'description').order_by('pk')
+        courses = courses.iterator(chunk_size=options['chunk_size'])
+
+        # Хэшей нет у пустого хранилища и у хранилища старого формата: тогда нужна полная сборка
+        known = get_store().content_hashes()
+        if options['force'] or not known:
+            self._rebuild(courses)
+        else:
+            self._sync(courses, known)
+
+    def _rebuild(self, courses):
+        """Полная пересборка: статистика IDF считается заново по всем курсам"""
+        embedder = get_embedder()
+        items = []
+        hashes = {}
+        for i, course in enumerate(courses, 1):
+            items.append((course.id, embedder.lemmas(course_text(course))))
+            hashes[course.id] = text_hash(course)
+            if i % 1000 == 0:
+                self.stdout.write(f'  обработано {i} курсов...')
+
+        get_store().rebuild(items, embedder, hashes)
+        self.stdout.write(self.style.SUCCESS(f'Векторы построены для {len(items)} курсов'))
+
+    def _sync(self, courses, known):
+        """Пересчитать векторы курсов, у которых изменился текст, и убрать векторы удалённых курсов"""
+        updated = skipped = 0
+        for course in courses:
+            if known.pop(course.id, None) == text_hash(course):
+                skipped += 1
+                continue
+
+            update_course_vector(course)
+            updated += 1
+            if updated % 1000 == 0:
+                self.stdout.write(f'  обновлено {updated} курсов...')
+
+        # В known остались курсы, которых больше нет в базе
+        for course_id in known:
+            remove_course_vector(course_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено курсов: {updated}, без изменений: {skipped}, удалено: {len(known)}'
+        ))
+
+    def _update(self, course_ids):
+        """Обновить векторы курсов; векторы удалённых из базы курсов убираются"""
+        courses = Course.objects.only('id', 'title', 'description').in_bulk(course_ids)
+        for course_id in course_ids:
+            if course_id in courses:
+                update_course_vector(courses[course_id])
+            else:
+                remove_course_vector(course_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено курсов: {len(courses)}, удалено: {len(set(course_ids) - set(courses))}'
+        ))
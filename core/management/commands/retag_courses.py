@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Course
+from core.tagging import tags_to_json, TAG_FIELDS, tagging_pool, tag_courses, tags_hash, tag_fields
+
+
+class Command(BaseCommand):
+    help = 'Перетегирует курсы в базе (только изменённые с прошлого запуска или после обновления словарей)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Курсов в одном bulk_update')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Строк, читаемых из базы за раз')
+        parser.add_argument('--workers', type=int, default=1, help='Процессов для тегирования')
+        parser.add_argument('--force', action='store_true', help='Перетегировать все курсы')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fingerprint = tags_to_json.dictionaries_fingerprint()
+
+        courses = Course.objects.only('id', 'title', 'description', 'tags_hash').order_by('pk')
+
+        self.updated = 0
+        skipped = 0
+        pending = []
+
+        with tagging_pool(options['workers']) as pool:
+            for course in courses.iterator(chunk_size=options['chunk_size']):
+                new_hash = tags_hash(course.title, course.description, fingerprint)
+                if course.tags_hash == new_hash and not options['force']:
+                    skipped += 1
+                    continue
+
+                pending.append((course, new_hash))
+                if len(pending) >= batch_size:
+                    self._flush(pool, pending)
+                    pending = []
+
+            if pending:
+                self._flush(pool, pending)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Перетегировано курсов: {self.updated}, без изменений: {skipped}'
+        ))
+
+    def _flush(self, pool, pending):
+        """Протегировать пачку и записать её одним bulk_update"""
+        results = tag_courses(pool, [(course.title, course.description) for course, _ in pending])
+
+        changed = []
+        for (course, new_hash), tags in zip(pending, results):
+            for field, value in tag_fields(tags).items():
+                setattr(course, field, value)
+            course.tags_hash = new_hash
+            changed.append(course)
+
+        with transaction.atomic():
+            Course.objects.bulk_update(changed, TAG_FIELDS + ['tags_hash'], batch_size=len(changed))
+
+        self.updated += len(changed)
+        self.stdout.write(f'  записано {self.updated} курсов...')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_trajectorycourse_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='tags_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
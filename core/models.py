@@ -28,6 +28,8 @@ class Course(models.Model):
     thematic_tags = models.JSONField(default=list, blank=True, null=True)
     categories_tags = models.JSONField(default=list, blank=True, null=True)
     attributes = models.JSONField(default=list, blank=True, null=True)
+    # Хэш входов тегирования (текст + словари), по нему retag_courses пропускает неизменённые курсы
+    tags_hash = models.CharField(max_length=64, blank=True, default='')
     
     created_at = models.DateTimeField(auto_now_add=True)
     
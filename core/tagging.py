@@ -0,0 +1,172 @@
+"""
+Связка Django-моделей с тегировщиком из recommendations/tags_to_json.py
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+
+RECOMMENDATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recommendations')
+if RECOMMENDATIONS_DIR not in sys.path:
+    sys.path.insert(0, RECOMMENDATIONS_DIR)
+
+import tags_to_json  # noqa: E402
+from lemma_cache import DEFAULT_LEMMA_CACHE_SIZE  # noqa: E402
+from micro_batcher import MicroBatcher  # noqa: E402
+from parallel import TaggingPool, DEFAULT_CHUNK_SIZE  # noqa: E402
+from tag_cache import content_hash  # noqa: E402
+from tagging_client import TaggingClient, TaggingClientError  # noqa: E402
+
+# Поля Course, которые заполняет тегировщик
+TAG_FIELDS = ['area', 'thematic_tags', 'categories_tags', 'attributes', 'difficulty']
+
+# Уровни тегировщика -> значения Course.difficulty
+DIFFICULTY_MAP = {
+    'начальный': 'beginner',
+    'средний': 'intermediate',
+    'продвинутый': 'advanced',
+}
+
+def course_input(title, description):
+    """Курс в формате входа тегировщика"""
+    return {'name': title or '', 'description': description or ''}
+
+
+def tags_hash(title, description, dictionaries_fingerprint):
+    """Хэш входов тегирования: меняется при изменении текста курса или словарей"""
+    payload = f"{dictionaries_fingerprint}:{content_hash(course_input(title, description))}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def tag_fields(tags):
+    """Результат generate_tags -> значения полей Course"""
+    return {
+        'area': tags['area'],
+        'thematic_tags': tags['thematic_tags'],
+        'categories_tags': tags['categories'],
+        'attributes': tags['attributes'],
+        'difficulty': DIFFICULTY_MAP.get(tags['difficulty'], 'intermediate'),
+    }
+
+
+def tagging_pool(workers=1):
+    """Пул тегирования tags_to_json (workers=1 - в текущем процессе)"""
+    worker_args = (None, DEFAULT_LEMMA_CACHE_SIZE)
+    return TaggingPool(workers, tags_to_json._init_tagging_worker, worker_args, DEFAULT_CHUNK_SIZE)
+
+
+def tag_courses(pool, courses):
+    """Теги для пачки (title, description) в исходном порядке; через демон, если он запущен с теми же словарями"""
+    inputs = [course_input(title, description) for title, description in courses]
+    client = get_daemon_client()
+    if client is not None:
+        try:
+            if daemon_dictionaries_match(client):
+                return client.tag_courses(inputs)
+        except (TaggingClientError, KeyError, TypeError):
+            # Демон недоступен, вернул ошибку или ответ неожиданного вида - размечаем локально
+            forget_daemon_check()
+    return pool.imap(tags_to_json._tag_course, inputs)
+
+
+# --- Демон тегирования (recommendations/tagging_daemon.py) ---
+_daemon_client = None
+_daemon_check = None  # (клиент, время проверки, словари совпали)
+
+# Как долго доверять проверке отпечатков словарей демона, секунды
+DAEMON_CHECK_TTL = 60
+
+
+def get_daemon_client():
+    """Общий на процесс клиент демона или None, если демон не настроен"""
+    global _daemon_client
+    from django.conf import settings
+
+    if not settings.TAGGING_DAEMON_SOCKET:
+        return None
+    if _daemon_client is None:
+        _daemon_client = TaggingClient(settings.TAGGING_DAEMON_SOCKET)
+    return _daemon_client
+
+
+def daemon_dictionaries_match(client, timeout=None):
+    """
+    Демон запущен с теми же словарями tags_to_json, что и Django (теги и их хэши считаются по локальным словарям)
+    Ответ ping кэшируется на DAEMON_CHECK_TTL секунд; ошибки клиента и ответ неожиданного вида не перехватываются
+    """
+    global _daemon_check
+    now = time.monotonic()
+    check = _daemon_check
+    if check is not None and check[0] is client and now - check[1] < DAEMON_CHECK_TTL:
+        return check[2]
+
+    fingerprints = client.ping(timeout)['fingerprints']
+    matches = fingerprints['tags_to_json'] == tags_to_json.dictionaries_fingerprint()
+    _daemon_check = (client, now, matches)
+    return matches
+
+
+def forget_daemon_check():
+    """Сбросить кэш проверки: демон мог перезапуститься с другими словарями"""
+    global _daemon_check
+    _daemon_check = None
+
+
+# --- Онлайн-тегирование (POST /api/tag/) ---
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_tagging_service():
+    """
+    Общий на процесс микробатчер над прогретым пулом тегирования
+    Одновременные запросы собираются в пачки, пачка размечается одним проходом морфологического теггера
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from django.conf import settings
+
+                workers = settings.TAGGING_WORKERS
+                pool = tagging_pool(workers)
+                # Прогрев: модели, словари и генератор загружаются до первого запроса
+                pool.apply(tags_to_json._tag_course_batch, [course_input('', '')])
+                _service = MicroBatcher(
+                    lambda batch: pool.apply(tags_to_json._tag_course_batch, batch),
+                    max_batch_size=settings.TAGGING_BATCH_SIZE,
+                    max_wait=settings.TAGGING_BATCH_WAIT_MS / 1000,
+                    threads=workers
+                )
+    return _service
+
+
+def _remaining(deadline):
+    """Секунд до deadline; время вышло - TimeoutError"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Тегирование не уложилось в TAGGING_TIMEOUT")
+    return remaining
+
+
+def tag_course_online(title, description):
+    """
+    Результат generate_tags для одного курса: через демон тегирования, а если он не настроен
+    или недоступен - через микробатчер в текущем процессе
+    На всё вместе уходит не больше settings.TAGGING_TIMEOUT секунд, иначе TimeoutError
+    """
+    from django.conf import settings
+
+    deadline = time.monotonic() + settings.TAGGING_TIMEOUT
+    client = get_daemon_client()
+    if client is not None:
+        try:
+            if daemon_dictionaries_match(client, settings.TAGGING_TIMEOUT):
+                return client.tag_courses([course_input(title, description)], timeout=_remaining(deadline))[0]
+        except (TaggingClientError, IndexError, KeyError, TypeError):
+            # Демон недоступен, вернул ошибку или ответ неожиданного вида - размечаем локально
+            forget_daemon_check()
+    return get_tagging_service().process(course_input(title, description), timeout=_remaining(deadline))
+
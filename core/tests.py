@@ -0,0 +1,250 @@
+import io
+import json
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import embeddings, tagging
+import tags_to_json
+from tagging_client import DaemonUnavailable
+from .models import Course, User
+
+
+class ApiTagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='pass')
+        self.client.force_login(self.user)
+        self.url = reverse('api_tag')
+
+    def post(self, body):
+        return self.client.post(self.url, data=body, content_type='application/json')
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.post(json.dumps({'title': 'Python'}))
+        self.assertEqual(response.status_code, 302)
+
+    def test_post_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_invalid_bodies(self):
+        bodies = [
+            'не json',
+            json.dumps([1, 2]),
+            json.dumps('строка'),
+            json.dumps({'title': 1}),
+            json.dumps({'title': 'Python', 'description': ['список']}),
+            json.dumps({}),
+            json.dumps({'title': '', 'description': None}),
+        ]
+        with mock.patch('core.tagging.tag_course_online') as tag_course_online:
+            for body in bodies:
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400, body)
+                self.assertIn('error', response.json())
+        tag_course_online.assert_not_called()
+
+    def test_tags_course(self):
+        result = {'title': 'Python', 'tags': ['python'], 'direction': '09.04.01'}
+        with mock.patch('core.tagging.tag_course_online', return_value=result) as tag_course_online:
+            response = self.post(json.dumps({'title': 'Python', 'description': None}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), result)
+        tag_course_online.assert_called_once_with('Python', '')
+
+    def test_timeout(self):
+        with mock.patch('core.tagging.tag_course_online', side_effect=TimeoutError):
+            response = self.post(json.dumps({'title': 'Python'}))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('error', response.json())
+
+
+@override_settings(TAGGING_TIMEOUT=2)
+class TagCourseOnlineTests(TestCase):
+    def setUp(self):
+        tagging.forget_daemon_check()
+        self.addCleanup(tagging.forget_daemon_check)
+        self.client_mock = mock.Mock()
+        self.client_mock.ping.return_value = {'fingerprints': {'tags_to_json': tags_to_json.dictionaries_fingerprint()}}
+        self.client_mock.tag_courses.return_value = [{'title': 'демон'}]
+        self.service = mock.Mock()
+        self.service.process.return_value = {'title': 'локально'}
+
+    def tag(self):
+        with mock.patch('core.tagging.get_daemon_client', return_value=self.client_mock), \
+                mock.patch('core.tagging.get_tagging_service', return_value=self.service):
+            return tagging.tag_course_online('Python', '')
+
+    def test_daemon_with_same_dictionaries(self):
+        self.assertEqual(self.tag(), {'title': 'демон'})
+        self.assertEqual(self.tag(), {'title': 'демон'})
+        # Проверка отпечатков кэшируется
+        self.client_mock.ping.assert_called_once()
+        self.assertTrue(0 < self.client_mock.tag_courses.call_args.kwargs['timeout'] <= 2)
+        self.service.process.assert_not_called()
+
+    def test_daemon_with_other_dictionaries(self):
+        self.client_mock.ping.return_value = {'fingerprints': {'tags_to_json': 'старые словари'}}
+        self.assertEqual(self.tag(), {'title': 'локально'})
+        self.client_mock.tag_courses.assert_not_called()
+
+    def test_daemon_down_falls_back_within_timeout(self):
+        self.client_mock.tag_courses.side_effect = DaemonUnavailable('нет демона')
+        self.assertEqual(self.tag(), {'title': 'локально'})
+        self.assertTrue(0 < self.service.process.call_args.kwargs['timeout'] <= 2)
+
+        # После ошибки отпечатки проверяются заново
+        self.tag()
+        self.assertEqual(self.client_mock.ping.call_count, 2)
+
+    def test_service_timeout(self):
+        service = mock.Mock()
+        service.process.side_effect = TimeoutError
+        with mock.patch('core.tagging.get_daemon_client', return_value=None), \
+                mock.patch('core.tagging.get_tagging_service', return_value=service):
+            self.assertRaises(TimeoutError, tagging.tag_course_online, 'Python', '')
+
+
+class FakeEmbedder:
+    """Эмбеддер без моделей Natasha: леммы - слова текста, вектор зависит только от лемм"""
+    dim = 300
+
+    def __init__(self):
+        self.texts = []
+
+    def lemmas(self, text):
+        self.texts.append(text)
+        return text.lower().split()
+
+    def vector(self, lemmas, documents, document_frequency):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for lemma in lemmas:
+            vector[sum(map(ord, lemma)) % self.dim] += 1
+        return vector / (np.linalg.norm(vector) or 1)
+
+
+class BuildCourseEmbeddingsTests(TestCase):
+    def setUp(self):
+        self.courses = [
+            Course.objects.create(title=f'Курс {i}', description=f'Описание {i}', category='it', moodle_id=f'm{i}')
+            for i in range(3)
+        ]
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(COURSE_EMBEDDINGS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        embeddings._store = None
+        self.addCleanup(setattr, embeddings, '_store', None)
+
+        self.embedder = FakeEmbedder()
+        patcher = mock.patch('core.embeddings._embedder', self.embedder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def build(self, *args):
+        self.embedder.texts = []
+        call_command('build_course_embeddings', *args, stdout=io.StringIO())
+        return sorted(self.embedder.texts)
+
+    def test_only_changed_courses(self):
+        first, second, third = self.courses
+        self.assertEqual(len(self.build()), 3)
+        store = embeddings.get_store()
+        self.assertTrue(all(course.id in store for course in self.courses))
+
+        # Повторный запуск без изменений ничего не пересчитывает
+        self.assertEqual(self.build(), [])
+
+        first.description = 'Новое описание'
+        first.save()
+        added = Course.objects.create(title='Новый курс', description='', category='it', moodle_id='m9')
+        third.delete()
+        self.assertEqual(self.build(), sorted([embeddings.course_text(first), embeddings.course_text(added)]))
+        self.assertIn(added.id, store)
+        self.assertNotIn(third.id, store)
+        self.assertEqual(set(store.content_hashes()), {first.id, second.id, added.id})
+        self.assertEqual(store.content_hashes()[first.id], embeddings.text_hash(first))
+
+    def test_force(self):
+        self.build()
+        self.assertEqual(len(self.build('--force')), 3)
+
+    def test_store_without_hashes(self):
+        # Векторы, записанные без хэша текста, пересчитываются
+        store = embeddings.get_store()
+        store.upsert(self.courses[0].id, self.embedder.vector(['курс'], 1, {}), ['курс'])
+        self.assertEqual(len(self.build()), 3)
+        self.assertEqual(self.build(), [])
+
+
+class ApiSimilarCoursesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='pass')
+        self.client.force_login(self.user)
+        self.courses = [
+            Course.objects.create(title=f'Курс {i}', description='', category='it', moodle_id=f'm{i}')
+            for i in range(4)
+        ]
+
+        # Отдельное хранилище векторов на тест
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(COURSE_EMBEDDINGS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        embeddings._store = None
+        self.addCleanup(setattr, embeddings, '_store', None)
+        self.store = embeddings.get_store()
+
+    def get(self, course, **params):
+        return self.client.get(reverse('api_similar_courses', args=[course.id]), params)
+
+    def index(self, course, values):
+        """Положить в хранилище нормированный вектор курса"""
+        vector = np.zeros(self.store.dim, dtype=np.float32)
+        vector[:len(values)] = values
+        self.store.upsert(course.id, vector / np.linalg.norm(vector), ['курс'])
+
+    def test_not_indexed(self):
+        with mock.patch('core.embeddings.get_embedder') as get_embedder:
+            response = self.get(self.courses[0])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['course_id'], self.courses[0].id)
+        # GET не считает векторы и ничего не пишет в хранилище
+        get_embedder.assert_not_called()
+        self.assertNotIn(self.courses[0].id, self.store)
+
+    def test_unknown_course(self):
+        response = self.client.get(reverse('api_similar_courses', args=[10 ** 6]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_similar(self):
+        first, second, third, _ = self.courses
+        self.index(first, [1, 0])
+        self.index(second, [1, 1])
+        self.index(third, [0, 1])
+
+        response = self.get(first)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['course_id'], first.id)
+        self.assertEqual([item['id'] for item in data['similar']], [second.id, third.id])
+        self.assertEqual(data['similar'][0]['title'], second.title)
+        self.assertAlmostEqual(data['similar'][0]['score'], round(float(np.sqrt(0.5)), 4))
+
+        self.assertEqual([item['id'] for item in self.get(first, k=1).json()['similar']], [second.id])
+        self.assertEqual(len(self.get(first, k='abc').json()['similar']), 2)
+
+    def test_deleted_course_skipped(self):
+        first, second, third, _ = self.courses
+        self.index(first, [1, 0])
+        self.index(second, [1, 1])
+        self.index(third, [0, 1])
+        second.delete()
+        self.assertEqual([item['id'] for item in self.get(first).json()['similar']], [third.id])
@@ -20,4 +20,6 @@ urlpatterns = [
     path('trajectory/save/', views.save_trajectory, name='save_trajectory'),
     
     path('api/courses/', views.api_courses, name='api_courses'),
+    path('api/courses/<int:course_id>/similar/', views.api_similar_courses, name='api_similar_courses'),
+    path('api/tag/', views.api_tag, name='api_tag'),
 ]
\ No newline at end of file
@@ -119,6 +119,55 @@ def api_courses(request):
     } for c in courses]
     return JsonResponse({'courses': data})
 
+@login_required
+@require_http_methods(["POST"])
+def api_tag(request):
+    from .tagging import tag_course_online
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Некорректный JSON'}, status=400)
+
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Ожидается JSON-объект'}, status=400)
+    title = data.get('title') or ''
+    description = data.get('description') or ''
+    if not isinstance(title, str) or not isinstance(description, str):
+        return JsonResponse({'error': 'title и description должны быть строками'}, status=400)
+    if not title and not description:
+        return JsonResponse({'error': 'Нужны title или description'}, status=400)
+
+    try:
+        return JsonResponse(tag_course_online(title, description))
+    except TimeoutError:
+        return JsonResponse({'error': 'Тегировщик перегружен, повторите запрос позже'}, status=503)
+
+@login_required
+def api_similar_courses(request, course_id):
+    from .embeddings import is_indexed, similar_course_ids
+
+    course = get_object_or_404(Course, id=course_id)
+    if not is_indexed(course.id):
+        return JsonResponse({
+            'error': 'Курс ещё не проиндексирован (manage.py build_course_embeddings)',
+            'course_id': course.id,
+        }, status=404)
+    try:
+        k = min(max(int(request.GET.get('k', 10)), 1), 50)
+    except ValueError:
+        k = 10
+
+    similar = similar_course_ids(course, k)
+    courses = Course.objects.in_bulk([similar_id for similar_id, _ in similar])
+    data = [{
+        'id': similar_id,
+        'title': courses[similar_id].title,
+        'category': courses[similar_id].category,
+        'score': round(score, 4),
+    } for similar_id, score in similar if similar_id in courses]
+    return JsonResponse({'course_id': course.id, 'similar': data})
+
 @login_required
 def trajectory_editor_view(request, trajectory_id=None):
     if trajectory_id:
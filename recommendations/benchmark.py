@@ -0,0 +1,305 @@
+"""
+Бенчмарк тегировщиков на синтетических каталогах курсов
+Каталог генерируется из словаря courses.json и skill_tree.json, результаты сохраняются в JSON для сравнения между коммитами
+
+    python benchmark.py --sizes 100 1000 --output bench.json
+    python benchmark.py --sizes 1000 --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource  # Нет на Windows
+except ImportError:
+    resource = None
+
+COURSES_FILE = "courses.json"
+SKILL_TREE_FILE = os.path.join("grade_system", "skill_tree.json")
+TAGGERS = ("tags", "tags_to_json")
+
+# Порог замедления при сравнении с прошлым запуском
+SLOWDOWN_THRESHOLD = 0.10
+
+TITLE_TEMPLATES = {
+    "ru": ["{skill}", "{skill} для начинающих", "{skill}: продвинутый курс", "Основы {skill_lower}",
+           "{skill} на практике", "Введение в {skill_lower}", "{skill} и {other_lower}"],
+    "en": ["{skill}", "{skill} for beginners", "Advanced {skill}", "Introduction to {skill}",
+           "Practical {skill}", "{skill} and {other}"],
+}
+DESCRIPTION_TEMPLATES = {
+    "ru": ["Научитесь работать с {skill_lower}.", "Освоите {skill_lower} и {other_lower}.",
+           "Курс подходит для начинающих, опыт не требуется.", "Требуется опыт работы с {other_lower}.",
+           "Много практических заданий и проектов.", "Разберём теорию и концепции {skill_lower}."],
+    "en": ["Learn {skill} from scratch.", "Hands-on projects with {skill} and {other}.",
+           "No prior experience required.", "Requires solid knowledge of {other}.",
+           "Covers theory and best practices."],
+}
+
+
+# --- Генератор каталога ---
+class CatalogGenerator:
+    """Синтетические курсы из словаря реального каталога и дерева навыков"""
+
+    def __init__(self, courses_file: str = COURSES_FILE, skill_tree_file: str = SKILL_TREE_FILE, seed: int = 42):
+        with open(courses_file, 'r', encoding='utf-8') as f:
+            courses = json.load(f)
+        with open(skill_tree_file, 'r', encoding='utf-8') as f:
+            skill_tree = json.load(f).get('skills_tree', {})
+
+        self.random = random.Random(seed)
+        self.skills: List[str] = []
+        self._collect_skills(skill_tree.values())
+
+        # Предложения реальных описаний и слова, разделённые по языку
+        self.sentences: List[str] = []
+        words = set()
+        for course in courses:
+            self.sentences.extend(s.strip() for s in re.split(r'(?<=[.!?])\s+', course.get('description', '')) if s.strip())
+            words.update(re.findall(r'\w+', f"{course.get('name', '')} {course.get('description', '')}"))
+
+        self.latin_terms = sorted({w for w in words if re.fullmatch(r'[A-Za-z][A-Za-z0-9+#]*', w)})
+        self.latin_skills = [s for s in self.skills if re.search(r'[A-Za-z]', s)] or self.latin_terms
+
+    def _collect_skills(self, nodes):
+        for node in nodes:
+            if node.get('name'):
+                self.skills.append(node['name'])
+            self._collect_skills(node.get('children', {}).values())
+
+    def _fill(self, template: str, skills: List[str]) -> str:
+        skill, other = self.random.choice(skills), self.random.choice(skills)
+        return template.format(skill=skill, other=other, skill_lower=skill.lower(), other_lower=other.lower())
+
+    def course(self, index: int, lang: str) -> Dict:
+        if lang == "mixed":
+            lang = self.random.choice(("ru", "en"))
+        skills = self.skills if lang == "ru" else self.latin_skills
+
+        name = self._fill(self.random.choice(TITLE_TEMPLATES[lang]), skills)
+        parts = [self._fill(self.random.choice(DESCRIPTION_TEMPLATES[lang]), skills)
+                 for _ in range(self.random.randint(1, 3))]
+        if lang == "ru" and self.sentences:
+            parts.extend(self.random.sample(self.sentences, min(len(self.sentences), self.random.randint(1, 3))))
+        elif self.latin_terms:
+            parts.append("Tools: " + ", ".join(self.random.sample(self.latin_terms, min(len(self.latin_terms), 4))) + ".")
+        self.random.shuffle(parts)
+
+        return {
+            'id': index,
+            'name': name,
+            'description': " ".join(parts),
+            'url': f"https://example.com/courses/{index}"
+        }
+
+    def catalog(self, size: int, lang: str = "mixed") -> List[Dict]:
+        return [self.course(i, lang) for i in range(1, size + 1)]
+
+
+# --- Замеры ---
+class StageTimer:
+    """Собирает длительности этапов, оборачивая методы генератора тегов"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, obj, method: str, stage: Optional[str] = None):
+        func = getattr(obj, method)
+        samples = self.samples[stage or method]
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+        setattr(obj, method, timed)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {stage: latency_stats(samples) for stage, samples in self.samples.items()}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Перцентили задержки в миллисекундах"""
+    values = sorted(samples)
+    return {
+        'count': len(values),
+        'mean_ms': (sum(values) / len(values) * 1000) if values else 0.0,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': (values[-1] * 1000) if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковое потребление памяти процессом (None, если не поддерживается)
+    ru_maxrss только растёт, поэтому каждый замер запускается в отдельном процессе (run_isolated)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS - байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _tags_runner(timer: StageTimer, skill_tree_file: str) -> Callable[[Dict], Dict]:
+    import tags
+
+    generator = tags.CourseTagGenerator(tags.SkillTreeProcessor(skill_tree_file))
+    for method in ("determine_direction", "extract_competencies", "determine_difficulty"):
+        timer.wrap(generator, method)
+    return generator.generate_tags
+
+
+def _tags_to_json_runner(timer: StageTimer, skill_tree_file: str) -> Callable[[Dict], Dict]:
+    import tags_to_json
+    from nlp_models import warm_up
+
+    warm_up()
+    generator = tags_to_json.CourseTagGenerator()
+    # Разбор Natasha ленивый, поэтому его время входит и в тот determine_*, который вызвал его первым
+    timer.wrap(generator, "analyze_text", "natasha")
+    for method in ("determine_area", "determine_thematic_tags", "determine_categories",
+                   "determine_attributes", "determine_difficulty"):
+        timer.wrap(generator, method)
+    return lambda course: generator.generate_tags(course['name'], course['description'])
+
+
+RUNNERS = {
+    "tags": _tags_runner,
+    "tags_to_json": _tags_to_json_runner,
+}
+
+
+def run_benchmark(tagger: str, catalog: List[Dict], skill_tree_file: str = SKILL_TREE_FILE) -> Dict:
+    """Протегировать каталог одним тегировщиком и собрать метрики"""
+    timer = StageTimer()
+
+    started = time.perf_counter()
+    tag = RUNNERS[tagger](timer, skill_tree_file)
+    startup = time.perf_counter() - started
+
+    per_course = []
+    started = time.perf_counter()
+    for course in catalog:
+        course_started = time.perf_counter()
+        tag(course)
+        per_course.append(time.perf_counter() - course_started)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'tagger': tagger,
+        'size': len(catalog),
+        'startup_s': startup,
+        'elapsed_s': elapsed,
+        'courses_per_sec': len(catalog) / elapsed if elapsed else 0.0,
+        'course': latency_stats(per_course),
+        'stages': timer.report(),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_isolated(tagger: str, catalog: List[Dict], skill_tree_file: str = SKILL_TREE_FILE) -> Dict:
+    """run_benchmark в свежем процессе: пик памяти и время запуска не зависят от прошлых замеров"""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_benchmark, (tagger, catalog, skill_tree_file))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_runs(baseline: Dict, current: Dict, threshold: float = SLOWDOWN_THRESHOLD) -> List[str]:
+    """Замедления относительно прошлого запуска (по courses/sec на тех же размерах)"""
+    previous = {(r['tagger'], r['size']): r for r in baseline.get('results', [])}
+    slowdowns = []
+    for result in current['results']:
+        before = previous.get((result['tagger'], result['size']))
+        if not before or not before['courses_per_sec']:
+            continue
+        change = result['courses_per_sec'] / before['courses_per_sec'] - 1
+        if change < -threshold:
+            slowdowns.append(
+                f"{result['tagger']} x{result['size']}: {before['courses_per_sec']:.1f} -> "
+                f"{result['courses_per_sec']:.1f} курсов/с ({change * 100:+.1f}%)"
+            )
+    return slowdowns
+
+
+def print_result(result: Dict):
+    rss = f"{result['peak_rss_mb']:.1f} MB" if result['peak_rss_mb'] is not None else "н/д"
+    print(f"\n📊 {result['tagger']} x{result['size']}: {result['courses_per_sec']:.1f} курсов/с "
+          f"(запуск {result['startup_s']:.2f} с, пик памяти {rss})")
+    print(f"   {'этап':<26}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}")
+    for stage, stats in [('курс целиком', result['course'])] + list(result['stages'].items()):
+        print(f"   {stage:<26}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк тегировщиков на синтетическом каталоге")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Размеры каталогов")
+    arg_parser.add_argument("--taggers", nargs="+", choices=TAGGERS, default=list(TAGGERS))
+    arg_parser.add_argument("--lang", choices=("ru", "en", "mixed"), default="mixed", help="Язык курсов")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--courses", default=COURSES_FILE, help="Каталог-источник словаря")
+    arg_parser.add_argument("--skill-tree", default=SKILL_TREE_FILE, help="Дерево навыков")
+    arg_parser.add_argument("--output", default="benchmark_results.json", help="Куда сохранить результаты")
+    arg_parser.add_argument("--compare", default=None, help="Прошлый результат для поиска замедлений")
+    args = arg_parser.parse_args()
+
+    generator = CatalogGenerator(args.courses, args.skill_tree, args.seed)
+    run = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'lang': args.lang,
+        'seed': args.seed,
+        'results': [],
+    }
+
+    for size in args.sizes:
+        catalog = generator.catalog(size, args.lang)
+        for tagger in args.taggers:
+            result = run_isolated(tagger, catalog, args.skill_tree)
+            run['results'].append(result)
+            print_result(result)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Результаты сохранены в {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            slowdowns = compare_runs(json.load(f), run)
+        if slowdowns:
+            print(f"\n⚠️  Замедление больше {SLOWDOWN_THRESHOLD * 100:.0f}%:")
+            for line in slowdowns:
+                print(f"   • {line}")
+            sys.exit(1)
+        print("\n✅ Замедлений относительно прошлого запуска нет")
@@ -0,0 +1,371 @@
+# pip install natasha numpy
+
+"""
+Плотные векторы курсов и поиск похожих
+Вектор курса - среднее эмбеддингов navec по леммам, взвешенное по IDF; все векторы лежат
+в одной непрерывной float32 матрице .npy, которая открывается через mmap
+"""
+
+import fcntl
+import json
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from nlp_models import get_embedding
+
+# Части речи, которые несут смысл курса
+CONTENT_POS = {'NOUN', 'PROPN', 'ADJ', 'VERB'}
+INITIAL_CAPACITY = 1024
+EMPTY_ID = -1
+# Версия формата хранилища; в версии 1 статистика IDF и леммы курсов лежали в meta.json
+STORE_VERSION = 2
+# Лемм в одном запросе IN (...) к статистике
+LEMMA_QUERY_CHUNK = 500
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS course_lemmas (
+    course_id INTEGER NOT NULL,
+    lemma TEXT NOT NULL,
+    PRIMARY KEY (course_id, lemma)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_frequency (
+    lemma TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS content_hashes (
+    course_id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+"""
+
+
+class CourseEmbedder:
+    """
+    Вектор курса по его тексту: IDF-взвешенное среднее эмбеддингов лемм (нормированное)
+    IDF считается по статистике хранилища (количество курсов и документные частоты лемм)
+    """
+
+    def __init__(self, analyzer=None):
+        if analyzer is None:
+            from tags_to_json import CourseTagGenerator
+            analyzer = CourseTagGenerator().analyze_text
+        self.analyzer = analyzer
+
+    @property
+    def embedding(self):
+        return get_embedding()
+
+    @property
+    def dim(self) -> int:
+        return self.embedding.pq.dim
+
+    def lemmas(self, text: str) -> List[str]:
+        """Леммы значимых слов, для которых есть эмбеддинг"""
+        embedding = self.embedding
+        return [
+            lemma for _, lemma, pos, _, _ in self.analyzer(text).tokens
+            if pos in CONTENT_POS and lemma and lemma in embedding
+        ]
+
+    def vector(self, lemmas: List[str], documents: int, document_frequency: Dict[str, int]) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for lemma, count in Counter(lemmas).items():
+            idf = math.log((1 + documents) / (1 + document_frequency.get(lemma, 0))) + 1
+            vector += self.embedding.get(lemma) * (count * idf)
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class EmbeddingStore:
+    """
+    Матрица векторов курсов на диске: vectors.npy (capacity x dim, float32), ids.npy (id курса в строке),
+    meta.json (заголовок: версия, размерность, заполненность, число курсов) и stats.sqlite3 (леммы курсов,
+    документные частоты для IDF и хэши текстов, по которым построены векторы). Обновление курса меняет только его строки в SQLite и короткий заголовок,
+    а не всю статистику каталога. При нехватке места ёмкость матрицы удваивается.
+    Хранилище открывают несколько процессов (воркеры gunicorn, команды manage.py): изменения идут
+    под эксклюзивной блокировкой файла .lock, чтение - под разделяемой, и в начале каждой операции
+    файлы перечитываются, если их обновил другой процесс.
+
+    Векторы нормированы, поэтому похожесть - скалярное произведение, а топ-k для курса
+    считается одним умножением матрицы на вектор.
+    """
+
+    def __init__(self, directory: str, dim: int = 300):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._meta_stamp = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(self._path('.lock'), 'a+')
+        # Все обращения к базе идут под self._lock, поэтому соединение можно делить между потоками
+        self._db = sqlite3.connect(self._path('stats.sqlite3'), check_same_thread=False)
+        with self._locked():
+            self._db.executescript(STATS_SCHEMA)
+            if os.path.exists(self._path('meta.json')):
+                self._load()
+                if self.version < STORE_VERSION:
+                    self._migrate()
+            else:
+                self._create(INITIAL_CAPACITY)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        """
+        Блокировка потоков процесса и файловая блокировка между процессами (берётся на внешнем уровне)
+        После захвата файлы перечитываются, если их изменил другой процесс
+        """
+        with self._lock:
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1 and self._meta_stamp is not None:
+                    self._refresh()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # --- Файлы ---
+    def _create(self, capacity: int):
+        np.save(self._path('vectors.npy'), np.zeros((capacity, self.dim), dtype=np.float32))
+        np.save(self._path('ids.npy'), np.full(capacity, EMPTY_ID, dtype=np.int64))
+        self.size = 0
+        self.documents = 0
+        with self._db:
+            self._db.execute("DELETE FROM course_lemmas")
+            self._db.execute("DELETE FROM document_frequency")
+            self._db.execute("DELETE FROM content_hashes")
+        self._save_meta()
+        self._load()
+
+    def _load(self):
+        with open(self._path('meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.version = meta.get('version', 1)
+        self.size = meta['size']
+        self.dim = meta['dim']
+        self.documents = meta['documents']
+
+        self.vectors = np.load(self._path('vectors.npy'), mmap_mode='r+')
+        self.ids = np.load(self._path('ids.npy'), mmap_mode='r+')
+        self.rows = {int(course_id): row for row, course_id in enumerate(self.ids[:self.size]) if course_id != EMPTY_ID}
+        self.free_rows = [row for row in range(self.size) if self.ids[row] == EMPTY_ID]
+        self._meta_stamp = self._stat_meta()
+
+    def _stat_meta(self):
+        # meta.json подменяется через os.replace, поэтому у новой версии другой inode
+        stat = os.stat(self._path('meta.json'))
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _save_meta(self):
+        tmp_path = self._path('meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'size': self.size, 'dim': self.dim, 'documents': self.documents}, f)
+        os.replace(tmp_path, self._path('meta.json'))
+        self.version = STORE_VERSION
+        self._meta_stamp = self._stat_meta()
+
+    def _migrate(self):
+        """Перенести леммы курсов из meta.json версии 1 в stats.sqlite3 (под эксклюзивной блокировкой)"""
+        with open(self._path('meta.json'), 'r', encoding='utf-8') as f:
+            course_lemmas = json.load(f).get('course_lemmas', {})
+        with self._db:
+            self._db.execute("DELETE FROM course_lemmas")
+            self._db.execute("DELETE FROM document_frequency")
+            for course_id, lemmas in course_lemmas.items():
+                self._set_lemmas(int(course_id), lemmas)
+        self._save_meta()
+
+    def _refresh(self):
+        """Перечитать файлы, если их обновил другой процесс (вызывается под блокировкой)"""
+        if self._stat_meta() != self._meta_stamp:
+            self._load()
+
+    def _count_lemmas(self, lemmas: Iterable[str], delta: int):
+        self._db.executemany(
+            "INSERT INTO document_frequency (lemma, count) VALUES (?, ?) "
+            "ON CONFLICT (lemma) DO UPDATE SET count = count + excluded.count",
+            ((lemma, delta) for lemma in lemmas)
+        )
+        if delta < 0:
+            self._db.execute("DELETE FROM document_frequency WHERE count <= 0")
+
+    def _set_lemmas(self, course_id: int, lemmas: Iterable[str]):
+        """Заменить леммы курса и их вклад в документные частоты (внутри транзакции)"""
+        old = [lemma for lemma, in self._db.execute("SELECT lemma FROM course_lemmas WHERE course_id = ?", (course_id,))]
+        if old:
+            self._count_lemmas(old, -1)
+            self._db.execute("DELETE FROM course_lemmas WHERE course_id = ?", (course_id,))
+        lemmas = sorted(set(lemmas))
+        self._db.executemany("INSERT INTO course_lemmas (course_id, lemma) VALUES (?, ?)",
+                             ((course_id, lemma) for lemma in lemmas))
+        self._count_lemmas(lemmas, 1)
+
+    def _grow(self):
+        """
+        Удвоить ёмкость: новая матрица пишется рядом и атомарно подменяет старую
+        Вызывается под эксклюзивной блокировкой; другие процессы откроют новые файлы
+        при следующей операции, увидев обновлённый meta.json
+        """
+        capacity = len(self.ids) * 2
+        for name, fill, dtype, shape in (
+                ('vectors.npy', 0, np.float32, (capacity, self.dim)),
+                ('ids.npy', EMPTY_ID, np.int64, (capacity,)),
+        ):
+            old = np.load(self._path(name), mmap_mode='r')
+            tmp_path = self._path(f"{name}.tmp.npy")
+            grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=shape)
+            grown[:] = fill
+            grown[:len(old)] = old
+            grown.flush()
+            del grown, old
+            os.replace(tmp_path, self._path(name))
+
+        self.vectors = np.load(self._path('vectors.npy'), mmap_mode='r+')
+        self.ids = np.load(self._path('ids.npy'), mmap_mode='r+')
+
+    # --- Изменение ---
+    def upsert(self, course_id: int, vector: np.ndarray, lemmas: Iterable[str] = (), content_hash: str = ''):
+        """
+        Добавить или заменить вектор курса; статистика IDF учитывает леммы курса один раз
+        content_hash - хэш текста курса, по нему content_hashes() отличает изменённые курсы
+        """
+        with self._locked():
+            row = self.rows.get(course_id)
+            if row is None:
+                if self.free_rows:
+                    row = self.free_rows.pop()
+                else:
+                    if self.size == len(self.ids):
+                        self._grow()
+                    row = self.size
+                    self.size += 1
+                self.rows[course_id] = row
+                self.ids[row] = course_id
+                self.documents += 1
+            # Обновление курса: прежние леммы убираются из статистики
+            with self._db:
+                self._set_lemmas(course_id, lemmas)
+                self._db.execute("INSERT OR REPLACE INTO content_hashes (course_id, hash) VALUES (?, ?)",
+                                 (course_id, content_hash))
+
+            self.vectors[row] = vector
+            self.vectors.flush()
+            self.ids.flush()
+            self._save_meta()
+
+    def remove(self, course_id: int):
+        with self._locked():
+            row = self.rows.pop(course_id, None)
+            if row is None:
+                return
+            self.vectors[row] = 0
+            self.ids[row] = EMPTY_ID
+            self.free_rows.append(row)
+            self.documents = max(0, self.documents - 1)
+            with self._db:
+                self._set_lemmas(course_id, ())
+                self._db.execute("DELETE FROM content_hashes WHERE course_id = ?", (course_id,))
+            self.vectors.flush()
+            self.ids.flush()
+            self._save_meta()
+
+    def rebuild(self, items: Iterable[Tuple[int, List[str]]], embedder: CourseEmbedder,
+                content_hashes: Optional[Dict[int, str]] = None):
+        """
+        Полная пересборка по (id курса, леммы): сначала статистика IDF, затем векторы
+        Леммы держатся в памяти только как списки строк, матрица пишется сразу на диск
+        """
+        content_hashes = content_hashes or {}
+        items = list(items)
+        document_frequency = Counter()
+        for _, lemmas in items:
+            document_frequency.update(set(lemmas))
+
+        with self._locked():
+            capacity = max(INITIAL_CAPACITY, 1 << max(0, len(items) - 1).bit_length())
+            vectors = np.lib.format.open_memmap(self._path('vectors.npy.tmp.npy'), mode='w+',
+                                                dtype=np.float32, shape=(capacity, self.dim))
+            ids = np.full(capacity, EMPTY_ID, dtype=np.int64)
+            for row, (course_id, lemmas) in enumerate(items):
+                vectors[row] = embedder.vector(lemmas, len(items), document_frequency)
+                ids[row] = course_id
+            vectors.flush()
+            del vectors
+
+            np.save(self._path('ids.npy.tmp.npy'), ids)
+            os.replace(self._path('vectors.npy.tmp.npy'), self._path('vectors.npy'))
+            os.replace(self._path('ids.npy.tmp.npy'), self._path('ids.npy'))
+            with self._db:
+                self._db.execute("DELETE FROM course_lemmas")
+                self._db.execute("DELETE FROM document_frequency")
+                self._db.execute("DELETE FROM content_hashes")
+                self._db.executemany("INSERT INTO course_lemmas (course_id, lemma) VALUES (?, ?)",
+                                     ((course_id, lemma) for course_id, lemmas in items for lemma in set(lemmas)))
+                self._db.executemany("INSERT INTO document_frequency (lemma, count) VALUES (?, ?)",
+                                     document_frequency.items())
+                self._db.executemany("INSERT INTO content_hashes (course_id, hash) VALUES (?, ?)",
+                                     ((course_id, content_hashes.get(course_id, '')) for course_id, _ in items))
+            self.size = len(items)
+            self.documents = len(items)
+            self._save_meta()
+            self._load()
+
+    # --- Поиск ---
+    def __contains__(self, course_id: int) -> bool:
+        with self._locked(shared=True):
+            return course_id in self.rows
+
+    def content_hashes(self) -> Dict[int, str]:
+        """id курса -> хэш текста, по которому построен его вектор"""
+        with self._locked(shared=True):
+            return dict(self._db.execute("SELECT course_id, hash FROM content_hashes"))
+
+    def most_similar(self, course_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        """Топ-k ближайших курсов [(id, косинус)] без самого курса"""
+        with self._locked(shared=True):
+            row = self.rows.get(course_id)
+            if row is None or k <= 0:
+                return []
+
+            scores = self.vectors[:self.size] @ self.vectors[row]
+            # Сам курс и пустые строки не участвуют
+            scores[row] = -np.inf
+            scores[self.ids[:self.size] == EMPTY_ID] = -np.inf
+
+            k = min(k, self.size - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(int(self.ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def idf_stats(self, lemmas: Optional[Iterable[str]] = None) -> Tuple[int, Dict[str, int]]:
+        """(число курсов, документные частоты) - всех лемм или только переданных"""
+        with self._locked(shared=True):
+            if lemmas is None:
+                return self.documents, dict(self._db.execute("SELECT lemma, count FROM document_frequency"))
+
+            lemmas = sorted(set(lemmas))
+            document_frequency = {}
+            for start in range(0, len(lemmas), LEMMA_QUERY_CHUNK):
+                chunk = lemmas[start:start + LEMMA_QUERY_CHUNK]
+                document_frequency.update(self._db.execute(
+                    f"SELECT lemma, count FROM document_frequency WHERE lemma IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+            return self.documents, document_frequency
@@ -0,0 +1,318 @@
+# pip install numpy
+
+"""
+Пакетный расчёт готовности к выпуску и рекомендаций для целого набора студентов
+Студенты превращаются в матрицу уровней навыков (студенты x навыки, int8), курсы программы -
+в таблицы пререквизитов и приращений по каждой CourseDifficulty; всё считается матричными операциями NumPy.
+Результаты совпадают с Student.get_graduation_readiness и Student.recommend_courses.
+ProgramCatalog так же сравнивает студентов сразу со всеми программами (Student.simulate_alternative_program).
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from grades import CourseDifficulty, Course, MasterProgram, SkillRequirement, Student
+
+DIFFICULTIES = list(CourseDifficulty)
+DEFAULT_CHUNK_SIZE = 2048  # Студентов за один проход (ограничивает память матриц студенты x курсы)
+
+
+class _CourseTable:
+    """Пререквизиты и приращения набора курсов в виде плоских массивов, сгруппированных по курсу"""
+
+    def __init__(self, courses: List[Course], skill_index: Dict[str, int]):
+        self.courses = courses
+        count = len(courses)
+
+        # Пререквизиты: (курс, навык, уровень) подряд по курсам
+        prereq_course, prereq_skill, prereq_level = [], [], []
+        for column, course in enumerate(courses):
+            for req in course.prerequisites:
+                prereq_course.append(column)
+                prereq_skill.append(skill_index[req.skill.code])
+                prereq_level.append(req.required_level.value)
+        self.prereq_skill = np.array(prereq_skill, dtype=np.intp)
+        self.prereq_level = np.array(prereq_level, dtype=np.int16)
+        self.prereq_courses, self.prereq_starts = np.unique(np.array(prereq_course, dtype=np.intp), return_index=True)
+        # Сумма требуемых уровней (max_score из get_difficulty_for_student)
+        self.max_score = np.zeros(count, dtype=np.int64)
+        np.add.at(self.max_score, np.array(prereq_course, dtype=np.intp), self.prereq_level.astype(np.int64))
+        self.adaptive = np.array([course.adaptive for course in courses], dtype=bool)
+
+        # Приращения по сложностям: слой j - j-е приращение каждого курса (сохраняет порядок суммирования)
+        self.gains: Dict[CourseDifficulty, List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]] = {}
+        for difficulty in DIFFICULTIES:
+            layers = []
+            depth = max((len(course.get_skill_gains_for_difficulty(difficulty)) for course in courses), default=0)
+            for j in range(depth):
+                columns, skills, base, max_level = [], [], [], []
+                for column, course in enumerate(courses):
+                    gains = course.get_skill_gains_for_difficulty(difficulty)
+                    if j < len(gains):
+                        columns.append(column)
+                        skills.append(skill_index[gains[j].skill.code])
+                        base.append(gains[j].base_gain)
+                        max_level.append(gains[j].max_level.value)
+                layers.append((np.array(columns, dtype=np.intp), np.array(skills, dtype=np.intp),
+                               np.array(base, dtype=np.int16), np.array(max_level, dtype=np.int16)))
+            self.gains[difficulty] = layers
+
+    def eligible(self, levels: np.ndarray) -> np.ndarray:
+        """Маска студенты x курсы: все пререквизиты выполнены"""
+        mask = np.ones((levels.shape[0], len(self.courses)), dtype=bool)
+        if len(self.prereq_courses):
+            satisfied = levels[:, self.prereq_skill] >= self.prereq_level
+            mask[:, self.prereq_courses] = np.logical_and.reduceat(satisfied, self.prereq_starts, axis=1)
+        return mask
+
+    def difficulty(self, levels: np.ndarray) -> np.ndarray:
+        """Индекс сложности в DIFFICULTIES для каждой пары студент x курс"""
+        total = np.zeros((levels.shape[0], len(self.courses)), dtype=np.int64)
+        if len(self.prereq_courses):
+            total[:, self.prereq_courses] = np.add.reduceat(
+                levels[:, self.prereq_skill].astype(np.int64), self.prereq_starts, axis=1
+            )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = total / self.max_score
+        result = np.where(ratio < 0.7, 0, np.where(ratio < 1.3, 1, 2))
+        result[:, self.max_score == 0] = DIFFICULTIES.index(CourseDifficulty.BEGINNER)
+        result[:, ~self.adaptive] = DIFFICULTIES.index(CourseDifficulty.INTERMEDIATE)
+        return result
+
+    def relevance(self, levels: np.ndarray, missing_weights: np.ndarray, has_missing: np.ndarray) -> np.ndarray:
+        """Релевантность студенты x курсы (как _calculate_course_relevance)"""
+        difficulty = self.difficulty(levels)
+        relevance = np.zeros((levels.shape[0], len(self.courses)), dtype=np.float64)
+
+        # Приращения другой сложности добавляют 0.0, сумма по курсу не меняется
+        for d, difficulty_value in enumerate(DIFFICULTIES):
+            for columns, skills, base, max_level in self.gains[difficulty_value]:
+                potential = np.minimum(max_level - levels[:, skills].astype(np.int16), base)
+                terms = missing_weights[:, skills] * potential
+                relevance[:, columns] += np.where(difficulty[:, columns] == d, terms, 0.0)
+
+        # Если недостающих навыков нет, у всех курсов базовая релевантность
+        relevance[~has_missing] = 0.5
+        return relevance
+
+
+class CohortAnalyzer:
+    """
+    Готовность и рекомендации для когорты студентов одной программы
+    Таблицы курсов и требований строятся один раз, студенты обрабатываются пачками по chunk_size
+    """
+
+    def __init__(self, program: MasterProgram, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.program = program
+        self.chunk_size = max(1, chunk_size)
+
+        codes = set()
+        for req in program.target_skills:
+            codes.add(req.skill.code)
+        for course in program.get_all_courses():
+            codes.update(req.skill.code for req in course.prerequisites)
+            codes.update(gain.skill.code for gains in course.skill_gains.values() for gain in gains)
+        self.skill_codes = sorted(codes)
+        self.skill_index = {code: i for i, code in enumerate(self.skill_codes)}
+
+        self.target_skill = np.array([self.skill_index[req.skill.code] for req in program.target_skills], dtype=np.intp)
+        self.target_level = np.array([req.required_level.value for req in program.target_skills], dtype=np.int8)
+        self.target_weight = np.array([req.weight for req in program.target_skills], dtype=np.float64)
+
+        self._semesters = program.get_recommendation_engine().courses_by_semester
+        self._tables: Dict[int, _CourseTable] = {}
+
+    def _table(self, semester: int) -> _CourseTable:
+        if semester not in self._tables:
+            self._tables[semester] = _CourseTable(self._semesters.get(semester, []), self.skill_index)
+        return self._tables[semester]
+
+    def level_matrix(self, students: Sequence[Student]) -> np.ndarray:
+        """Уровни навыков студенты x навыки (int8); навыки, которых нет в программе, не нужны"""
+        rows, columns, values = [], [], []
+        skill_index = self.skill_index
+        for row, student in enumerate(students):
+            for code, level in student.skills.items():
+                column = skill_index.get(code)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(level.value)
+
+        levels = np.zeros((len(students), len(self.skill_codes)), dtype=np.int8)
+        levels[rows, columns] = values
+        return levels
+
+    def missing_mask(self, levels: np.ndarray) -> np.ndarray:
+        """Студенты x требования выпуска: требование не выполнено"""
+        return levels[:, self.target_skill] < self.target_level
+
+    def readiness(self, students: Sequence[Student]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Готовность к выпуску в процентах для каждого студента и маска недостающих требований
+        (столбцы - program.target_skills, как список недостающих у get_graduation_readiness)
+        """
+        missing = self.missing_mask(self.level_matrix(students))
+        total = len(self.program.target_skills)
+        if total == 0:
+            return np.full(len(students), 100.0), missing
+
+        missing_count = missing.sum(axis=1)
+        percentage = ((total - missing_count) / total) * 100
+        percentage[missing_count == 0] = 100.0
+        return percentage, missing
+
+    def _missing_weights(self, missing: np.ndarray) -> np.ndarray:
+        """Студенты x навыки: вес первого невыполненного требования по навыку (0 - навык не недостающий)"""
+        weights = np.zeros((missing.shape[0], len(self.skill_codes)), dtype=np.float64)
+        # Обратный порядок: первое требование в списке перезаписывает остальные по тому же навыку
+        for r in range(len(self.target_skill) - 1, -1, -1):
+            rows = missing[:, r]
+            weights[rows, self.target_skill[r]] = self.target_weight[r]
+        return weights
+
+    def _completed_mask(self, students: Sequence[Student], courses: List[Course]) -> np.ndarray:
+        columns_by_code: Dict[str, List[int]] = {}
+        for column, course in enumerate(courses):
+            columns_by_code.setdefault(course.code, []).append(column)
+
+        mask = np.zeros((len(students), len(courses)), dtype=bool)
+        for row, student in enumerate(students):
+            for completion in student.completed_courses:
+                for column in columns_by_code.get(completion.course.code, ()):
+                    mask[row, column] = True
+        return mask
+
+    def scores(self, students: Sequence[Student], semester: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Релевантность студенты x курсы семестра и маска доступных курсов (не пройден, пререквизиты выполнены)
+        Столбцы - курсы семестра в порядке RecommendationEngine.courses_by_semester
+        """
+        table = self._table(semester)
+        levels = self.level_matrix(students)
+        missing = self.missing_mask(levels)
+
+        available = table.eligible(levels) & ~self._completed_mask(students, table.courses)
+        relevance = table.relevance(levels, self._missing_weights(missing), missing.any(axis=1))
+        return relevance, available
+
+    def recommend(self, students: Sequence[Student], semester: int,
+                  max_recommendations: int = 5) -> List[List[Tuple[Course, float]]]:
+        """Рекомендации для каждого студента, как Student.recommend_courses"""
+        table = self._table(semester)
+        result = []
+        for start in range(0, len(students), self.chunk_size):
+            relevance, available = self.scores(students[start:start + self.chunk_size], semester)
+
+            # Стабильная сортировка по убыванию релевантности, недоступные курсы - в конец
+            order = np.argsort(np.where(available, -relevance, np.inf), axis=1, kind='stable')
+            counts = available.sum(axis=1)
+            for row in range(len(relevance)):
+                ranked = order[row, :counts[row]][:max_recommendations]
+                result.append([(table.courses[column], float(relevance[row, column])) for column in ranked])
+        return result
+
+
+class ProgramCatalog:
+    """
+    Требования выпуска набора программ одной матрицей для "что, если?" сразу по всем программам
+    Требования всех программ лежат подряд (program.target_skills по очереди), готовность студентов
+    ко всем программам считается одним сравнением матрицы уровней с вектором требуемых уровней.
+    Результаты совпадают с Student.simulate_alternative_program.
+    """
+
+    def __init__(self, programs: Sequence[MasterProgram]):
+        self.programs = list(programs)
+        self.requirements = [req for program in self.programs for req in program.target_skills]
+
+        self.skill_codes = sorted({req.skill.code for req in self.requirements})
+        self.skill_index = {code: i for i, code in enumerate(self.skill_codes)}
+
+        self.required_skill = np.array([self.skill_index[req.skill.code] for req in self.requirements], dtype=np.intp)
+        self.required_level = np.array([req.required_level.value for req in self.requirements], dtype=np.int8)
+        self.totals = np.array([len(program.target_skills) for program in self.programs], dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(self.totals)[:-1])).astype(np.intp)
+
+    def level_matrix(self, students: Sequence[Student]) -> np.ndarray:
+        """Уровни студенты x навыки требований (int8)"""
+        levels = np.zeros((len(students), len(self.skill_codes)), dtype=np.int8)
+        for row, student in enumerate(students):
+            for code, level in student.skills.items():
+                column = self.skill_index.get(code)
+                if column is not None:
+                    levels[row, column] = level.value
+        return levels
+
+    def readiness(self, students: Sequence[Student]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Готовность в процентах студенты x программы и маска студенты x требования
+        (столбцы - requirements: target_skills всех программ подряд) с невыполненными требованиями
+        """
+        missing = self.level_matrix(students)[:, self.required_skill] < self.required_level
+        missing_count = np.zeros((len(students), len(self.programs)), dtype=np.int64)
+        has_requirements = self.totals > 0
+        if missing.shape[1]:
+            missing_count[:, has_requirements] = np.add.reduceat(
+                missing, self.starts[has_requirements], axis=1, dtype=np.int64
+            )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentage = ((self.totals - missing_count) / self.totals) * 100
+        percentage[missing_count == 0] = 100.0
+        return percentage, missing
+
+    def compare(self, students: Sequence[Student]) -> List[List[Tuple[MasterProgram, float, List[SkillRequirement]]]]:
+        """
+        Для каждого студента - все программы по убыванию готовности (при равенстве - в исходном порядке)
+        с недостающими требованиями, как у simulate_alternative_program
+        """
+        percentage, missing = self.readiness(students)
+        order = np.argsort(-percentage, axis=1, kind='stable').tolist()
+        percentage = percentage.tolist()
+        # Программа каждого требования: недостающие требования раскладываются по программам одним проходом
+        program_of = np.repeat(np.arange(len(self.programs)), self.totals).tolist()
+
+        result = []
+        for row in range(len(students)):
+            missing_by_program: Dict[int, List[SkillRequirement]] = {}
+            for i in np.flatnonzero(missing[row]).tolist():
+                missing_by_program.setdefault(program_of[i], []).append(self.requirements[i])
+            result.append([
+                (self.programs[p], percentage[row][p], missing_by_program.get(p, [])) for p in order[row]
+            ])
+        return result
+
+
+_catalogs: Dict[Tuple, ProgramCatalog] = {}
+CATALOG_CACHE_SIZE = 8
+
+
+def _catalog_key(programs: Sequence[MasterProgram]) -> Tuple:
+    # Закэшированный каталог держит ссылки на программы и требования, поэтому их id не переиспользуются
+    return tuple(
+        (id(program), tuple((id(req), req.skill.code, req.required_level.value) for req in program.target_skills))
+        for program in programs
+    )
+
+
+def get_program_catalog(programs: Sequence[MasterProgram]) -> ProgramCatalog:
+    """
+    ProgramCatalog для набора программ, кэшируется между вызовами
+    Пересобирается, если изменился состав программ, их target_skills (замена требований,
+    навык или уровень требования)
+    """
+    key = _catalog_key(programs)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        if len(_catalogs) >= CATALOG_CACHE_SIZE:
+            _catalogs.pop(next(iter(_catalogs)))
+        catalog = _catalogs[key] = ProgramCatalog(programs)
+    return catalog
+
+
+def compare_programs(students: Sequence[Student],
+                     programs: Sequence[MasterProgram]) -> List[List[Tuple[MasterProgram, float, List[SkillRequirement]]]]:
+    """Сравнение "что, если?" студентов со всеми программами сразу, см. ProgramCatalog.compare"""
+    return get_program_catalog(programs).compare(students)
@@ -0,0 +1,169 @@
+"""
+Компактное хранение навыков студентов для массового моделирования
+Каждому коду навыка присваивается целочисленный id (SkillIndex), уровни хранятся байтами array('b'):
+один студент - SkillVector, множество студентов - SkillTable (одна строка байт на студента).
+Преобразования в обе стороны с привычным Dict[str, SkillLevel] (Student.skills).
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from grades import MasterProgram, Skill, SkillLevel, Student
+
+_LEVELS = [SkillLevel(value) for value in range(len(SkillLevel))]
+
+
+class SkillIndex:
+    """Код навыка <-> целочисленный id (позиция в векторе уровней)"""
+    __slots__ = ('codes', 'ids')
+
+    def __init__(self, codes: Iterable[str]):
+        self.codes: List[str] = list(dict.fromkeys(codes))
+        self.ids: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+
+    @classmethod
+    def from_skill_tree(cls, skills: Dict[str, Skill]) -> 'SkillIndex':
+        """Индекс по дереву навыков (create_skill_tree) в порядке его обхода"""
+        return cls(skills)
+
+    @classmethod
+    def from_program(cls, program: MasterProgram) -> 'SkillIndex':
+        """Индекс по навыкам, которые встречаются в программе (требования выпуска, пререквизиты, приращения)"""
+        codes = {req.skill.code for req in program.target_skills}
+        for course in program.get_all_courses():
+            codes.update(req.skill.code for req in course.prerequisites)
+            codes.update(gain.skill.code for gains in course.skill_gains.values() for gain in gains)
+        return cls(sorted(codes))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.ids
+
+    def id(self, code: str) -> int:
+        try:
+            return self.ids[code]
+        except KeyError:
+            raise KeyError(f"Навык {code} отсутствует в индексе") from None
+
+    def pack(self, skills: Dict[str, SkillLevel], strict: bool = False) -> array:
+        """
+        Dict[str, SkillLevel] -> array('b') уровней
+        Навыки не из индекса пропускаются (программа о них не спрашивает), при strict=True - KeyError
+        """
+        levels = array('b', bytes(len(self.codes)))
+        for code, level in skills.items():
+            if strict or code in self.ids:
+                levels[self.id(code)] = level.value
+        return levels
+
+    def unpack(self, levels: Sequence[int]) -> Dict[str, SkillLevel]:
+        """Уровни -> Dict[str, SkillLevel]; нулевые уровни опускаются (get_skill_level вернёт LEVEL_0)"""
+        return {self.codes[i]: _LEVELS[value] for i, value in enumerate(levels) if value}
+
+
+class SkillVector:
+    """Навыки одного студента: array('b') по SkillIndex, API как у Student.get_skill_level / update_skill"""
+    __slots__ = ('index', 'levels')
+
+    def __init__(self, index: SkillIndex, levels: Optional[array] = None):
+        self.index = index
+        self.levels = levels if levels is not None else array('b', bytes(len(index)))
+
+    @classmethod
+    def from_skills(cls, index: SkillIndex, skills: Dict[str, SkillLevel], strict: bool = False) -> 'SkillVector':
+        return cls(index, index.pack(skills, strict))
+
+    @classmethod
+    def from_student(cls, index: SkillIndex, student: Student, strict: bool = False) -> 'SkillVector':
+        return cls.from_skills(index, student.skills, strict)
+
+    def get_skill_level(self, skill_code: str) -> SkillLevel:
+        i = self.index.ids.get(skill_code)
+        return SkillLevel.LEVEL_0 if i is None else _LEVELS[self.levels[i]]
+
+    def update_skill(self, skill_code: str, new_level: SkillLevel):
+        """Повысить уровень навыка (понижение игнорируется, как в Student.update_skill); навыка нет в индексе - KeyError"""
+        i = self.index.id(skill_code)
+        if new_level.value > self.levels[i]:
+            self.levels[i] = new_level.value
+
+    def to_skills(self) -> Dict[str, SkillLevel]:
+        return self.index.unpack(self.levels)
+
+    def apply_to(self, student: Student):
+        """Записать уровни в student.skills"""
+        student.skills = self.to_skills()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SkillVector) and self.index.codes == other.index.codes and self.levels == other.levels
+
+    def __repr__(self):
+        return f"SkillVector({self.to_skills()})"
+
+
+class SkillTable:
+    """
+    Навыки множества студентов в одном array('b'): строка из len(index) байт на студента
+    Строка студента i - levels[i * width:(i + 1) * width], без отдельного объекта на студента
+    """
+    __slots__ = ('index', 'width', 'levels')
+
+    def __init__(self, index: SkillIndex, levels: Optional[array] = None):
+        self.index = index
+        self.width = len(index)
+        self.levels = levels if levels is not None else array('b')
+        if self.width and len(self.levels) % self.width:
+            raise ValueError(f"Длина массива {len(self.levels)} не кратна числу навыков {self.width}")
+
+    @classmethod
+    def from_students(cls, index: SkillIndex, students: Iterable[Student], strict: bool = False) -> 'SkillTable':
+        table = cls(index)
+        for student in students:
+            table.append(student.skills, strict)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.levels) // self.width if self.width else 0
+
+    def append(self, skills: Dict[str, SkillLevel], strict: bool = False) -> int:
+        """Добавить студента, вернуть номер строки"""
+        row = len(self)
+        self.levels.extend(self.index.pack(skills, strict))
+        return row
+
+    def get_skill_level(self, row: int, skill_code: str) -> SkillLevel:
+        i = self.index.ids.get(skill_code)
+        return SkillLevel.LEVEL_0 if i is None else _LEVELS[self.levels[row * self.width + i]]
+
+    def update_skill(self, row: int, skill_code: str, new_level: SkillLevel):
+        position = row * self.width + self.index.id(skill_code)
+        if new_level.value > self.levels[position]:
+            self.levels[position] = new_level.value
+
+    def row(self, row: int) -> SkillVector:
+        """Копия строки как SkillVector"""
+        start = row * self.width
+        return SkillVector(self.index, self.levels[start:start + self.width])
+
+    def to_skills(self, row: int) -> Dict[str, SkillLevel]:
+        start = row * self.width
+        return self.index.unpack(self.levels[start:start + self.width])
+
+    def __iter__(self) -> Iterator[Dict[str, SkillLevel]]:
+        for row in range(len(self)):
+            yield self.to_skills(row)
+
+    def to_numpy(self):
+        """
+        Матрица студенты x навыки (int8, столбцы - index.codes) без копирования
+        Пока матрица жива, буфер занят и добавлять строки нельзя
+        """
+        import numpy as np
+        return np.frombuffer(self.levels, dtype=np.int8).reshape(len(self), self.width)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.levels) * self.levels.itemsize
+
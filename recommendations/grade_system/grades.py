@@ -7,6 +7,8 @@ from enum import Enum
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import defaultdict
+import heapq
 import json
 
 
@@ -32,7 +34,7 @@ class CourseDifficulty(Enum):
     ADVANCED = "Экспертный"
 
 
-@dataclass
+@dataclass(slots=True)
 class Skill:
     """
     Иерархический навык с возможностью вложенности
@@ -69,7 +71,7 @@ class Skill:
         return f"Skill({self.name}, level={self.level.value})"
 
 
-@dataclass
+@dataclass(slots=True)
 class SkillRequirement:
     """Требование к навыку для курса или специальности"""
     skill: Skill
@@ -81,7 +83,7 @@ class SkillRequirement:
         return student_level.value >= self.required_level.value
 
 
-@dataclass
+@dataclass(slots=True)
 class SkillGain:
     """Приращение навыка от курса"""
     skill: Skill
@@ -104,7 +106,7 @@ class SkillGain:
         return new_level - current_level.value
 
 
-@dataclass
+@dataclass(slots=True)
 class Course:
     """Адаптивный курс"""
     code: str  # Уникальный код курса
@@ -161,7 +163,7 @@ class Course:
         return f"Course({self.code}: {self.name})"
 
 
-@dataclass
+@dataclass(slots=True)
 class CourseCompletion:
     """Запись о пройденном курсе"""
     course: Course
@@ -188,7 +190,7 @@ class CourseCompletion:
             return "F"
 
 
-@dataclass
+@dataclass(slots=True)
 class MasterProgram:
     """Направление магистратуры"""
     code: str  # Например: "09.04.01"
@@ -210,6 +212,11 @@ class MasterProgram:
     # Общая продолжительность (семестров)
     duration_semesters: int = 4
 
+    _recommendation_engine: Optional['RecommendationEngine'] = field(default=None, init=False, repr=False, compare=False)
+    _recommendation_engine_key: Optional[Tuple[Tuple[int, ...], ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def get_all_courses(self) -> List[Course]:
         """Получить все курсы программы"""
         return self.required_courses + self.elective_courses
@@ -220,6 +227,28 @@ class MasterProgram:
         elective = [c for c in self.elective_courses if c.semester == semester]
         return required, elective
 
+    def get_recommendation_engine(self) -> 'RecommendationEngine':
+        """
+        Движок рекомендаций программы (строится один раз)
+        Пересобирается, если заменены, добавлены или удалены курсы или требования выпуска (по их identity);
+        после изменения полей уже входящих в программу объектов нужен invalidate_recommendation_engine()
+        """
+        # Движок держит ссылки на эти объекты, поэтому их id не переиспользуются, пока кэш жив
+        key = (
+            tuple(map(id, self.required_courses)),
+            tuple(map(id, self.elective_courses)),
+            tuple(map(id, self.target_skills)),
+        )
+        if self._recommendation_engine is None or self._recommendation_engine_key != key:
+            self._recommendation_engine = RecommendationEngine(self)
+            self._recommendation_engine_key = key
+        return self._recommendation_engine
+
+    def invalidate_recommendation_engine(self):
+        """Сбросить движок рекомендаций (после изменения курсов или требований на месте)"""
+        self._recommendation_engine = None
+        self._recommendation_engine_key = None
+
     def check_graduation_requirements(self, student_skills: Dict[str, SkillLevel]) -> Tuple[
         bool, List[SkillRequirement]]:
         """
@@ -240,6 +269,7 @@ class MasterProgram:
 
 class Student:
     """Студент с персонализированной траекторией обучения"""
+    __slots__ = ('student_id', 'name', 'program', 'current_semester', 'skills', 'completed_courses', 'enrolled_courses')
 
     def __init__(
             self,
@@ -352,36 +382,7 @@ class Student:
         Рекомендовать курсы для заданного семестра
         Возвращает: список (курс, релевантность) отсортированный по убыванию релевантности
         """
-        _, missing_skills = self.get_graduation_readiness()
-
-        # Получаем доступные курсы
-        required, elective = self.program.get_courses_for_semester(semester)
-        available_courses = required + elective
-
-        # Фильтруем уже пройденные
-        completed_codes = {c.course.code for c in self.completed_courses}
-        available_courses = [c for c in available_courses if c.code not in completed_codes]
-
-        recommendations = []
-
-        for course in available_courses:
-            # Проверяем доступность (пререквизиты)
-            can_enroll = all(
-                req.is_satisfied(self.get_skill_level(req.skill.code))
-                for req in course.prerequisites
-            )
-
-            if not can_enroll:
-                continue
-
-            # Рассчитываем релевантность на основе недостающих навыков
-            relevance = self._calculate_course_relevance(course, missing_skills)
-            recommendations.append((course, relevance))
-
-        # Сортируем по релевантности
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-
-        return recommendations[:max_recommendations]
+        return self.program.get_recommendation_engine().recommend(self, semester, max_recommendations)
 
     def _calculate_course_relevance(
             self,
@@ -459,6 +460,140 @@ class Student:
         return f"Student({self.name}, {self.program.code}, sem={self.current_semester})"
 
 
+class RecommendationEngine:
+    """
+    Индексы программы для рекомендаций курсов, строятся один раз на MasterProgram:
+    семестр -> курсы (сначала обязательные, затем элективные), семестр -> навык -> курсы, которые его развивают,
+    навык -> требования выпуска. Релевантность считается только для курсов, развивающих недостающие навыки,
+    топ-k выбирается кучей. Порядок тот же, что у сортировки всех курсов семестра по убыванию релевантности.
+
+    С hierarchy (SkillHierarchy) пререквизиты проверяются по effective_level: родительскому навыку
+    засчитывается child_credit от лучшего уровня подскиллов. По умолчанию - только собственный уровень.
+    """
+
+    def __init__(self, program: MasterProgram, hierarchy: Optional['SkillHierarchy'] = None,
+                 child_credit: Optional[float] = None):
+        self.program = program
+        self.hierarchy = hierarchy
+        if hierarchy is not None and child_credit is None:
+            from skill_hierarchy import DEFAULT_CHILD_CREDIT
+            child_credit = DEFAULT_CHILD_CREDIT
+        self.child_credit = child_credit
+
+        # Позиция курса в списке семестра задаёт порядок при равной релевантности
+        self.courses_by_semester: Dict[int, List[Course]] = defaultdict(list)
+        for course in program.required_courses + program.elective_courses:
+            self.courses_by_semester[course.semester].append(course)
+
+        # Навык -> позиции курсов семестра, у которых есть приращение этого навыка (на любой сложности)
+        self.skill_courses: Dict[int, Dict[str, List[int]]] = {}
+        for semester, courses in self.courses_by_semester.items():
+            index = defaultdict(list)
+            for position, course in enumerate(courses):
+                codes = {gain.skill.code for gains in course.skill_gains.values() for gain in gains}
+                for code in codes:
+                    index[code].append(position)
+            self.skill_courses[semester] = index
+
+        # Навык -> требования выпуска в порядке target_skills
+        self.requirements_by_skill: Dict[str, List[SkillRequirement]] = defaultdict(list)
+        for req in program.target_skills:
+            self.requirements_by_skill[req.skill.code].append(req)
+
+    def _missing_requirements(self, student: 'Student') -> Dict[str, SkillRequirement]:
+        """Навык -> первое невыполненное требование по нему (как в списке недостающих компетенций)"""
+        missing = {}
+        for code, requirements in self.requirements_by_skill.items():
+            level = student.get_skill_level(code)
+            for req in requirements:
+                if not req.is_satisfied(level):
+                    missing[code] = req
+                    break
+        return missing
+
+    def _can_enroll(self, student: 'Student', course: Course) -> bool:
+        if self.hierarchy is None:
+            return all(req.is_satisfied(student.get_skill_level(req.skill.code)) for req in course.prerequisites)
+        return all(
+            req.is_satisfied(self.hierarchy.effective_level(student.skills, req.skill.code, self.child_credit))
+            for req in course.prerequisites
+        )
+
+    @staticmethod
+    def _relevance(student: 'Student', course: Course, missing: Dict[str, SkillRequirement]) -> float:
+        difficulty = course.get_difficulty_for_student(student.skills)
+
+        relevance_score = 0.0
+        for gain in course.get_skill_gains_for_difficulty(difficulty):
+            requirement = missing.get(gain.skill.code)
+            if requirement:
+                current_level = student.get_skill_level(gain.skill.code)
+                potential_gain = min(gain.max_level.value - current_level.value, gain.base_gain)
+                relevance_score += requirement.weight * potential_gain
+        return relevance_score
+
+    def recommend(self, student: 'Student', semester: int, max_recommendations: int = 5) -> List[Tuple[Course, float]]:
+        """Топ курсов семестра для студента: [(курс, релевантность)] по убыванию релевантности"""
+        courses = self.courses_by_semester.get(semester, [])
+        completed_codes = {c.course.code for c in student.completed_courses}
+
+        def available(position: int) -> bool:
+            course = courses[position]
+            return course.code not in completed_codes and self._can_enroll(student, course)
+
+        missing = self._missing_requirements(student)
+        if max_recommendations <= 0:
+            return self._rank_all(student, courses, missing, available)[:max_recommendations]
+
+        if not missing:
+            # Все навыки есть: у всех курсов базовая релевантность, порядок - как в семестре
+            result = []
+            for position in range(len(courses)):
+                if available(position):
+                    result.append((courses[position], 0.5))
+                    if len(result) == max_recommendations:
+                        break
+            return result
+
+        # Ненулевую релевантность могут дать только курсы, развивающие недостающие навыки
+        index = self.skill_courses.get(semester, {})
+        candidates = {position for code in missing for position in index.get(code, ())}
+        scores = {
+            position: self._relevance(student, courses[position], missing)
+            for position in candidates if available(position)
+        }
+
+        positive = [(-score, position) for position, score in scores.items() if score > 0]
+        top = heapq.nsmallest(max_recommendations, positive)
+        result = [(courses[position], -score) for score, position in top]
+
+        # Курсы с нулевой релевантностью идут в порядке семестра
+        if len(result) < max_recommendations:
+            for position in range(len(courses)):
+                score = scores.get(position)
+                if score == 0 or (score is None and position not in candidates and available(position)):
+                    result.append((courses[position], 0.0 if score is None else score))
+                    if len(result) == max_recommendations:
+                        break
+
+        if len(result) < max_recommendations:
+            negative = [(-score, position) for position, score in scores.items() if score < 0]
+            for score, position in heapq.nsmallest(max_recommendations - len(result), negative):
+                result.append((courses[position], -score))
+
+        return result
+
+    def _rank_all(self, student: 'Student', courses: List[Course], missing: Dict[str, SkillRequirement],
+                  available) -> List[Tuple[Course, float]]:
+        """Полное ранжирование семестра (для нестандартных max_recommendations)"""
+        ranked = [
+            (courses[position], self._relevance(student, courses[position], missing) if missing else 0.5)
+            for position in range(len(courses)) if available(position)
+        ]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked
+
+
 def create_skill_tree() -> Dict[str, Skill]:
     """
     Создать иерархическое дерево навыков для IT-специальностей
@@ -621,5 +756,6 @@ __all__ = [
     'CourseCompletion',
     'MasterProgram',
     'Student',
+    'RecommendationEngine',
     'create_skill_tree'
 ]
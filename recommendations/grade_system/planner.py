@@ -0,0 +1,383 @@
+"""
+Планировщик траектории на несколько семестров вперёд
+Лучевой поиск (beam search) по последовательностям курсов: в каждом семестре учитываются пререквизиты,
+лимит кредитов и min_electives, навыки пересчитываются через SkillGain.calculate_gain при заданной успеваемости.
+Цель - как можно раньше выполнить target_skills программы.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from grades import Course, CourseDifficulty, MasterProgram, SkillLevel, SkillRequirement, Student
+
+DEFAULT_PERFORMANCE = 0.8
+DEFAULT_MAX_CREDITS = 30
+DEFAULT_BEAM_WIDTH = 16
+DEFAULT_BRANCHING = 4
+
+_NEVER = float('inf')
+
+
+@dataclass
+class TrajectoryPlan:
+    """Результат планирования"""
+    semesters: Dict[int, List[Course]]  # семестр -> курсы в порядке прохождения
+    skills: Dict[str, SkillLevel]  # ожидаемые навыки после плана
+    ready_semester: Optional[int]  # семестр, после которого выполнены target_skills (None - не успевает)
+    electives: int  # элективов в плане вместе с уже пройденными
+    missing_skills: List[SkillRequirement] = field(default_factory=list)
+
+    @property
+    def total_credits(self) -> int:
+        return sum(course.credits for courses in self.semesters.values() for course in courses)
+
+
+class _State:
+    """Состояние поиска после семестра; levels - уровни по индексам навыков планировщика"""
+    __slots__ = ('levels', 'completed', 'electives', 'credits', 'plan', 'gap', 'ready_at')
+
+    def __init__(self, levels: Tuple[int, ...], completed: FrozenSet[int], electives: int, credits: int,
+                 plan: Tuple[Tuple[int, ...], ...], gap: int, ready_at: float):
+        self.levels = levels
+        self.completed = completed
+        self.electives = electives
+        self.credits = credits
+        self.plan = plan
+        self.gap = gap
+        self.ready_at = ready_at
+
+
+class TrajectoryPlanner:
+    """
+    Состояния одного семестра дедуплицируются по (навыки, пройденные курсы), переходы навыков
+    мемоизируются по (навыки, курс), доминируемые состояния (навыки не выше, обязательных и элективов
+    не больше) отбрасываются, в следующий семестр переходят beam_width лучших.
+    Внутри семестра набор курсов тоже строится лучом: обязательные курсы берутся сразу, затем
+    на каждом шаге пробуются branching элективов с наибольшим сокращением разрыва до target_skills.
+    """
+
+    def __init__(self, program: MasterProgram, performance: float = DEFAULT_PERFORMANCE,
+                 max_credits: int = DEFAULT_MAX_CREDITS, beam_width: int = DEFAULT_BEAM_WIDTH,
+                 branching: int = DEFAULT_BRANCHING):
+        self.program = program
+        self.performance = performance
+        self.max_credits = max_credits
+        self.beam_width = max(1, beam_width)
+        self.branching = max(1, branching)
+
+        self.courses: List[Course] = program.get_all_courses()
+        self.is_required = [i < len(program.required_courses) for i in range(len(self.courses))]
+
+        codes = {req.skill.code for req in program.target_skills}
+        for course in self.courses:
+            codes.update(req.skill.code for req in course.prerequisites)
+            codes.update(gain.skill.code for gains in course.skill_gains.values() for gain in gains)
+        self.skill_codes = sorted(codes)
+        self.skill_index = {code: i for i, code in enumerate(self.skill_codes)}
+
+        self.targets = [(self.skill_index[req.skill.code], req.required_level.value) for req in program.target_skills]
+        self.prerequisites = [
+            [(self.skill_index[req.skill.code], req.required_level.value) for req in course.prerequisites]
+            for course in self.courses
+        ]
+        # Для сложности курса (как Course.get_difficulty_for_student) и приращений по сложностям
+        self.max_score = [sum(required for _, required in prerequisites) for prerequisites in self.prerequisites]
+        self.gains = [
+            {difficulty: [(self.skill_index[gain.skill.code], gain) for gain in course.get_skill_gains_for_difficulty(difficulty)]
+             for difficulty in CourseDifficulty}
+            for course in self.courses
+        ]
+        # Навык -> требуемые уровни; курс -> развиваемые им навыки из target_skills (на любой сложности)
+        self.target_levels: Dict[int, List[int]] = {}
+        for skill, required in self.targets:
+            self.target_levels.setdefault(skill, []).append(required)
+        self.target_gains = [
+            sorted({i for gains in by_difficulty.values() for i, _ in gains if i in self.target_levels})
+            for by_difficulty in self.gains
+        ]
+        self.target_requirements = [
+            [(i, required) for i in skills for required in self.target_levels[i]] for skills in self.target_gains
+        ]
+        self.developed = [frozenset(i for gains in by_difficulty.values() for i, _ in gains) for by_difficulty in self.gains]
+        # Приращения без SkillLevel: (навык, int(base_gain * performance), максимальный уровень), как в calculate_gain
+        self.steps = [
+            {difficulty: [(i, int(gain.base_gain * performance), gain.max_level.value) for i, gain in gains]
+             for difficulty, gains in by_difficulty.items()}
+            for by_difficulty in self.gains
+        ]
+        self.target_courses = [course_id for course_id, skills in enumerate(self.target_gains) if skills]
+        # Навык -> курсы, которые его развивают; навык -> курсы, сложность которых от него зависит
+        self.courses_by_skill: Dict[int, List[int]] = {}
+        for course_id, skills in enumerate(self.target_gains):
+            for i in skills:
+                self.courses_by_skill.setdefault(i, []).append(course_id)
+        self.courses_by_prerequisite: Dict[int, List[int]] = {}
+        for course_id, prerequisites in enumerate(self.prerequisites):
+            for i in {skill for skill, _ in prerequisites}:
+                self.courses_by_prerequisite.setdefault(i, []).append(course_id)
+
+        self._transitions: Dict[Tuple[Tuple[int, ...], int], Tuple[int, ...]] = {}
+
+    # --- Модель навыков ---
+    def _gap(self, levels: Tuple[int, ...]) -> int:
+        """Суммарный недобор уровней до target_skills"""
+        return sum(required - levels[skill] for skill, required in self.targets if levels[skill] < required)
+
+    def _gap_reduction(self, levels: Tuple[int, ...], new_levels: Tuple[int, ...], course_id: int) -> int:
+        """Насколько курс сократил _gap: считается только по его навыкам из target_skills"""
+        # Уровни только растут, поэтому по каждому требованию разрыв сокращается на min(новый, требуемый) - старый
+        return sum(
+            min(new_levels[i], required) - levels[i]
+            for i, required in self.target_requirements[course_id] if levels[i] < required
+        )
+
+    def _can_enroll(self, levels: Tuple[int, ...], course_id: int) -> bool:
+        return all(levels[skill] >= required for skill, required in self.prerequisites[course_id])
+
+    def _difficulty(self, levels: Tuple[int, ...], course_id: int) -> CourseDifficulty:
+        """Course.get_difficulty_for_student по уровням планировщика"""
+        if not self.courses[course_id].adaptive:
+            return CourseDifficulty.INTERMEDIATE
+        max_score = self.max_score[course_id]
+        if max_score == 0:
+            return CourseDifficulty.BEGINNER
+
+        ratio = sum(levels[skill] for skill, _ in self.prerequisites[course_id]) / max_score
+        if ratio < 0.7:
+            return CourseDifficulty.BEGINNER
+        elif ratio < 1.3:
+            return CourseDifficulty.INTERMEDIATE
+        return CourseDifficulty.ADVANCED
+
+    def _apply(self, levels: Tuple[int, ...], course_id: int) -> Tuple[int, ...]:
+        """Навыки после курса (как Student.complete_course при заданной успеваемости)"""
+        new_levels = list(levels)
+        for i, increase, max_level in self.steps[course_id][self._difficulty(levels, course_id)]:
+            current = new_levels[i]
+            if current < max_level and increase > 0:
+                new_levels[i] = min(current + increase, max_level)
+        return tuple(new_levels)
+
+    def _complete(self, levels: Tuple[int, ...], course_id: int) -> Tuple[int, ...]:
+        """_apply с мемоизацией - для переходов, которые могут войти в план"""
+        key = (levels, course_id)
+        result = self._transitions.get(key)
+        if result is None:
+            result = self._transitions[key] = self._apply(levels, course_id)
+        return result
+
+    # --- Поиск ---
+    def plan(self, student: Student) -> TrajectoryPlan:
+        """План на семестры от student.current_semester до program.duration_semesters"""
+        levels = tuple(student.get_skill_level(code).value for code in self.skill_codes)
+        completed_codes = {c.course.code for c in student.completed_courses}
+        completed = frozenset(i for i, course in enumerate(self.courses) if course.code in completed_codes)
+        electives = sum(1 for i in completed if not self.is_required[i])
+
+        gap = self._gap(levels)
+        start = student.current_semester
+        beam = [_State(levels, completed, electives, 0, (), gap, start - 1 if gap == 0 else _NEVER)]
+
+        last = self.program.duration_semesters
+        for semester in range(start, last + 1):
+            candidates = []
+            seen = set()
+            for state in beam:
+                for candidate in self._expand(state, semester):
+                    key = (candidate.levels, candidate.completed)
+                    if key not in seen:
+                        seen.add(key)
+                        candidates.append(candidate)
+            beam = self._select(candidates)
+
+        best = min(beam, key=lambda s: (self._shortfall(s), s.ready_at, s.gap, s.credits))
+        return self._to_plan(best, student, start)
+
+    def _shortfall(self, state: _State) -> int:
+        return max(0, self.program.min_electives - state.electives)
+
+    def _key(self, state: _State):
+        return state.ready_at, state.gap, self._shortfall(state), state.credits
+
+    def _dominates(self, a: _State, b: _State) -> bool:
+        if a.electives < min(b.electives, self.program.min_electives):
+            return False
+        required_b = {i for i in b.completed if self.is_required[i]}
+        if not required_b <= a.completed:
+            return False
+        return all(x >= y for x, y in zip(a.levels, b.levels))
+
+    def _select(self, candidates: List[_State]) -> List[_State]:
+        candidates.sort(key=self._key)
+        kept: List[_State] = []
+        for candidate in candidates:
+            if any(self._dominates(other, candidate) for other in kept):
+                continue
+            kept.append(candidate)
+            if len(kept) == self.beam_width:
+                break
+        return kept
+
+    def _expand(self, state: _State, semester: int) -> List[_State]:
+        """Варианты набора курсов на семестр из данного состояния"""
+        eligible = [
+            i for i, course in enumerate(self.courses)
+            if i not in state.completed and course.semester <= semester and self._can_enroll(state.levels, i)
+        ]
+
+        # Обязательные курсы своего семестра (и отставшие) берутся в первую очередь
+        levels, credits, chosen = state.levels, 0, []
+        for i in eligible:
+            if self.is_required[i] and credits + self.courses[i].credits <= self.max_credits:
+                levels = self._complete(levels, i)
+                credits += self.courses[i].credits
+                chosen.append(i)
+        electives = [i for i in eligible if not self.is_required[i]]
+        elective_ids = set(electives)
+
+        # Элективы, которые открывают закрытые пререквизитами курсы по target_skills на следующий семестр;
+        # нужны, только если прямых вариантов меньше branching, поэтому считаются по первому запросу
+        opens = None
+
+        # Луч по наборам элективов: (навыки, кредиты, выбранные курсы, разрыв, сокращение разрыва по элективам)
+        candidates = {i for skill, _ in self.targets for i in self.courses_by_skill.get(skill, ())} & elective_ids
+        partials = [(levels, credits, tuple(chosen), self._gap(levels), self._gains(levels, candidates))]
+        bundles = list(partials)
+        seen = {frozenset(chosen)}
+        while partials:
+            extended = []
+            for levels, credits, chosen, gap, gains in partials:
+                options = heapq.nsmallest(self.branching, (
+                    (-gain, self.courses[i].credits, i) for i, gain in gains.items()
+                    if credits + self.courses[i].credits <= self.max_credits
+                ))
+                # Открывающие элективы разрыв сейчас не сокращают - они идут, только если остались ветви
+                if len(options) < self.branching:
+                    if opens is None:
+                        opens = self._opens(state, electives)
+                    if opens:
+                        options += self._unlock_options(levels, credits, chosen, gains, opens)
+                for negative_gain, course_credits, i in options[:self.branching]:
+                    bundle = chosen + (i,)
+                    key = frozenset(bundle)
+                    if key not in seen:
+                        seen.add(key)
+                        extended.append((gap + negative_gain, credits + course_credits, bundle, levels, gains))
+
+            # Навыки и сокращения разрыва считаются только для продолжений, попавших в луч
+            extended.sort(key=lambda p: p[:2])
+            partials = []
+            for gap, credits, bundle, levels, gains in extended[:self.branching]:
+                i = bundle[-1]
+                new_levels = self._complete(levels, i)
+                # Пересчитываются только элективы, чьи развиваемые навыки или пререквизиты изменил курс
+                changed = [skill for skill, (old, new) in enumerate(zip(levels, new_levels)) if old != new]
+                affected = {
+                    j for skill in changed
+                    for j in (*self.courses_by_skill.get(skill, ()), *self.courses_by_prerequisite.get(skill, ()))
+                } & candidates
+                new_gains = {j: gain for j, gain in gains.items() if j not in affected and j != i}
+                new_gains.update(self._gains(new_levels, affected.difference(bundle)))
+                partials.append((new_levels, credits, bundle, gap, new_gains))
+            bundles.extend(partials)
+
+        return [self._finish(state, semester, bundle, electives) for bundle in bundles]
+
+    def _gains(self, levels: Tuple[int, ...], courses) -> Dict[int, int]:
+        """Сокращение разрыва для курсов, которые его сокращают"""
+        result = {}
+        for i in courses:
+            gain = self._gap_reduction(levels, self._complete(levels, i), i)
+            if gain > 0:
+                result[i] = gain
+        return result
+
+    def _opens(self, state: _State, electives: List[int]) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Электив -> [(курс, сокращение разрыва курсом)] для закрытых пререквизитами курсов по target_skills,
+        которые электив открывает из state
+        """
+        levels = state.levels
+        # Закрытые курсы, сокращающие разрыв: навык -> курсы, которым его не хватает; курс -> число недостающих навыков
+        blocked: Dict[int, List[int]] = {}
+        shortage: Dict[int, int] = {}
+        for j in self.target_courses:
+            # Уровни только растут: курс без невыполненных target_skills разрыв уже не сократит
+            if j in state.completed or all(levels[i] >= required for i, required in self.target_requirements[j]):
+                continue
+            short = {skill for skill, required in self.prerequisites[j] if levels[skill] < required}
+            if short:
+                shortage[j] = len(short)
+                for skill in short:
+                    blocked.setdefault(skill, []).append(j)
+
+        result = {}
+        for i in electives:
+            raised = self.developed[i].intersection(blocked)
+            if not raised:
+                continue
+            new_levels = self._apply(levels, i)
+            # Курс может открыться, только если электив поднял все недостающие ему навыки
+            covered: Dict[int, int] = {}
+            for skill in raised:
+                if new_levels[skill] != levels[skill]:
+                    for j in blocked[skill]:
+                        covered[j] = covered.get(j, 0) + 1
+            opened = [j for j, count in covered.items() if count == shortage[j] and self._can_enroll(new_levels, j)]
+            # Оценки открытых курсов нужны только для ранжирования и в память переходов не попадают
+            values = [(j, self._gap_reduction(new_levels, self._apply(new_levels, j), j)) for j in sorted(opened)]
+            values = [(j, value) for j, value in values if value > 0]
+            if values:
+                result[i] = values
+        return result
+
+    def _unlock_options(self, levels: Tuple[int, ...], credits: int, chosen: Tuple[int, ...], gains: Dict[int, int],
+                        opens: Dict[int, List[Tuple[int, int]]]) -> List[Tuple[int, int, int]]:
+        """
+        Варианты ветвления из открывающих элективов (как в _expand, с нулевым сокращением разрыва),
+        по убыванию лучшего ещё закрытого курса, который они открывают
+        """
+        ranked = []
+        for i, opened in opens.items():
+            if i in chosen or i in gains or credits + self.courses[i].credits > self.max_credits:
+                continue
+            value = max((value for j, value in opened if not self._can_enroll(levels, j)), default=0)
+            if value > 0:
+                ranked.append((-value, self.courses[i].credits, i))
+        ranked.sort()
+        return [(0, course_credits, i) for _, course_credits, i in ranked]
+
+    def _finish(self, state: _State, semester: int, bundle, electives: List[int]) -> _State:
+        levels, credits, chosen = bundle[:3]
+        chosen = list(chosen)
+        taken_electives = state.electives + sum(1 for i in chosen if not self.is_required[i])
+
+        # Добираем до min_electives самыми лёгкими по кредитам элективами
+        if taken_electives < self.program.min_electives:
+            for i in sorted(electives, key=lambda i: self.courses[i].credits):
+                if taken_electives >= self.program.min_electives:
+                    break
+                if i in chosen or credits + self.courses[i].credits > self.max_credits:
+                    continue
+                levels = self._complete(levels, i)
+                credits += self.courses[i].credits
+                chosen.append(i)
+                taken_electives += 1
+
+        gap = self._gap(levels)
+        ready_at = state.ready_at if state.ready_at != _NEVER else (semester if gap == 0 else _NEVER)
+        return _State(levels, state.completed | frozenset(chosen), taken_electives, state.credits + credits,
+                      state.plan + (tuple(chosen),), gap, ready_at)
+
+    def _to_plan(self, state: _State, student: Student, start: int) -> TrajectoryPlan:
+        skills = dict(student.skills)
+        skills.update({code: SkillLevel(state.levels[i]) for code, i in self.skill_index.items() if state.levels[i]})
+        _, missing = self.program.check_graduation_requirements(skills)
+        return TrajectoryPlan(
+            semesters={start + offset: [self.courses[i] for i in chosen] for offset, chosen in enumerate(state.plan)},
+            skills=skills,
+            ready_semester=None if state.ready_at == _NEVER else int(state.ready_at),
+            electives=state.electives,
+            missing_skills=missing,
+        )
@@ -6,6 +6,7 @@
 import json
 from typing import Dict, Optional, List
 from grades import Skill, SkillLevel
+from skill_hierarchy import SkillHierarchy
 
 
 class SkillTreeParser:
@@ -15,6 +16,7 @@ class SkillTreeParser:
         self.json_file_path = json_file_path
         self.skills_dict: Dict[str, Skill] = {}
         self.root_skills: List[Skill] = []
+        self.hierarchy: Optional[SkillHierarchy] = None
 
     def parse(self) -> Dict[str, Skill]:
         """
@@ -32,6 +34,7 @@ class SkillTreeParser:
         for category_key, category_data in skills_tree.items():
             root_skill = self._parse_skill_recursive(category_data, parent_skill=None)
             self.root_skills.append(root_skill)
+        self.hierarchy = SkillHierarchy.from_skills(self.skills_dict)
 
         print(f"✅ Загружено {len(self.skills_dict)} навыков")
         print(f"📊 Корневых категорий: {len(self.root_skills)}")
@@ -157,8 +160,11 @@ class SkillTreeParser:
 
     def _count_all_skills(self, skill: Skill) -> int:
         """
-        Рекурсивно подсчитать количество всех навыков в ветке
+        Подсчитать количество всех навыков в ветке
         """
+        if self.hierarchy is not None and skill.code in self.hierarchy:
+            return self.hierarchy.subtree_size(skill.code)
+
         count = 1  # Текущий навык
 
         for child in skill.children_skills:
@@ -183,6 +189,9 @@ class SkillTreeParser:
         """
         Получить полный путь навыка от корня
         """
+        if self.hierarchy is not None and skill.code in self.hierarchy:
+            return self.hierarchy.skill_path(skill.code)
+
         path_parts = []
         current = skill
 
@@ -0,0 +1,194 @@
+"""
+Неизменяемый индекс иерархии навыков
+Дерево обходится один раз в глубину (Euler tour): навык получает номер входа и границу выхода,
+поддерево навыка - номера [вход, выход). Проверки "предок/потомок" и размер поддерева - O(1),
+список потомков - срез, полные пути и глубины посчитаны заранее.
+"""
+
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from grades import Skill, SkillLevel
+
+SKILL_TREE_FILE = "skill_tree.json"
+DEFAULT_CHILD_CREDIT = 0.5  # Доля уровня лучшего подскилла, засчитываемая родительскому навыку
+
+
+class SkillHierarchy:
+    """
+    Индекс дерева навыков по кодам
+    Строится из skill_tree.json (from_json) или словаря Skill (from_skills) и после этого не меняется
+    """
+    __slots__ = ('codes', 'names', 'position', 'exit', 'depths', 'parents', 'children_codes',
+                 'full_paths', 'skill_paths')
+
+    def __init__(self, roots: Iterable[Tuple[str, str, Iterable]]):
+        """roots - узлы верхнего уровня вида (код, имя, дочерние узлы того же вида)"""
+        codes: List[str] = []
+        names: List[str] = []
+        exits: List[int] = []
+        depths: List[int] = []
+        parents: List[Optional[str]] = []
+        position: Dict[str, int] = {}
+        children_codes: Dict[str, List[str]] = {}
+        full_paths: List[str] = []
+        skill_paths: List[str] = []
+
+        # Обход в глубину без рекурсии; число в стеке - выход из поддерева навыка с этим номером
+        stack: list = [(node, None) for node in reversed(list(roots))]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, int):
+                exits[item] = len(codes)
+                continue
+
+            (code, name, children), parent = item
+            if code in position:
+                raise ValueError(f"Код навыка {code} встречается в дереве дважды")
+            i = position[code] = len(codes)
+            codes.append(code)
+            names.append(name)
+            exits.append(i + 1)
+            parents.append(parent)
+            children_codes[code] = []
+            if parent is None:
+                depths.append(0)
+                full_paths.append(name)
+                skill_paths.append(name)
+            else:
+                p = position[parent]
+                depths.append(depths[p] + 1)
+                full_paths.append(f"{full_paths[p]}.{name}")
+                skill_paths.append(f"{skill_paths[p]} → {name}")
+                children_codes[parent].append(code)
+
+            stack.append(i)
+            stack.extend((child, code) for child in reversed(list(children)))
+
+        self.codes: Tuple[str, ...] = tuple(codes)
+        self.names: Tuple[str, ...] = tuple(names)
+        self.position = position
+        self.exit: Tuple[int, ...] = tuple(exits)
+        self.depths: Tuple[int, ...] = tuple(depths)
+        self.parents: Tuple[Optional[str], ...] = tuple(parents)
+        self.children_codes: Dict[str, Tuple[str, ...]] = {code: tuple(c) for code, c in children_codes.items()}
+        self.full_paths: Tuple[str, ...] = tuple(full_paths)
+        self.skill_paths: Tuple[str, ...] = tuple(skill_paths)
+
+    @classmethod
+    def from_tree(cls, skills_tree: Dict) -> 'SkillHierarchy':
+        """Из раздела skills_tree файла skill_tree.json"""
+        def node(data: Dict):
+            return data['code'], data['name'], (node(child) for child in data.get('children', {}).values())
+
+        return cls(node(data) for data in skills_tree.values())
+
+    @classmethod
+    def from_json(cls, json_file_path: str = SKILL_TREE_FILE) -> 'SkillHierarchy':
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            return cls.from_tree(json.load(f).get('skills_tree', {}))
+
+    @classmethod
+    def from_skills(cls, skills: Dict[str, Skill]) -> 'SkillHierarchy':
+        """Из словаря {код: Skill} (create_skill_tree, SkillTreeParser.parse); корни - навыки без родителя"""
+        def node(skill: Skill):
+            return skill.code, skill.name, (node(child) for child in skill.children_skills)
+
+        return cls(node(skill) for skill in skills.values() if skill.parent_skill is None)
+
+    # --- Запросы ---
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.position
+
+    def _position(self, code: str) -> int:
+        try:
+            return self.position[code]
+        except KeyError:
+            raise KeyError(f"Навык {code} отсутствует в иерархии") from None
+
+    @property
+    def roots(self) -> List[str]:
+        return [code for code, parent in zip(self.codes, self.parents) if parent is None]
+
+    def parent(self, code: str) -> Optional[str]:
+        return self.parents[self._position(code)]
+
+    def children(self, code: str) -> Tuple[str, ...]:
+        self._position(code)
+        return self.children_codes[code]
+
+    def depth(self, code: str) -> int:
+        """0 - корневая категория"""
+        return self.depths[self._position(code)]
+
+    def full_path(self, code: str) -> str:
+        """Имена от корня через точку (как Skill.get_full_path)"""
+        return self.full_paths[self._position(code)]
+
+    def skill_path(self, code: str) -> str:
+        """Имена от корня через стрелку (как SkillTreeParser.get_skill_path)"""
+        return self.skill_paths[self._position(code)]
+
+    def subtree_size(self, code: str) -> int:
+        """Навыков в ветке вместе с самим навыком"""
+        i = self._position(code)
+        return self.exit[i] - i
+
+    def in_subtree(self, code: str, root: str) -> bool:
+        """code - сам root или его потомок"""
+        i, r = self.position.get(code), self._position(root)
+        return i is not None and r <= i < self.exit[r]
+
+    def is_child_of(self, code: str, ancestor: str) -> bool:
+        """code - строгий потомок ancestor (как Skill.is_child_of)"""
+        return code != ancestor and self.in_subtree(code, ancestor)
+
+    def descendants(self, code: str) -> Tuple[str, ...]:
+        """Все потомки в порядке обхода в глубину, без самого навыка"""
+        i = self._position(code)
+        return self.codes[i + 1:self.exit[i]]
+
+    def ancestors(self, code: str) -> List[str]:
+        """Предки от родителя к корню"""
+        result = []
+        parent = self.parent(code)
+        while parent is not None:
+            result.append(parent)
+            parent = self.parents[self.position[parent]]
+        return result
+
+    # --- Уровни с учётом подскиллов ---
+    def best_descendant_level(self, skills: Dict[str, SkillLevel], code: str) -> int:
+        """
+        Максимальный уровень среди потомков навыка у студента
+        Перебираются навыки студента (их обычно меньше, чем потомков), каждый проверяется за O(1)
+        """
+        r = self._position(code)
+        end = self.exit[r]
+        best = 0
+        for skill_code, level in skills.items():
+            i = self.position.get(skill_code)
+            if i is not None and r < i < end and level.value > best:
+                best = level.value
+        return best
+
+    def effective_level(self, skills: Dict[str, SkillLevel], code: str,
+                        child_credit: float = DEFAULT_CHILD_CREDIT) -> SkillLevel:
+        """
+        Уровень навыка с частичным зачётом подскиллов: собственный уровень или
+        child_credit от лучшего уровня среди потомков, если это больше
+        """
+        own = skills.get(code, SkillLevel.LEVEL_0).value
+        if code not in self.position:
+            return SkillLevel(own)
+        return SkillLevel(max(own, int(self.best_descendant_level(skills, code) * child_credit)))
+
+
+@lru_cache(maxsize=None)
+def load_skill_hierarchy(json_file_path: str = SKILL_TREE_FILE) -> SkillHierarchy:
+    """SkillHierarchy по файлу дерева навыков, один раз на процесс"""
+    return SkillHierarchy.from_json(json_file_path)
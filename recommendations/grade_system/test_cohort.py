@@ -0,0 +1,85 @@
+"""
+Тесты пакетных расчётов cohort.py против поштучных методов Student:
+CohortAnalyzer - против get_graduation_readiness и прежнего перебора курсов в recommend_courses,
+ProgramCatalog - против simulate_alternative_program
+"""
+
+import random
+import unittest
+
+from grades import MasterProgram, SkillLevel, Student
+from cohort import CohortAnalyzer, ProgramCatalog, compare_programs, get_program_catalog
+from test_grades import baseline_recommend, names, random_program, random_requirements, random_students
+
+
+class CohortAnalyzerTest(unittest.TestCase):
+    def test_matches_student_methods(self):
+        rnd = random.Random(3)
+        for _ in range(20):
+            program = random_program(rnd, rnd.choice([10, 50, 200]))
+            students = random_students(rnd, program, 30)
+            analyzer = CohortAnalyzer(program, chunk_size=rnd.choice([7, 2048]))
+
+            percentage, missing = analyzer.readiness(students)
+            for row, student in enumerate(students):
+                expected_percentage, expected_missing = student.get_graduation_readiness()
+                self.assertEqual(percentage[row], expected_percentage)
+                self.assertEqual([id(req) for req in expected_missing],
+                                 [id(req) for req, m in zip(program.target_skills, missing[row]) if m])
+
+            for semester in range(0, 6):
+                for k in (1, 5, 1000, 0):
+                    for student, recommendations in zip(students, analyzer.recommend(students, semester, k)):
+                        self.assertEqual(names(recommendations), names(baseline_recommend(student, semester, k)))
+
+    def test_empty_cohort(self):
+        analyzer = CohortAnalyzer(random_program(random.Random(4), 10))
+        self.assertEqual(analyzer.recommend([], 1), [])
+        self.assertEqual(len(analyzer.readiness([])[0]), 0)
+
+
+class ProgramCatalogTest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(5)
+        self.programs = [
+            MasterProgram(f"p{k}", f"p{k}", "", target_skills=random_requirements(rnd, rnd.choice([0, 1, 5, 20]), 10))
+            for k in range(15)
+        ]
+        self.students = random_students(rnd, self.programs[0], 50)
+
+    def expected(self, student: Student):
+        ranked = [(program, *student.simulate_alternative_program(program)) for program in self.programs]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked
+
+    def assert_matches(self, result):
+        self.assertEqual(len(result), len(self.students))
+        for student, ranked in zip(self.students, result):
+            self.assertEqual(
+                [(program.code, percentage, [id(req) for req in missing]) for program, percentage, missing in ranked],
+                [(program.code, percentage, [id(req) for req in missing])
+                 for program, percentage, missing in self.expected(student)]
+            )
+
+    def test_matches_simulate_alternative_program(self):
+        self.assert_matches(compare_programs(self.students, self.programs))
+        self.assert_matches(ProgramCatalog(self.programs).compare(self.students))
+
+    def test_cache_follows_requirement_changes(self):
+        catalog = get_program_catalog(self.programs)
+        self.assertIs(get_program_catalog(self.programs), catalog)
+
+        # Замена требования на месте и изменение уровня существующего требования
+        program = next(p for p in self.programs if len(p.target_skills) > 1)
+        program.target_skills[0] = random_requirements(random.Random(6), 1, 10)[0]
+        program.target_skills[1].required_level = SkillLevel.LEVEL_10
+        self.assertIsNot(get_program_catalog(self.programs), catalog)
+        self.assert_matches(compare_programs(self.students, self.programs))
+
+    def test_empty(self):
+        self.assertEqual(compare_programs([], self.programs), [])
+        self.assertEqual(ProgramCatalog([]).compare(self.students[:2]), [[], []])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Тесты компактного хранения навыков: SkillVector/SkillTable против Dict[str, SkillLevel] в Student.skills
+"""
+
+import random
+import unittest
+
+from compact import SkillIndex, SkillTable, SkillVector
+from grades import SkillLevel, Student
+from test_grades import SKILLS, random_program, random_students
+
+
+def nonzero(skills):
+    """unpack опускает нулевые уровни - get_skill_level для них и так вернёт LEVEL_0"""
+    return {code: level for code, level in skills.items() if level.value}
+
+
+class CompactSkillsTest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(0)
+        self.program = random_program(rnd, 50)
+        self.students = random_students(rnd, self.program, 30)
+        self.index = SkillIndex.from_skill_tree(SKILLS)
+
+    def test_round_trip(self):
+        table = SkillTable.from_students(self.index, self.students)
+        self.assertEqual(len(table), len(self.students))
+        for row, student in enumerate(self.students):
+            vector = SkillVector.from_student(self.index, student)
+            self.assertEqual(vector.to_skills(), nonzero(student.skills))
+            self.assertEqual(table.to_skills(row), nonzero(student.skills))
+            self.assertEqual(table.row(row), vector)
+            for code in SKILLS:
+                self.assertEqual(vector.get_skill_level(code), student.get_skill_level(code))
+                self.assertEqual(table.get_skill_level(row, code), student.get_skill_level(code))
+        self.assertEqual(list(table), [nonzero(student.skills) for student in self.students])
+
+    def test_unknown_skills(self):
+        # Индекс маленькой программы знает не все навыки дерева, у студентов они есть
+        index = SkillIndex.from_program(random_program(random.Random(2), 3))
+        table = SkillTable.from_students(index, self.students)
+        for row, student in enumerate(self.students):
+            expected = {code: level for code, level in nonzero(student.skills).items() if code in index}
+            self.assertEqual(SkillVector.from_student(index, student).to_skills(), expected)
+            self.assertEqual(table.to_skills(row), expected)
+            for code in SKILLS:
+                if code not in index:
+                    self.assertEqual(table.get_skill_level(row, code), SkillLevel.LEVEL_0)
+
+        unknown = next(code for code in SKILLS if code not in index)
+        with self.assertRaises(KeyError):
+            index.pack({unknown: SkillLevel.LEVEL_3}, strict=True)
+        with self.assertRaises(KeyError):
+            SkillTable(index).append({unknown: SkillLevel.LEVEL_3}, strict=True)
+
+    def test_update_skill_monotonic(self):
+        rnd = random.Random(1)
+        codes = list(SKILLS)
+        student = Student("1", "s", self.program)
+        vector = SkillVector(self.index)
+        table = SkillTable(self.index)
+        table.append({})
+        for _ in range(2000):
+            code, level = rnd.choice(codes), SkillLevel(rnd.randint(0, 10))
+            before = vector.get_skill_level(code)
+            student.update_skill(code, level)
+            vector.update_skill(code, level)
+            table.update_skill(0, code, level)
+            self.assertGreaterEqual(vector.get_skill_level(code).value, before.value)
+            self.assertEqual(vector.get_skill_level(code), student.get_skill_level(code))
+            self.assertEqual(table.get_skill_level(0, code), student.get_skill_level(code))
+        self.assertEqual(vector.to_skills(), nonzero(student.skills))
+
+    def test_to_numpy(self):
+        table = SkillTable.from_students(self.index, self.students)
+        matrix = table.to_numpy()
+        self.assertEqual(matrix.shape, (len(self.students), len(self.index)))
+        for row, student in enumerate(self.students):
+            for i, code in enumerate(self.index.codes):
+                self.assertEqual(matrix[row, i], student.get_skill_level(code).value)
+
+    def test_bytes_per_student(self):
+        table = SkillTable.from_students(self.index, self.students)
+        self.assertEqual(table.nbytes, len(self.students) * len(self.index))
+        self.assertEqual(table.nbytes // len(table), len(SKILLS))
+
+
+if __name__ == '__main__':
+    unittest.main()
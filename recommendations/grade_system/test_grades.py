@@ -0,0 +1,104 @@
+"""
+Тесты RecommendationEngine против прежнего перебора курсов в Student.recommend_courses
+Генераторы случайных программ и студентов используются и в других тестах grade_system
+"""
+
+import random
+import unittest
+
+from grades import (Course, CourseCompletion, CourseDifficulty, MasterProgram, SkillGain, SkillLevel,
+                    SkillRequirement, Student, create_skill_tree)
+
+SKILLS = create_skill_tree()
+SKILL_LIST = list(SKILLS.values())
+
+
+def baseline_recommend(student: Student, semester: int, max_recommendations: int = 5):
+    """Прежний Student.recommend_courses: перебор всех курсов семестра"""
+    _, missing_skills = student.get_graduation_readiness()
+    required, elective = student.program.get_courses_for_semester(semester)
+    completed_codes = {c.course.code for c in student.completed_courses}
+    recommendations = []
+    for course in required + elective:
+        if course.code in completed_codes:
+            continue
+        if not all(req.is_satisfied(student.get_skill_level(req.skill.code)) for req in course.prerequisites):
+            continue
+        recommendations.append((course, student._calculate_course_relevance(course, missing_skills)))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return recommendations[:max_recommendations]
+
+
+def random_requirements(rnd: random.Random, count: int, max_level: int = 4):
+    return [SkillRequirement(rnd.choice(SKILL_LIST), SkillLevel(rnd.randint(0, max_level)),
+                             rnd.choice([1.0, 0.5, 0.0, -0.5, 2.0]))
+            for _ in range(count)]
+
+
+def random_program(rnd: random.Random, n_courses: int) -> MasterProgram:
+    """Программа со случайными курсами; часть кодов курсов повторяется"""
+    courses = []
+    for i in range(n_courses):
+        gains = {difficulty: [SkillGain(rnd.choice(SKILL_LIST), rnd.randint(0, 4), SkillLevel(rnd.randint(0, 10)))
+                              for _ in range(rnd.randint(0, 4))]
+                 for difficulty in CourseDifficulty}
+        courses.append(Course(f"C{i % max(1, n_courses - 3)}", f"c{i}", "", rnd.random() < 0.5, rnd.randint(1, 4), 3,
+                              random_requirements(rnd, rnd.randint(0, 2)), gains, rnd.random() < 0.8))
+    return MasterProgram("p", "p", "",
+                         required_courses=[c for c in courses if not c.is_elective],
+                         elective_courses=[c for c in courses if c.is_elective],
+                         target_skills=random_requirements(rnd, rnd.randint(0, 25), 8))
+
+
+def random_students(rnd: random.Random, program: MasterProgram, count: int):
+    students = []
+    for i in range(count):
+        student = Student(str(i), "s", program)
+        for code in rnd.sample(list(SKILLS), rnd.randint(0, 30)):
+            student.skills[code] = SkillLevel(rnd.randint(0, 10))
+        courses = program.get_all_courses()
+        for course in rnd.sample(courses, min(rnd.randint(0, 5), len(courses))):
+            student.completed_courses.append(CourseCompletion(course, 80, CourseDifficulty.BEGINNER, None, 1))
+        students.append(student)
+    return students
+
+
+def names(recommendations):
+    return [(course.name, relevance) for course, relevance in recommendations]
+
+
+class RecommendationEngineTest(unittest.TestCase):
+    def test_matches_baseline(self):
+        rnd = random.Random(0)
+        for _ in range(40):
+            program = random_program(rnd, rnd.choice([10, 50, 200]))
+            for student in random_students(rnd, program, 5):
+                for semester in range(0, 6):
+                    for k in (1, 3, 5, 1000, 0, -2):
+                        self.assertEqual(names(student.recommend_courses(semester, k)),
+                                         names(baseline_recommend(student, semester, k)))
+
+    def test_rebuilt_after_replacing_courses_and_requirements(self):
+        rnd = random.Random(1)
+        program = random_program(rnd, 50)
+        student = random_students(rnd, program, 1)[0]
+        engine = program.get_recommendation_engine()
+        self.assertIs(program.get_recommendation_engine(), engine)
+
+        # Замена элементов на месте не меняет длины списков
+        program.elective_courses[0] = random_program(rnd, 5).get_all_courses()[0]
+        program.target_skills[:] = random_requirements(rnd, len(program.target_skills), 8)
+        self.assertIsNot(program.get_recommendation_engine(), engine)
+        for semester in range(1, 5):
+            self.assertEqual(names(student.recommend_courses(semester, 1000)),
+                             names(baseline_recommend(student, semester, 1000)))
+
+    def test_invalidate(self):
+        program = random_program(random.Random(2), 20)
+        engine = program.get_recommendation_engine()
+        program.invalidate_recommendation_engine()
+        self.assertIsNot(program.get_recommendation_engine(), engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
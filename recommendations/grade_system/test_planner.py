@@ -0,0 +1,136 @@
+"""
+Тесты TrajectoryPlanner: план проверяется пошаговым моделированием на Student
+(пререквизиты, семестр курса, лимит кредитов, повторы, итоговые навыки, семестр готовности)
+"""
+
+import random
+import time
+import unittest
+
+from grades import Course, CourseDifficulty, MasterProgram, SkillGain, SkillLevel, SkillRequirement, Student
+from planner import TrajectoryPlanner
+from test_grades import SKILLS, random_program
+
+PERFORMANCE = 0.8
+TIME_BUDGET = 1.0  # секунды на план
+
+
+def course(code: str, gains, prerequisites=(), is_elective=False, semester=1, credits=3) -> Course:
+    return Course(code, code, "", is_elective, semester, credits, list(prerequisites),
+                  {difficulty: list(gains) for difficulty in CourseDifficulty})
+
+
+class TrajectoryPlannerTest(unittest.TestCase):
+    def assert_valid_plan(self, program: MasterProgram, student: Student, plan, max_credits: int):
+        simulated = Student("sim", "sim", program)
+        simulated.skills = dict(student.skills)
+        done = {c.course.code for c in student.completed_courses}
+        electives = sum(1 for c in student.completed_courses if c.course.is_elective)
+        ready_semester = student.current_semester - 1 if simulated.get_graduation_readiness()[0] == 100.0 else None
+
+        for semester, courses in sorted(plan.semesters.items()):
+            self.assertLessEqual(sum(c.credits for c in courses), max_credits)
+            # Пререквизиты проверяются по навыкам на начало семестра
+            start_skills = dict(simulated.skills)
+            for c in courses:
+                self.assertLessEqual(c.semester, semester)
+                self.assertNotIn(c.code, done)
+                for req in c.prerequisites:
+                    self.assertTrue(req.is_satisfied(start_skills.get(req.skill.code, SkillLevel.LEVEL_0)),
+                                    (semester, c.name))
+
+                difficulty = c.get_difficulty_for_student(simulated.skills)
+                for gain in c.get_skill_gains_for_difficulty(difficulty):
+                    current = simulated.get_skill_level(gain.skill.code)
+                    increment = gain.calculate_gain(current, PERFORMANCE)
+                    if increment > 0:
+                        simulated.skills[gain.skill.code] = SkillLevel(current.value + increment)
+                done.add(c.code)
+                electives += c.is_elective
+            if ready_semester is None and simulated.get_graduation_readiness()[0] == 100.0:
+                ready_semester = semester
+
+        nonzero = lambda skills: {code: level for code, level in skills.items() if level.value}
+        self.assertEqual(nonzero(plan.skills), nonzero(simulated.skills))
+        self.assertEqual(plan.ready_semester, ready_semester)
+        self.assertEqual(plan.electives, electives)
+        self.assertEqual([id(r) for r in plan.missing_skills],
+                         [id(r) for r in simulated.get_graduation_readiness()[1]])
+
+    def test_random_programs(self):
+        for seed in range(8):
+            rnd = random.Random(seed)
+            program = random_program(rnd, 300)
+            # Уникальные коды курсов, чтобы пройденные курсы однозначно определялись по коду
+            for i, c in enumerate(program.get_all_courses()):
+                c.code = f"C{i}"
+            program.elective_courses += program.required_courses[15:]
+            for c in program.required_courses[15:]:
+                c.is_elective = True
+            program.required_courses = program.required_courses[:15]
+            program.min_electives = 5
+            program.invalidate_recommendation_engine()
+
+            student = Student("s", "s", program, current_semester=rnd.randint(1, 2))
+            for code in rnd.sample(list(SKILLS), 10):
+                student.skills[code] = SkillLevel(rnd.randint(0, 5))
+
+            max_credits = rnd.choice([12, 30])
+            plan = TrajectoryPlanner(program, performance=PERFORMANCE, max_credits=max_credits).plan(student)
+            self.assertEqual(min(plan.semesters), student.current_semester)
+            self.assertEqual(max(plan.semesters), program.duration_semesters)
+            self.assert_valid_plan(program, student, plan, max_credits)
+
+    def test_time_budget(self):
+        # Несколько сотен элективов планируются быстрее секунды
+        for seed in range(3):
+            rnd = random.Random(seed)
+            program = random_program(rnd, 400)
+            for i, c in enumerate(program.get_all_courses()):
+                c.code = f"C{i}"
+            program.elective_courses += program.required_courses[10:]
+            for c in program.required_courses[10:]:
+                c.is_elective = True
+            program.required_courses = program.required_courses[:10]
+            student = Student("s", "s", program)
+            for code in rnd.sample(list(SKILLS), 10):
+                student.skills[code] = SkillLevel(rnd.randint(0, 5))
+
+            started = time.perf_counter()
+            plan = TrajectoryPlanner(program, performance=PERFORMANCE).plan(student)
+            self.assertLess(time.perf_counter() - started, TIME_BUDGET)
+            self.assert_valid_plan(program, student, plan, 30)
+
+    def test_prerequisite_chain(self):
+        x, y = SKILLS['ml.sklearn'], SKILLS['python']
+        base = course("BASE", [SkillGain(y, 4, SkillLevel.LEVEL_5)], is_elective=True)
+        advanced = course("ADV", [SkillGain(x, 4, SkillLevel.LEVEL_3)],
+                          prerequisites=[SkillRequirement(y, SkillLevel.LEVEL_2)], is_elective=True)
+        noise = course("NOISE", [], is_elective=True)
+        program = MasterProgram("p", "p", "", elective_courses=[advanced, noise, base],
+                                target_skills=[SkillRequirement(x, SkillLevel.LEVEL_3)], min_electives=0)
+        student = Student("s", "s", program)
+
+        # Базовый курс сам target_skills не развивает, но открывает продвинутый на следующий семестр
+        for max_credits in (3, 30):
+            plan = TrajectoryPlanner(program, performance=PERFORMANCE, max_credits=max_credits).plan(student)
+            self.assertEqual(plan.ready_semester, 2)
+            self.assertEqual([c.code for c in plan.semesters[1]], ["BASE"])
+            self.assertEqual([c.code for c in plan.semesters[2]], ["ADV"])
+            self.assertFalse(plan.missing_skills)
+            self.assert_valid_plan(program, student, plan, max_credits)
+
+    def test_unreachable_target(self):
+        skill = SKILLS['python']
+        program = MasterProgram("p", "p", "", elective_courses=[course("E", [SkillGain(skill, 4, SkillLevel.LEVEL_2)],
+                                                                       is_elective=True)],
+                                target_skills=[SkillRequirement(skill, SkillLevel.LEVEL_8)], min_electives=0)
+        student = Student("s", "s", program)
+        plan = TrajectoryPlanner(program).plan(student)
+        self.assertIsNone(plan.ready_semester)
+        self.assertEqual(len(plan.missing_skills), 1)
+        self.assert_valid_plan(program, student, plan, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Тесты SkillHierarchy против обхода дерева через Skill (is_child_of, get_full_path, рекурсивный подсчёт ветки)
+на skill_tree.json, effective_level и пререквизиты RecommendationEngine с учётом подскиллов
+"""
+
+import contextlib
+import io
+import os
+import random
+import unittest
+
+from grades import Course, MasterProgram, RecommendationEngine, SkillLevel, SkillRequirement, Student
+from read_skill_tree import SkillTreeParser
+from skill_hierarchy import DEFAULT_CHILD_CREDIT, SkillHierarchy
+from test_grades import SKILLS, names, random_program, random_students
+
+SKILL_TREE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_tree.json')
+
+
+def count_all_skills(skill) -> int:
+    """Прежний рекурсивный подсчёт навыков ветки (SkillTreeParser._count_all_skills)"""
+    return 1 + sum(count_all_skills(child) for child in skill.children_skills)
+
+
+def all_descendants(skill):
+    result = []
+    for child in skill.children_skills:
+        result.append(child.code)
+        result.extend(all_descendants(child))
+    return result
+
+
+class SkillHierarchyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.skills = SkillTreeParser(SKILL_TREE_FILE).parse()
+        cls.hierarchy = SkillHierarchy.from_json(SKILL_TREE_FILE)
+
+    def test_matches_skill_tree(self):
+        self.assertEqual(len(self.hierarchy), len(self.skills))
+        self.assertEqual(SkillHierarchy.from_skills(self.skills).codes, self.hierarchy.codes)
+        for code, skill in self.skills.items():
+            self.assertEqual(self.hierarchy.full_path(code), skill.get_full_path())
+            self.assertEqual(self.hierarchy.subtree_size(code), count_all_skills(skill))
+            self.assertEqual(list(self.hierarchy.descendants(code)), all_descendants(skill))
+            self.assertEqual(self.hierarchy.parent(code), skill.parent_skill.code if skill.parent_skill else None)
+
+    def test_ancestry_matches_is_child_of(self):
+        rnd = random.Random(0)
+        codes = list(self.skills)
+        pairs = [(rnd.choice(codes), rnd.choice(codes)) for _ in range(5000)]
+        # Пары родитель-потомок и навык сам с собой, случайных пар-предков мало
+        pairs += [(code, ancestor) for code in codes for ancestor in self.hierarchy.ancestors(code)]
+        pairs += [(code, code) for code in codes]
+        for code, ancestor in pairs:
+            expected = self.skills[code].is_child_of(self.skills[ancestor])
+            self.assertEqual(self.hierarchy.is_child_of(code, ancestor), expected, (code, ancestor))
+            self.assertEqual(self.hierarchy.in_subtree(code, ancestor), expected or code == ancestor)
+        self.assertFalse(self.hierarchy.in_subtree('нет такого', codes[0]))
+
+    def test_duplicate_code(self):
+        with self.assertRaises(ValueError):
+            SkillHierarchy([('a', 'A', [('b', 'B', [('a', 'A', [])])])])
+        with self.assertRaises(ValueError):
+            SkillHierarchy([('a', 'A', []), ('a', 'A', [])])
+
+    def test_effective_level(self):
+        hierarchy = SkillHierarchy.from_skills(SKILLS)
+        skills = {'python.django': SkillLevel.LEVEL_6, 'python.flask': SkillLevel.LEVEL_3,
+                  'programming': SkillLevel.LEVEL_1}
+        self.assertEqual(hierarchy.best_descendant_level(skills, 'python'), 6)
+        self.assertEqual(hierarchy.effective_level(skills, 'python'), SkillLevel(int(6 * DEFAULT_CHILD_CREDIT)))
+        self.assertEqual(hierarchy.effective_level(skills, 'python', child_credit=1.0), SkillLevel.LEVEL_6)
+        # Собственный уровень не понижается, у листа потомков нет
+        self.assertEqual(hierarchy.effective_level(skills, 'programming', child_credit=0.0), SkillLevel.LEVEL_1)
+        self.assertEqual(hierarchy.effective_level(skills, 'python.django'), SkillLevel.LEVEL_6)
+        self.assertEqual(hierarchy.effective_level(skills, 'нет такого'), SkillLevel.LEVEL_0)
+        self.assertEqual(hierarchy.effective_level({}, 'python'), SkillLevel.LEVEL_0)
+
+
+class HierarchyPrerequisitesTest(unittest.TestCase):
+    def test_child_credit_opens_course(self):
+        course = Course("WEB", "Веб", "", False, 1, 3, [SkillRequirement(SKILLS['python'], SkillLevel.LEVEL_3)])
+        program = MasterProgram("p", "p", "", required_courses=[course])
+        student = Student("1", "s", program)
+        student.skills['python.django'] = SkillLevel.LEVEL_6
+
+        hierarchy = SkillHierarchy.from_skills(SKILLS)
+        self.assertEqual(RecommendationEngine(program).recommend(student, 1), [])
+        self.assertEqual(names(RecommendationEngine(program, hierarchy).recommend(student, 1)), [("Веб", 0.5)])
+        self.assertEqual(RecommendationEngine(program, hierarchy, child_credit=0.4).recommend(student, 1), [])
+
+    def test_zero_credit_matches_plain(self):
+        # С нулевым зачётом подскиллов результат тот же, что без иерархии
+        hierarchy = SkillHierarchy.from_skills(SKILLS)
+        rnd = random.Random(0)
+        for _ in range(10):
+            program = random_program(rnd, 50)
+            plain, zero_credit = RecommendationEngine(program), RecommendationEngine(program, hierarchy, 0.0)
+            for student in random_students(rnd, program, 5):
+                for semester in range(1, 5):
+                    self.assertEqual(names(zero_credit.recommend(student, semester)),
+                                     names(plain.recommend(student, semester)))
+
+
+if __name__ == '__main__':
+    unittest.main()
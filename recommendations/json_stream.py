@@ -0,0 +1,196 @@
+"""
+Потоковое чтение и запись каталогов курсов (JSON массив или JSONL)
+Записи читаются и пишутся по одной, память не растёт с размером каталога
+"""
+
+import json
+from typing import Dict, Iterator, Optional, TextIO
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+READ_CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+
+
+def is_jsonl(path: str) -> bool:
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+
+class _JsonStreamParser:
+    """Инкрементальный разбор JSON: читает файл кусками и декодирует значения по одному"""
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Отбрасываем уже разобранную часть буфера
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str):
+        raise json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """Следующий значимый символ (без пробелов) или '' в конце файла"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            self._error(f"Ожидался символ {char!r}")
+        self.pos += 1
+
+    def decode_value(self):
+        """Декодировать одно значение целиком"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+
+            # Число на границе буфера ("0." или "12") может продолжаться в следующем куске
+            truncated = end == len(self.buffer) or self.buffer[end] not in _DELIMITERS
+            if truncated and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        """Перебрать элементы массива, начиная с '['"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        while True:
+            yield self.decode_value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self.pos -= 1
+                self._error("Ожидался символ ',' или ']'")
+
+    def iter_object_array(self, key: str) -> Iterator:
+        """Перебрать элементы массива, лежащего в объекте верхнего уровня под ключом key"""
+        self.expect('{')
+        if self.peek() == '}':
+            return
+
+        while True:
+            current_key = self.decode_value()
+            self.expect(':')
+
+            if current_key == key and self.peek() == '[':
+                yield from self.iter_array()
+                return
+
+            self.decode_value()  # Пропускаем остальные поля
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self.pos -= 1
+                self._error("Ожидался символ ',' или '}'")
+
+
+def iter_json_records(path: str, array_key: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Читать курсы по одному
+    Поддерживается JSONL (.jsonl/.ndjson), JSON массив и объект с массивом под ключом array_key
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if is_jsonl(path):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        parser = _JsonStreamParser(f)
+        first = parser.peek()
+        if first == '[':
+            yield from parser.iter_array()
+        elif first == '{' and array_key:
+            yield from parser.iter_object_array(array_key)
+        else:
+            parser._error("Ожидался JSON массив курсов")
+
+
+class JsonRecordWriter:
+    """
+    Пишет записи в файл сразу по мере готовности
+
+    Для .jsonl - по записи на строку. Для JSON - массив с отступом 2 (побайтово как json.dump(..., indent=2)),
+    опционально внутри объекта {array_key: [...], **footer}, где footer дописывается при закрытии.
+    """
+
+    def __init__(self, path: str, array_key: Optional[str] = None):
+        self.path = path
+        self.array_key = array_key
+        self.jsonl = is_jsonl(path)
+        self.count = 0
+        self.file = open(path, 'w', encoding='utf-8')
+        # Уровень вложенности элементов массива
+        self._level = 2 if (array_key and not self.jsonl) else 1
+
+        if not self.jsonl and array_key:
+            self.file.write('{\n  ' + json.dumps(array_key, ensure_ascii=False) + ': [')
+        elif not self.jsonl:
+            self.file.write('[')
+
+    def write(self, record: Dict):
+        if self.jsonl:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            indent = '  ' * self._level
+            dumped = json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n' + indent)
+            self.file.write((',\n' if self.count else '\n') + indent + dumped)
+        self.count += 1
+        self.file.flush()
+
+    def close(self, footer: Optional[Dict] = None):
+        """Закрыть массив (и объект), дописав поля footer"""
+        if self.file.closed:
+            return
+
+        if not self.jsonl:
+            closing_indent = '  ' * (self._level - 1)
+            self.file.write(('\n' + closing_indent + ']') if self.count else ']')
+            if self.array_key:
+                for key, value in (footer or {}).items():
+                    dumped = json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                    self.file.write(',\n  ' + json.dumps(key, ensure_ascii=False) + ': ' + dumped)
+                self.file.write('\n}')
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
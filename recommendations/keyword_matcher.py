@@ -0,0 +1,137 @@
+"""
+Многошаблонный поиск ключевых слов (автомат Ахо-Корасик)
+Находит все вхождения набора шаблонов за один проход по тексту
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Автомат Ахо-Корасик над набором строковых шаблонов"""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns: List[str] = []
+        self.pattern_ids: Dict[str, int] = {}
+
+        # Переходы по символам, суффиксные ссылки и выходы для каждого состояния
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Tuple[int, ...]] = [()]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._empty_id = None
+        self._compiled = False
+
+        for pattern in patterns:
+            self.add(pattern)
+        self.compile()
+
+    def add(self, pattern: str) -> int:
+        """Добавить шаблон, возвращает его идентификатор"""
+        if pattern in self.pattern_ids:
+            return self.pattern_ids[pattern]
+
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self.pattern_ids[pattern] = pattern_id
+        self._compiled = False
+
+        # Пустая строка содержится в любом тексте - обрабатываем отдельно
+        if not pattern:
+            self._empty_id = pattern_id
+            return pattern_id
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._terminal[state] = self._terminal[state] + (pattern_id,)
+        return pattern_id
+
+    def compile(self):
+        """Построить суффиксные ссылки (обход в ширину)"""
+        self._output = list(self._terminal)
+
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+
+                self._fail[next_state] = fail_state
+                # Сразу сливаем выходы, чтобы при поиске не ходить по цепочке ссылок
+                self._output[next_state] = self._output[next_state] + self._output[fail_state]
+
+        self._compiled = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Перебрать все вхождения шаблонов в текст
+        Возвращает пары (позиция_начала, идентификатор_шаблона)
+        """
+        if not self._compiled:
+            self.compile()
+
+        if self._empty_id is not None:
+            yield 0, self._empty_id
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern_id in output[state]:
+                yield position + 1 - len(patterns[pattern_id]), pattern_id
+
+    def find_all(self, text: str) -> Set[int]:
+        """Идентификаторы всех шаблонов, которые встречаются в тексте"""
+        return {pattern_id for _, pattern_id in self.iter_matches(text)}
+
+    def scan(self, text: str) -> Dict[int, bool]:
+        """
+        Найти все шаблоны за один проход с учётом границ слов
+        Возвращает {идентификатор_шаблона: есть_ли_вхождение_отдельным_словом}
+
+        Вхождение считается отдельным словом, если оно окружено пробелами,
+        либо стоит в самом начале или в самом конце текста
+        """
+        hits: Dict[int, bool] = {}
+        text_len = len(text)
+
+        for start, pattern_id in self.iter_matches(text):
+            if hits.get(pattern_id):
+                continue
+
+            end = start + len(self.patterns[pattern_id])
+            whole_word = (
+                    start == 0 or end == text_len or
+                    (text[start - 1] == ' ' and text[end] == ' ')
+            )
+            hits[pattern_id] = whole_word
+
+        return hits
+
+    def __len__(self):
+        return len(self.patterns)
@@ -0,0 +1,157 @@
+"""
+Ограниченный LRU кэш лемматизации
+Ключ - (словоформа, часть речи, морфологические признаки); опционально сохраняется в SQLite между запусками
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_LEMMA_CACHE_SIZE = 100_000
+
+LemmaKey = Tuple[str, Optional[str], Tuple[Tuple[str, str], ...]]
+
+
+def lemma_key(text: str, pos: Optional[str], feats: Optional[Dict[str, str]]) -> LemmaKey:
+    return text, pos, tuple(sorted((feats or {}).items()))
+
+
+def _dump_feats(feats: Tuple[Tuple[str, str], ...]) -> str:
+    return "|".join(f"{name}={value}" for name, value in feats)
+
+
+def _load_feats(raw: str) -> Tuple[Tuple[str, str], ...]:
+    if not raw:
+        return ()
+    return tuple(tuple(item.split("=", 1)) for item in raw.split("|"))
+
+
+class LemmaCache:
+    """
+    LRU кэш {ключ: лемма} с ограничением размера и статистикой попаданий
+
+    При заданном path записи загружаются из SQLite при создании,
+    а новые леммы дописываются туда в save() (можно вызывать из нескольких процессов).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_LEMMA_CACHE_SIZE, path: Optional[str] = None):
+        self.maxsize = max(1, maxsize)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[LemmaKey, str]" = OrderedDict()
+        # Новые леммы, ещё не сохранённые на диск
+        self._dirty: Dict[LemmaKey, str] = {}
+        self._lock = threading.Lock()
+
+        if path:
+            self.load()
+
+    def get(self, key: LemmaKey) -> Optional[str]:
+        with self._lock:
+            lemma = self._entries.get(key)
+            if lemma is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return lemma
+
+    def put(self, key: LemmaKey, lemma: str, dirty: bool = True):
+        with self._lock:
+            self._entries[key] = lemma
+            self._entries.move_to_end(key)
+            if dirty and self.path:
+                self._dirty[key] = lemma
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def lemmatize(self, vocab, text: str, pos: Optional[str], feats: Optional[Dict[str, str]]) -> str:
+        """Лемма словоформы: из кэша, либо через морфологический словарь"""
+        key = lemma_key(text, pos, feats)
+        lemma = self.get(key)
+        if lemma is None:
+            lemma = vocab.lemmatize(text, pos, feats)
+            self.put(key, lemma)
+        return lemma
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    # --- Сохранение между запусками ---
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS lemma_cache ("
+            " text TEXT NOT NULL,"
+            " pos TEXT NOT NULL,"
+            " feats TEXT NOT NULL,"
+            " lemma TEXT NOT NULL,"
+            " PRIMARY KEY (text, pos, feats))"
+        )
+        return connection
+
+    def load(self) -> int:
+        """Загрузить сохранённые леммы (не больше maxsize), возвращает их количество"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT text, pos, feats, lemma FROM lemma_cache LIMIT ?", [self.maxsize]
+            ).fetchall()
+        finally:
+            connection.close()
+
+        for text, pos, feats, lemma in rows:
+            self.put((text, pos or None, _load_feats(feats)), lemma, dirty=False)
+        return len(rows)
+
+    def save(self) -> int:
+        """Дописать новые леммы в файл, возвращает количество записанных"""
+        if not self.path:
+            return 0
+
+        with self._lock:
+            pending, self._dirty = self._dirty, {}
+        if not pending:
+            return 0
+
+        connection = self._connect()
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO lemma_cache (text, pos, feats, lemma) VALUES (?, ?, ?, ?)",
+                [(text, pos or '', _dump_feats(feats), lemma) for (text, pos, feats), lemma in pending.items()]
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        return len(pending)
+
+    # --- Статистика ---
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / total) if total else 0.0,
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"попаданий {stats['hits']}, промахов {stats['misses']} ({stats['hit_rate'] * 100:.1f}%), "
+            f"размер {stats['size']}/{stats['maxsize']}, вытеснено {stats['evictions']}"
+        )
@@ -0,0 +1,207 @@
+# pip install natasha numpy
+
+"""
+Эмбеддинги navec в плоском виде на диске, открываются через mmap только для чтения
+Все процессы (воркеры gunicorn, пул тегирования, демон) делят одни физические страницы,
+вместо того чтобы каждый распаковывал NewsEmbedding и строил словарь на 250 тыс. слов.
+
+Раскладка каталога:
+- indexes.npy - коды PQ слов (слова x qdim, uint8), строки в порядке словаря navec;
+- codes.npy - центроиды PQ (qdim x centroids x chunk, float32);
+- words.npy - слова в UTF-8, отсортированные побайтно и склеенные подряд (uint8);
+- word_offsets.npy - границы слов в words.npy (uint32, слов + 1);
+- word_ids.npy - строка indexes.npy для каждого слова в отсортированном порядке (uint32);
+- meta.json - id модели navec и размеры, пишется последним.
+
+Строки indexes совпадают с navec, поэтому морфологический теггер Natasha работает поверх тех же массивов.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+DEFAULT_EMBEDDING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "navec_mmap")
+LOOKUP_CACHE_SIZE = 100_000
+
+_ARRAYS = ('indexes', 'codes', 'words', 'word_offsets', 'word_ids')
+
+
+class MappedVocab:
+    """Словарь слово -> строка эмбеддинга бинарным поиском по отсортированным словам"""
+
+    def __init__(self, words: np.ndarray, word_offsets: np.ndarray, word_ids: np.ndarray):
+        # memoryview поверх mmap: индексирование без создания numpy-скаляров
+        self._words = memoryview(words)
+        self._offsets = memoryview(word_offsets)
+        self._ids = memoryview(word_ids)
+        self._size = len(word_ids)
+        # Лексика курсов сильно повторяется, поиск по mmap кэшируется на процесс
+        self.find = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._find)
+
+    def _word(self, position: int) -> bytes:
+        return bytes(self._words[self._offsets[position]:self._offsets[position + 1]])
+
+    def _find(self, word: str) -> int:
+        """Строка эмбеддинга слова или -1"""
+        key = word.encode('utf-8')
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._size and self._word(lo) == key:
+            return self._ids[lo]
+        return -1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        return self.find(word) >= 0
+
+    def __getitem__(self, word: str) -> int:
+        row = self.find(word)
+        if row < 0:
+            raise KeyError(word)
+        return row
+
+    def get(self, word: str, default=None):
+        row = self.find(word)
+        return default if row < 0 else row
+
+
+class MappedPQ:
+    """Product quantization navec поверх mmap массивов (те же indexes и codes, что у navec.PQ)"""
+
+    def __init__(self, indexes: np.ndarray, codes: np.ndarray):
+        self.indexes = indexes
+        self.codes = codes
+        self.vectors, self.qdim = indexes.shape
+        _, self.centroids, chunk = codes.shape
+        self.dim = self.qdim * chunk
+        self.qdims = np.arange(self.qdim)
+
+    @property
+    def shape(self):
+        return self.vectors, self.dim
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.codes[self.qdims, self.indexes[row]].reshape(self.dim)
+
+
+class MappedMeta:
+    def __init__(self, id: str):
+        self.id = id
+
+
+class MappedEmbedding:
+    """
+    Замена NewsEmbedding с тем же интерфейсом для тегировщиков: get, [], in, .pq, .vocab, .meta
+    (NewsMorphTagger принимает её вместо NewsEmbedding)
+    """
+
+    def __init__(self, directory: str = DEFAULT_EMBEDDING_DIR):
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата эмбеддингов: {meta.get('format_version')}")
+
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in _ARRAYS}
+        self.meta = MappedMeta(meta['id'])
+        self.pq = MappedPQ(arrays['indexes'], arrays['codes'])
+        self.vocab = MappedVocab(arrays['words'], arrays['word_offsets'], arrays['word_ids'])
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        return self.pq[self.vocab[word]]
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.vocab
+
+    def get(self, word: str, default=None):
+        row = self.vocab.find(word)
+        return default if row < 0 else self.pq[row]
+
+
+def _source_stamp(source: str) -> dict:
+    """Имя и размер файла модели navec: по ним видно, что natasha обновилась и каталог надо пересобрать"""
+    return {'source': os.path.basename(source), 'source_size': os.path.getsize(source)}
+
+
+def _default_source() -> str:
+    from natasha.data import NEWS_EMBEDDING
+    return NEWS_EMBEDDING
+
+
+def load_mapped_embedding(directory: str = DEFAULT_EMBEDDING_DIR, source: Optional[str] = None) -> Optional[MappedEmbedding]:
+    """MappedEmbedding, если каталог собран из текущей модели navec, иначе None"""
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stamp = _source_stamp(source or _default_source())
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('format_version') != FORMAT_VERSION or any(meta.get(key) != value for key, value in stamp.items()):
+        print(f"⚠️  Эмбеддинги в {directory} собраны из другой модели navec, пересоберите: python mapped_embedding.py")
+        return None
+    return MappedEmbedding(directory)
+
+
+def build_mapped_embedding(directory: str = DEFAULT_EMBEDDING_DIR, source: Optional[str] = None) -> str:
+    """Разложить модель navec (по умолчанию NewsEmbedding из natasha) в каталог для mmap; возвращает id модели"""
+    from navec import Navec
+
+    source = source or _default_source()
+    embedding = Navec.load(source)
+
+    os.makedirs(directory, exist_ok=True)
+    encoded = [word.encode('utf-8') for word in embedding.vocab.words]
+    order = sorted(range(len(encoded)), key=encoded.__getitem__)
+
+    sorted_words = [encoded[i] for i in order]
+    offsets = np.zeros(len(sorted_words) + 1, dtype=np.uint32)
+    np.cumsum([len(word) for word in sorted_words], out=offsets[1:])
+
+    arrays = {
+        'indexes': np.ascontiguousarray(embedding.pq.indexes, dtype=np.uint8),
+        'codes': np.ascontiguousarray(embedding.pq.codes, dtype=np.float32),
+        'words': np.frombuffer(b''.join(sorted_words), dtype=np.uint8),
+        'word_offsets': offsets,
+        'word_ids': np.array(order, dtype=np.uint32),
+    }
+    for name, array in arrays.items():
+        tmp_path = os.path.join(directory, f"{name}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+
+    # meta.json последним: пока его нет или он старый, каталог не считается собранным
+    tmp_path = os.path.join(directory, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format_version': FORMAT_VERSION,
+            'id': embedding.meta.id,
+            'words': len(encoded),
+            'dim': int(embedding.pq.dim),
+            **_source_stamp(source),
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+    return embedding.meta.id
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Собрать эмбеддинги navec для загрузки через mmap")
+    arg_parser.add_argument("--output", default=DEFAULT_EMBEDDING_DIR, help="Каталог для эмбеддингов")
+    arg_parser.add_argument("--source", default=None, help="Файл модели navec (по умолчанию - NewsEmbedding из natasha)")
+    args = arg_parser.parse_args()
+
+    print("⏳ Загрузка navec...")
+    model_id = build_mapped_embedding(args.output, args.source)
+    print(f"✅ Эмбеддинги {model_id} сохранены в {args.output}")
@@ -0,0 +1,103 @@
+"""
+Микробатчинг запросов для онлайн-тегирования
+Одновременные запросы копятся не дольше max_wait и уходят обработчику одной пачкой
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_WAIT = 0.005  # секунды
+
+
+class MicroBatcher:
+    """
+    handler(items) -> results получает список элементов и возвращает результаты в том же порядке
+    Каждый из threads потоков-диспетчеров забирает из очереди первый элемент, добирает пачку
+    до max_batch_size или до истечения max_wait и вызывает handler. Потоков стоит делать
+    столько же, сколько воркеров за handler, тогда пачки обрабатываются параллельно.
+    Если handler падает на пачке или возвращает не столько результатов, сколько элементов,
+    её элементы обрабатываются по одному: ошибку получает только запрос, на котором она возникла.
+    """
+
+    def __init__(
+            self,
+            handler: Callable[[List[Any]], List[Any]],
+            max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+            max_wait: float = DEFAULT_MAX_WAIT,
+            threads: int = 1
+    ):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self._queue: queue.Queue = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'micro-batcher-{i}', daemon=True)
+            for i in range(max(1, threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def process(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Обработать один элемент (в составе ближайшей пачки) и вернуть результат
+        Не дождались за timeout секунд - TimeoutError, ещё не взятый в пачку элемент снимается с очереди
+        """
+        future = self.submit(item)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _handle(self, items: List[Any]) -> List[Any]:
+        results = list(self.handler(items))
+        if len(results) != len(items):
+            raise RuntimeError(f"Обработчик вернул {len(results)} результатов на {len(items)} элементов")
+        return results
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Запросы, которые уже отменены, не обрабатываем
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self._handle([item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._run_one_by_one(batch)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_one_by_one(self, batch: list):
+        for item, future in batch:
+            try:
+                future.set_result(self._handle([item])[0])
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,109 @@
+"""
+Общий реестр моделей Natasha
+Модели загружаются лениво при первом обращении и разделяются между всеми тегировщиками
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from lemma_cache import LemmaCache, DEFAULT_LEMMA_CACHE_SIZE
+
+# Загруженные модели {имя: объект}, одна копия на процесс
+_models: Dict[str, object] = {}
+_lock = threading.RLock()
+
+# Каталог эмбеддингов для mmap (mapped_embedding.py), по умолчанию recommendations/navec_mmap
+_embedding_dir: Optional[str] = os.environ.get('NAVEC_MMAP_DIR')
+
+
+def _get_or_load(name: str, factory: Callable[[], object]) -> object:
+    """Вернуть модель из реестра, при первом обращении - загрузить"""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(name)
+        if model is None:
+            model = factory()
+            _models[name] = model
+        return model
+
+
+def get_segmenter():
+    """Сегментатор на токены и предложения"""
+    def load():
+        from natasha import Segmenter
+        return Segmenter()
+
+    return _get_or_load('segmenter', load)
+
+
+def get_embedding():
+    """
+    Эмбеддинги navec (самая тяжёлая часть загрузки)
+    Если собран каталог mapped_embedding.py, массивы открываются через mmap и делятся между процессами
+    """
+    def load():
+        from mapped_embedding import load_mapped_embedding, DEFAULT_EMBEDDING_DIR
+        embedding = load_mapped_embedding(_embedding_dir or DEFAULT_EMBEDDING_DIR)
+        if embedding is not None:
+            return embedding
+
+        from natasha import NewsEmbedding
+        return NewsEmbedding()
+
+    return _get_or_load('embedding', load)
+
+
+def get_morph_tagger():
+    """Морфологический теггер, использует общие эмбеддинги"""
+    def load():
+        from natasha import NewsMorphTagger
+        return NewsMorphTagger(get_embedding())
+
+    return _get_or_load('morph_tagger', load)
+
+
+def get_morph_vocab():
+    """Морфологический словарь для лемматизации"""
+    def load():
+        from natasha import MorphVocab
+        return MorphVocab()
+
+    return _get_or_load('morph_vocab', load)
+
+
+def get_lemma_cache() -> LemmaCache:
+    """Общий LRU кэш лемм (по умолчанию только в памяти)"""
+    return _get_or_load('lemma_cache', LemmaCache)
+
+
+def configure_lemma_cache(maxsize: int = DEFAULT_LEMMA_CACHE_SIZE, path: Optional[str] = None) -> LemmaCache:
+    """Заменить общий кэш лемм: задать размер и файл для сохранения между запусками"""
+    with _lock:
+        cache = LemmaCache(maxsize, path)
+        _models['lemma_cache'] = cache
+        return cache
+
+
+def lemmatize(text: str, pos: Optional[str], feats: Optional[Dict[str, str]]) -> str:
+    """Лемматизация словоформы через общий кэш"""
+    return get_lemma_cache().lemmatize(get_morph_vocab(), text, pos, feats)
+
+
+def warm_up() -> List[str]:
+    """
+    Заранее загрузить все модели (для долгоживущих воркеров)
+    Возвращает список загруженных моделей
+    """
+    get_segmenter()
+    get_morph_tagger()
+    get_morph_vocab()
+    return loaded_models()
+
+
+def loaded_models() -> List[str]:
+    """Какие модели уже загружены в этом процессе"""
+    return sorted(_models)
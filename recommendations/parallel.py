@@ -0,0 +1,90 @@
+"""
+Параллельное тегирование курсов в пуле процессов
+Каждый воркер один раз загружает модели и словари, курсы раздаются пачками
+"""
+
+import multiprocessing
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+class TaggingPool:
+    """
+    Пул воркеров для тегирования
+
+    initializer вызывается один раз в каждом воркере (загрузка Natasha, дерева навыков),
+    результаты imap возвращаются строго в порядке входных курсов.
+    При workers <= 1 всё выполняется в текущем процессе тем же кодом.
+    Воркеры поднимаются только при первой реальной работе (например, если всё нашлось в кэше - не поднимаются).
+    """
+
+    def __init__(
+            self,
+            workers: int = 1,
+            initializer: Optional[Callable] = None,
+            initargs: Sequence = (),
+            chunksize: int = DEFAULT_CHUNK_SIZE
+    ):
+        self.workers = max(1, workers)
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self.chunksize = max(1, chunksize)
+        self._pool = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    @property
+    def is_parallel(self) -> bool:
+        return self.workers > 1
+
+    def _start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+
+            if self.is_parallel:
+                self._pool = multiprocessing.Pool(
+                    processes=self.workers,
+                    initializer=self.initializer,
+                    initargs=self.initargs
+                )
+            elif self.initializer:
+                self.initializer(*self.initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._pool is not None:
+            if exc_type is None:
+                self._pool.close()
+            else:
+                self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        return False
+
+    def imap(self, func: Callable, items: Iterable, chunksize: Optional[int] = None) -> Iterator:
+        """Применить func ко всем элементам, сохраняя порядок (chunksize - вместо заданного в пуле)"""
+        if isinstance(items, (list, tuple)) and not items:
+            return iter(())
+
+        self._start()
+        if self._pool is None:
+            return map(func, items)
+        return self._pool.imap(func, items, chunksize=chunksize or self.chunksize)
+
+    def apply(self, func: Callable, *args):
+        """Выполнить func(*args) на одном из воркеров и дождаться результата (можно из нескольких потоков)"""
+        self._start()
+        if self._pool is None:
+            return func(*args)
+        return self._pool.apply(func, args)
+
+    def split(self, items: Sequence) -> List[Sequence]:
+        """Разбить пачку на непрерывные части, по одной на воркер (для пакетных функций)"""
+        size = -(-len(items) // self.workers) or 1
+        return [items[start:start + size] for start in range(0, len(items), size)]
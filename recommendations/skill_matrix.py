@@ -0,0 +1,175 @@
+# pip install numpy scipy
+
+"""
+Пакетное сопоставление курсов и навыков через разреженные TF-IDF / BM25 матрицы
+Весь каталог оценивается одним матричным произведением (курсы x термы) @ (термы x навыки)
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+SCHEMES = ('tfidf', 'bm25')
+# Порог релевантности по умолчанию: косинус для tfidf, сумма весов для bm25
+DEFAULT_MIN_SCORES = {'tfidf': 0.2, 'bm25': 6.0}
+DEFAULT_BATCH_SIZE = 4096
+
+# Грубый стемминг обрезкой: "анализа" и "анализ" дают один терм, как подстрочный поиск в SkillIndex
+STEM_LENGTH = 6
+MIN_TOKEN_LENGTH = 3
+NAME_WEIGHT = 2  # Слова названия навыка весят больше описания и унаследованных ключевых слов
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_STOP_WORDS = {'и', 'в', 'на', 'с', 'для', 'по', 'о', 'об', 'из', 'к', 'а', 'но', 'the', 'and', 'for', 'with'}
+
+
+def tokenize(text: str) -> List[str]:
+    """Термы текста: слова в нижнем регистре без стоп-слов, обрезанные до STEM_LENGTH"""
+    return [
+        word[:STEM_LENGTH]
+        for word in re.findall(r'\w+', text.lower())
+        if len(word) >= MIN_TOKEN_LENGTH and word not in _STOP_WORDS
+    ]
+
+
+class TfidfSkillMatcher:
+    """
+    Матрица навыков строится один раз из названий, описаний и ключевых слов дерева навыков,
+    курсы векторизуются пачками; релевантность - косинус TF-IDF (tfidf) или сумма весов BM25 (bm25)
+    """
+
+    def __init__(self, flat_skills: List[Dict], scheme: str = 'tfidf'):
+        if scheme not in SCHEMES:
+            raise ValueError(f"Неизвестная схема {scheme!r}, доступны: {', '.join(SCHEMES)}")
+        self.scheme = scheme
+        self.skills_count = len(flat_skills)
+
+        skill_terms = []
+        for skill in flat_skills:
+            terms = Counter()
+            for term in tokenize(skill.get('name', '')):
+                terms[term] += NAME_WEIGHT
+            terms.update(tokenize(skill.get('description', '')))
+            for keyword in skill.get('keywords', []):
+                terms.update(tokenize(keyword))
+            skill_terms.append(terms)
+
+        # Словарь термов и документная частота по навыкам
+        self.vocabulary: Dict[str, int] = {}
+        document_frequency = Counter()
+        for terms in skill_terms:
+            document_frequency.update(terms.keys())
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        n = max(1, self.skills_count)
+        if scheme == 'tfidf':
+            self.idf = np.array(
+                [math.log((1 + n) / (1 + document_frequency[term])) + 1 for term in self.vocabulary]
+            )
+        else:
+            self.idf = np.array(
+                [math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                 for term in self.vocabulary]
+            )
+
+        # Транспонированная матрица навыков (термы x навыки) для произведения с курсами
+        self.skill_matrix = self._skill_weights(skill_terms).T.tocsr()
+
+    def _term_matrix(self, documents: Iterable[Counter]) -> sparse.csr_matrix:
+        """Разреженная матрица частот (документы x термы) по известному словарю"""
+        indptr = [0]
+        indices = []
+        counts = []
+        for terms in documents:
+            for term, count in terms.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    indices.append(column)
+                    counts.append(count)
+            indptr.append(len(indices))
+
+        return sparse.csr_matrix(
+            (np.array(counts, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+
+    @staticmethod
+    def _l2_normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
+
+    def _skill_weights(self, skill_terms: List[Counter]) -> sparse.csr_matrix:
+        tf = self._term_matrix(skill_terms)
+        if self.scheme == 'tfidf':
+            tf.data = 1 + np.log(tf.data)
+            return self._l2_normalize(tf @ sparse.diags(self.idf)).tocsr()
+
+        # BM25: насыщение частоты с нормировкой на длину описания навыка
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        average_length = lengths.mean() if len(lengths) else 1.0
+        row_lengths = np.repeat(lengths, np.diff(tf.indptr))
+        denominator = tf.data + BM25_K1 * (1 - BM25_B + BM25_B * row_lengths / average_length)
+        tf.data = tf.data * (BM25_K1 + 1) / denominator
+        return (tf @ sparse.diags(self.idf)).tocsr()
+
+    def course_matrix(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """Векторизовать тексты курсов (курсы x термы)"""
+        tf = self._term_matrix(Counter(tokenize(text)) for text in texts)
+        if self.scheme == 'tfidf':
+            tf.data = 1 + np.log(tf.data)
+            return self._l2_normalize(tf @ sparse.diags(self.idf)).tocsr()
+
+        # Для BM25 запрос - просто набор термов курса
+        tf.data = np.ones_like(tf.data)
+        return tf
+
+    def relevance(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """Матрица релевантности курсы x навыки"""
+        return (self.course_matrix(texts) @ self.skill_matrix).tocsr()
+
+    def top_skills(
+            self,
+            texts: Sequence[str],
+            max_skills: int = 7,
+            min_score: Optional[float] = None,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Топ навыков для каждого курса: [(skill_id, score)] по убыванию релевантности
+        Навыки со score < min_score (по умолчанию - порог схемы) отбрасываются;
+        при равном счёте порядок как в дереве навыков
+        """
+        if min_score is None:
+            min_score = DEFAULT_MIN_SCORES[self.scheme]
+        if max_skills <= 0:
+            return [[] for _ in texts]
+
+        result = []
+        for start in range(0, len(texts), batch_size):
+            scores = self.relevance(texts[start:start + batch_size])
+            for row in range(scores.shape[0]):
+                begin, end = scores.indptr[row], scores.indptr[row + 1]
+                values = scores.data[begin:end]
+                skill_ids = scores.indices[begin:end]
+
+                keep = values >= min_score
+                values, skill_ids = values[keep], skill_ids[keep]
+                if len(values) > max_skills:
+                    # Отбор кандидатов за O(n), сортируется только топ
+                    candidates = np.argpartition(-values, max_skills - 1)[:max_skills]
+                    threshold = values[candidates].min()
+                    # Навыки с тем же счётом, что и последний кандидат, тоже участвуют в сортировке
+                    candidates = np.flatnonzero(values >= threshold)
+                    values, skill_ids = values[candidates], skill_ids[candidates]
+
+                order = np.lexsort((skill_ids, -values))[:max_skills]
+                result.append([(int(skill_ids[i]), float(values[i])) for i in order])
+        return result
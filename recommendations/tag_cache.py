@@ -0,0 +1,156 @@
+"""
+Кэш результатов тегирования по хэшу содержимого курса
+Хранится в SQLite: повторный запуск перетегирует только новые и изменённые курсы
+"""
+
+import hashlib
+import json
+import sqlite3
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 256
+
+
+def _json_default(value):
+    # Множества (стоп-слова и т.п.) сериализуем в отсортированном виде, чтобы отпечаток был стабильным
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Не сериализуется в отпечаток: {type(value).__name__}")
+
+
+def fingerprint(*parts) -> str:
+    """Отпечаток словарей и настроек тегировщика (sha256 канонического JSON)"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def content_hash(course: Dict) -> str:
+    """Хэш входных данных курса, от которых зависят теги"""
+    payload = json.dumps(
+        [course.get('name', ''), course.get('description', ''), course.get('url', '')],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TagCache:
+    """
+    Персистентный кэш {(отпечаток_словарей, хэш_курса): результат}
+    При изменении любого словаря отпечаток меняется и старые записи перестают совпадать
+    """
+
+    def __init__(self, path: str, dictionaries_fingerprint: str):
+        self.path = path
+        self.dictionaries_fingerprint = dictionaries_fingerprint
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS tag_cache ("
+            " fingerprint TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (fingerprint, content_hash))"
+        )
+        self.connection.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """Найти в кэше результаты для набора хэшей"""
+        found = {}
+        unique_keys = list(set(keys))
+
+        # SQLite ограничивает число параметров в запросе
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT content_hash, result FROM tag_cache"
+                f" WHERE fingerprint = ? AND content_hash IN ({placeholders})",
+                [self.dictionaries_fingerprint, *chunk]
+            )
+            for key, result in rows:
+                found[key] = json.loads(result)
+
+        return found
+
+    def put_many(self, results: Dict[str, Dict]):
+        """Сохранить новые результаты"""
+        if not results:
+            return
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO tag_cache (fingerprint, content_hash, result) VALUES (?, ?, ?)",
+            [
+                (self.dictionaries_fingerprint, key, json.dumps(result, ensure_ascii=False))
+                for key, result in results.items()
+            ]
+        )
+        self.connection.commit()
+
+    def purge_stale(self) -> int:
+        """Удалить записи, посчитанные со старыми словарями"""
+        cursor = self.connection.execute(
+            "DELETE FROM tag_cache WHERE fingerprint != ?",
+            [self.dictionaries_fingerprint]
+        )
+        self.connection.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        return f"попаданий {self.hits}, промахов {self.misses} ({hit_rate:.1f}% из кэша)"
+
+
+def iter_tagged_with_cache(
+        courses: Iterable[Dict],
+        cache: Optional[TagCache],
+        tag_many: Callable[[List[Dict]], Iterable[Dict]],
+        batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    Тегировать курсы пачками, беря готовые результаты из кэша (если он задан)
+    tag_many получает только промахи пачки и должен вернуть результаты в том же порядке.
+    Возвращает пары (курс, результат) в порядке входных курсов; вход может быть потоком
+    """
+    courses = iter(courses)
+    while True:
+        batch = list(islice(courses, batch_size))
+        if not batch:
+            break
+
+        if cache is None:
+            yield from zip(batch, tag_many(batch))
+            continue
+
+        keys = [content_hash(course) for course in batch]
+        cached = cache.get_many(keys)
+        misses = [course for course, key in zip(batch, keys) if key not in cached]
+        fresh_results = iter(tag_many(misses))
+
+        batch_results = []
+        new_results = {}
+        for key in keys:
+            if key in cached:
+                cache.hits += 1
+                batch_results.append(cached[key])
+            else:
+                cache.misses += 1
+                result = next(fresh_results)
+                new_results[key] = result
+                batch_results.append(result)
+
+        # Сохраняем до выдачи, чтобы пачка попала в кэш, даже если потребитель остановится раньше
+        cache.put_many(new_results)
+        yield from zip(batch, batch_results)
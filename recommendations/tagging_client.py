@@ -0,0 +1,163 @@
+"""
+Клиент демона тегирования (tagging_daemon.py) и протокол обмена через Unix-сокет
+
+Кадр: заголовок <версия:1 байт><операция или статус:1 байт><длина тела:4 байта> + тело,
+тело - компактный JSON в UTF-8. Модуль не импортирует Natasha, поэтому клиенту
+(веб-воркеру Django) модели в памяти не нужны.
+"""
+
+import json
+import os
+import queue
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct('<BBI')
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Операции
+OP_PING = 1
+OP_TAG = 2
+OP_SKILLS = 3
+
+# Статусы ответа
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_SOCKET = os.environ.get('TAGGING_DAEMON_SOCKET', '/tmp/such_tagging.sock')
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_POOL_SIZE = 4
+
+
+class TaggingClientError(Exception):
+    """Базовая ошибка клиента: при любой из них вызывающий код может перейти на локальное тегирование"""
+
+
+class DaemonUnavailable(TaggingClientError, ConnectionError):
+    """Демон не запущен или соединение оборвалось"""
+
+
+class TaggingDaemonError(TaggingClientError, RuntimeError):
+    """Демон получил запрос, но не смог его выполнить, или ответил некорректным кадром"""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Соединение закрыто")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def send_frame(sock: socket.socket, code: int, payload: Any):
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    sock.sendall(HEADER.pack(PROTOCOL_VERSION, code, len(body)) + body)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[int, Any]]:
+    """(код, тело) следующего кадра или None, если собеседник закрыл соединение между кадрами"""
+    first = sock.recv(1)
+    if not first:
+        return None
+    version, code, size = HEADER.unpack(first + _recv_exact(sock, HEADER.size - 1))
+    if version != PROTOCOL_VERSION:
+        raise ConnectionError(f"Версия протокола {version}, ожидалась {PROTOCOL_VERSION}")
+    if size > MAX_FRAME_SIZE:
+        raise ConnectionError(f"Слишком большой кадр: {size} байт")
+    return code, json.loads(_recv_exact(sock, size).decode('utf-8'))
+
+
+class TaggingClient:
+    """
+    Пул соединений с демоном: до pool_size открытых сокетов переиспользуются между запросами,
+    клиент можно вызывать из нескольких потоков
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=max(1, pool_size))
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise DaemonUnavailable(f"Демон тегирования недоступен ({self.socket_path}): {e}") from e
+        return sock
+
+    def _release(self, sock: socket.socket):
+        try:
+            self._idle.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+
+    def _exchange(self, sock: socket.socket, op: int, payload: Any, timeout: float) -> Tuple[int, Any]:
+        sock.settimeout(timeout)
+        send_frame(sock, op, payload)
+        frame = recv_frame(sock)
+        if frame is None:
+            raise ConnectionError("Демон закрыл соединение")
+        return frame
+
+    def call(self, op: int, payload: Any = None, timeout: Optional[float] = None) -> Any:
+        """timeout - ожидание ответа на этот вызов в секундах (по умолчанию self.timeout)"""
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            sock, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            sock, reused = self._connect(), False
+
+        try:
+            try:
+                status, body = self._exchange(sock, op, payload, timeout)
+            except ConnectionError:
+                if not reused:
+                    raise
+                # Соединение из пула могло устареть (демон перезапускался) - одна попытка с новым
+                sock.close()
+                sock = self._connect()
+                status, body = self._exchange(sock, op, payload, timeout)
+        except OSError as e:
+            sock.close()
+            if isinstance(e, DaemonUnavailable):
+                raise
+            raise DaemonUnavailable(f"Ошибка обмена с демоном тегирования: {e}") from e
+        except ValueError as e:
+            # Тело кадра - не JSON: соединение в неизвестном состоянии, в пул не возвращаем
+            sock.close()
+            raise TaggingDaemonError(f"Некорректный ответ демона тегирования: {e}") from e
+
+        self._release(sock)
+        if status != STATUS_OK:
+            error = body.get('error') if isinstance(body, dict) else None
+            raise TaggingDaemonError(error or 'неизвестная ошибка')
+        return body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # --- Операции ---
+    def ping(self, timeout: Optional[float] = None) -> Dict:
+        """Состояние демона: загруженные модели и отпечатки словарей"""
+        return self.call(OP_PING, timeout=timeout)
+
+    def tag_courses(self, courses: List[Dict], timeout: Optional[float] = None) -> List[Dict]:
+        """generate_tags (tags_to_json.py) для курсов {'name', 'description'} в исходном порядке"""
+        return self.call(OP_TAG, courses, timeout)
+
+    def find_matching_skills(self, courses: List[Dict], max_skills: int = 7) -> List[List[Dict]]:
+        """find_matching_skills (tags.py) для курсов {'name', 'description'}"""
+        return self.call(OP_SKILLS, {'courses': courses, 'max_skills': max_skills})
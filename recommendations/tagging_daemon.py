@@ -0,0 +1,145 @@
+# pip install natasha
+
+"""
+Локальный демон тегирования: модели Natasha и дерево навыков загружаются один раз,
+generate_tags и find_matching_skills отдаются по Unix-сокету (протокол - tagging_client.py)
+Веб-воркеры Django ходят сюда через TaggingClient и сами модели не загружают.
+
+Запуск: python tagging_daemon.py --socket /tmp/such_tagging.sock
+"""
+
+import os
+import signal
+import socketserver
+import threading
+import traceback
+from typing import Dict, List
+
+import tags
+import tags_to_json
+from lemma_cache import DEFAULT_LEMMA_CACHE_SIZE
+from nlp_models import loaded_models
+from parallel import TaggingPool
+from tagging_client import (
+    DEFAULT_SOCKET, OP_PING, OP_TAG, OP_SKILLS, STATUS_OK, STATUS_ERROR, send_frame, recv_frame
+)
+
+SKILL_TREE_FILE = os.path.join("grade_system", "skill_tree.json")
+
+
+class TaggingBackend:
+    """
+    Модели и тегировщики демона
+    При workers > 1 курсы размечаются в пуле процессов, иначе - в процессе демона по очереди
+    """
+
+    def __init__(self, skill_tree_file: str = SKILL_TREE_FILE, workers: int = 1):
+        self.pool = TaggingPool(workers, tags_to_json._init_tagging_worker, (None, DEFAULT_LEMMA_CACHE_SIZE))
+        self._lock = threading.Lock() if not self.pool.is_parallel else None
+        self.skill_tree = tags.SkillTreeProcessor(skill_tree_file)
+
+        # Прогрев до открытия сокета: первый запрос не ждёт загрузки моделей
+        self.tag_courses([{'name': '', 'description': ''}])
+
+    def tag_courses(self, courses: List[Dict]) -> List[Dict]:
+        if self._lock is None:
+            return self.pool.apply(tags_to_json._tag_course_batch, courses)
+        with self._lock:
+            return self.pool.apply(tags_to_json._tag_course_batch, courses)
+
+    def find_matching_skills(self, courses: List[Dict], max_skills: int = 7) -> List[List[Dict]]:
+        return [
+            self.skill_tree.find_matching_skills(course.get('name', ''), course.get('description', ''), max_skills)
+            for course in courses
+        ]
+
+    def status(self) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'workers': self.pool.workers,
+            'models': loaded_models(),
+            'fingerprints': {
+                'tags_to_json': tags_to_json.dictionaries_fingerprint(),
+                'tags': tags.dictionaries_fingerprint(self.skill_tree.skill_tree),
+            },
+        }
+
+    def handle(self, op: int, payload) -> object:
+        if op == OP_PING:
+            return self.status()
+        if op == OP_TAG:
+            return self.tag_courses(payload)
+        if op == OP_SKILLS:
+            return self.find_matching_skills(payload['courses'], payload.get('max_skills', 7))
+        raise ValueError(f"Неизвестная операция {op}")
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Одно соединение клиента: кадры обрабатываются по очереди, пока клиент не закроет сокет"""
+
+    def handle(self):
+        backend = self.server.backend
+        while True:
+            try:
+                frame = recv_frame(self.request)
+            except (OSError, ValueError):
+                return
+            if frame is None:
+                return
+
+            op, payload = frame
+            try:
+                status, body = STATUS_OK, backend.handle(op, payload)
+            except Exception as e:
+                traceback.print_exc()
+                status, body = STATUS_ERROR, {'error': f"{type(e).__name__}: {e}"}
+
+            try:
+                send_frame(self.request, status, body)
+            except OSError:
+                return
+
+
+class TaggingDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, backend: TaggingBackend):
+        self.backend = backend
+        if os.path.exists(socket_path):
+            # Сокет от прошлого запуска
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(socket_path: str = DEFAULT_SOCKET, skill_tree_file: str = SKILL_TREE_FILE, workers: int = 1):
+    print("⏳ Загрузка моделей и словарей...")
+    backend = TaggingBackend(skill_tree_file, workers)
+    status = backend.status()
+    print(f"✅ Загружено: {', '.join(status['models'])}; воркеров: {status['workers']}")
+
+    # SIGTERM (systemd, docker stop) завершает демон так же, как Ctrl+C, и убирает сокет
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with backend.pool, TaggingDaemon(socket_path, backend) as server:
+        print(f"🚀 Демон тегирования слушает {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Остановка")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Демон тегирования курсов на Unix-сокете")
+    arg_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Путь к Unix-сокету")
+    arg_parser.add_argument("--skill-tree", default=SKILL_TREE_FILE, help="Дерево навыков")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Процессов для тегирования")
+    args = arg_parser.parse_args()
+
+    serve(args.socket, args.skill_tree, args.workers)
@@ -0,0 +1,163 @@
+"""
+Профилирование тегирования по этапам (включается явно)
+Время этапов, срабатывания fallback'ов и вызовы морфологии собираются в каждом процессе и сливаются в один отчёт
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+_NULL_STAGE = nullcontext()
+
+
+class NullProfiler:
+    """Профилировщик по умолчанию: ничего не делает, накладные расходы - один вызов метода"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_STAGE
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler: 'TaggingProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class TaggingProfiler:
+    """
+    Время этапов {этап: [вызовов, суммарно_с, максимум_с]} и счётчики событий {событие: количество}
+    Снимки из воркеров сливаются через merge()
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float, calls: int = 1):
+        stats = self.stages.get(name)
+        if stats is None:
+            self.stages[name] = [calls, seconds, seconds]
+        else:
+            stats[0] += calls
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def snapshot(self) -> Dict:
+        return {
+            'stages': {name: list(stats) for name, stats in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def pop_snapshot(self) -> Dict:
+        """Снимок с обнулением (для передачи из воркера)"""
+        snapshot = self.snapshot()
+        self.stages.clear()
+        self.counters.clear()
+        return snapshot
+
+    def merge(self, snapshot: Dict):
+        for name, (calls, total, longest) in snapshot['stages'].items():
+            stats = self.stages.get(name)
+            if stats is None:
+                self.stages[name] = [calls, total, longest]
+            else:
+                stats[0] += calls
+                stats[1] += total
+                stats[2] = max(stats[2], longest)
+        for name, amount in snapshot['counters'].items():
+            self.counters[name] += amount
+
+    def report(self) -> Dict:
+        """Итог для программного использования"""
+        return {
+            'stages': {
+                name: {
+                    'calls': int(calls),
+                    'total_s': total,
+                    'mean_ms': total / calls * 1000 if calls else 0.0,
+                    'max_ms': longest * 1000,
+                }
+                for name, (calls, total, longest) in self.stages.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n⏱️  Этапы тегирования:")
+        print(f"   {'этап':<32}{'вызовов':>9}{'всего, с':>10}{'ср., мс':>10}{'макс., мс':>11}")
+        for name, stats in sorted(report['stages'].items(), key=lambda item: -item[1]['total_s']):
+            print(f"   {name:<32}{stats['calls']:>9}{stats['total_s']:>10.2f}"
+                  f"{stats['mean_ms']:>10.3f}{stats['max_ms']:>11.3f}")
+
+        if report['counters']:
+            print(f"\n🔀 Срабатывания fallback'ов и вызовы морфологии:")
+            for name, amount in sorted(report['counters'].items()):
+                print(f"   {name}: {amount}")
+
+
+_profiler = NullProfiler()
+
+
+def get_profiler():
+    """Текущий профилировщик процесса (NullProfiler, если профилирование выключено)"""
+    return _profiler
+
+
+def enable_profiling() -> TaggingProfiler:
+    global _profiler
+    if not _profiler.enabled:
+        _profiler = TaggingProfiler()
+    return _profiler
+
+
+def disable_profiling():
+    global _profiler
+    _profiler = NullProfiler()
+
+
+@contextmanager
+def preserved_profiler():
+    """
+    После блока вернуть профилировщик процесса, который был до него
+    Последовательный пул инициализирует "воркер" в текущем процессе, и enable_profiling
+    иначе остался бы включённым для всех следующих вызовов
+    """
+    global _profiler
+    previous = _profiler
+    try:
+        yield
+    finally:
+        _profiler = previous
+
+
+def collect_snapshots(results: Iterable[Tuple[Dict, Dict]], aggregate: TaggingProfiler) -> Iterator[Dict]:
+    """Разделить пары (результат, снимок) из воркеров: снимки сливаются в aggregate, результаты отдаются дальше"""
+    for result, snapshot in results:
+        aggregate.merge(snapshot)
+        yield result
@@ -1,22 +1,27 @@
 # pip install natasha
 
-from natasha import Doc, Segmenter, NewsEmbedding, NewsMorphTagger, MorphVocab
 import re
 import json
-from typing import Dict, List, Tuple
-from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+import heapq
+from itertools import chain
+
+from keyword_matcher import KeywordAutomaton
+from parallel import TaggingPool, DEFAULT_CHUNK_SIZE
+from tag_cache import TagCache, fingerprint, iter_tagged_with_cache, DEFAULT_BATCH_SIZE
+from json_stream import iter_json_records, JsonRecordWriter
+from nlp_models import get_segmenter, get_morph_tagger, get_morph_vocab
+from tagging_profiler import get_profiler, enable_profiling, collect_snapshots, preserved_profiler, TaggingProfiler
+
+# Версия логики тегирования: увеличивать при изменениях, влияющих на результат (сбрасывает кэш)
+TAGGER_VERSION = 1
 
 # --- ПУТИ К ФАЙЛАМ ---
 INPUT_COURSES = "courses.json"  # Файл с курсами
 INPUT_SKILL_TREE = "grade_system\\skill_tree.json"  # Дерево навыков
 OUTPUT_FILE = "tagged_courses.json"  # Результат
 
-# --- Инициализация Natasha ---
-segmenter = Segmenter()
-emb = NewsEmbedding()
-morph_tagger = NewsMorphTagger(emb)
-morph_vocab = MorphVocab()
-
 # --- Официальные направления подготовки (Приказ №1061 от 12.09.2013) ---
 OFFICIAL_DIRECTIONS = {
     "01.00.00": {
@@ -107,6 +112,159 @@ DIFFICULTY_LEVELS = {
 }
 
 
+class SkillIndex:
+    """
+    Инвертированный индекс навыков, собирается один раз при загрузке дерева
+
+    Все названия навыков, слова названий и ключевые слова компилируются в один автомат.
+    Для каждого шаблона автомата хранятся списки навыков (postings), которые он затрагивает,
+    поэтому при оценке курса просматриваются только навыки, хотя бы что-то нашедшие в тексте.
+    """
+
+    NAME_SCORE = 10  # Название навыка целиком есть в тексте
+    NAME_WORDS_SCORE = 5  # Найдено не меньше 60% слов названия
+    NAME_WORDS_RATIO = 0.6
+    KEYWORD_WORD_SCORE = 2  # Ключевое слово отдельным словом
+    KEYWORD_SUBSTRING_SCORE = 0.5  # Ключевое слово как подстрока
+
+    def __init__(self, flat_skills: List[Dict]):
+        self.matcher = KeywordAutomaton()
+        self.skills_count = len(flat_skills)
+
+        # {шаблон: [навыки]} - по названию, по словам названия и по ключевым словам
+        name_postings = defaultdict(list)
+        word_postings = defaultdict(list)
+        keyword_postings = defaultdict(list)
+        # Сколько слов должно найтись, чтобы засчитать бонус за слова названия
+        self.words_required: List[float] = []
+
+        for skill_id, skill in enumerate(flat_skills):
+            skill_name_lower = skill['name'].lower()
+            skill_words = skill_name_lower.split()
+
+            name_postings[self.matcher.add(skill_name_lower)].append(skill_id)
+
+            if len(skill_words) > 1:
+                # Короткие слова не засчитываются, но участвуют в знаменателе
+                for word in skill_words:
+                    if len(word) > 2:
+                        word_postings[self.matcher.add(word)].append(skill_id)
+                self.words_required.append(len(skill_words) * self.NAME_WORDS_RATIO)
+            else:
+                self.words_required.append(float('inf'))
+
+            for keyword in skill['keywords']:
+                if len(keyword) < 3:  # Игнорируем короткие слова
+                    continue
+                keyword_postings[self.matcher.add(keyword)].append(skill_id)
+
+        self.matcher.compile()
+
+        patterns_count = len(self.matcher)
+        self.name_postings = [tuple(name_postings.get(i, ())) for i in range(patterns_count)]
+        self.word_postings = [tuple(word_postings.get(i, ())) for i in range(patterns_count)]
+        self.keyword_postings = [tuple(keyword_postings.get(i, ())) for i in range(patterns_count)]
+
+    def score(self, text_lower: str) -> Dict[int, float]:
+        """Оценить навыки по тексту, возвращает {skill_id: score} только для ненулевых"""
+        hits = self.matcher.scan(text_lower)
+
+        # Только навыки, задетые найденными шаблонами: работа не зависит от размера дерева
+        scores: Dict[int, float] = {}
+        words_found: Dict[int, int] = {}
+        named = set()
+
+        for pattern_id, whole_word in hits.items():
+            named.update(self.name_postings[pattern_id])
+
+            for skill_id in self.word_postings[pattern_id]:
+                words_found[skill_id] = words_found.get(skill_id, 0) + 1
+
+            postings = self.keyword_postings[pattern_id]
+            if postings:
+                weight = self.KEYWORD_WORD_SCORE if whole_word else self.KEYWORD_SUBSTRING_SCORE
+                for skill_id in postings:
+                    scores[skill_id] = scores.get(skill_id, 0) + weight
+
+        for skill_id in named:
+            scores[skill_id] = scores.get(skill_id, 0) + self.NAME_SCORE
+
+        for skill_id, found in words_found.items():
+            if skill_id not in named and found >= self.words_required[skill_id]:
+                scores[skill_id] = scores.get(skill_id, 0) + self.NAME_WORDS_SCORE
+
+        return {skill_id: score for skill_id, score in scores.items() if score > 0}
+
+    def top_skills(self, text_lower: str, max_skills: int, min_score: float = 0) -> List[Tuple[int, float]]:
+        """
+        Топ навыков по релевантности через кучу вместо полной сортировки
+        При равном счёте порядок как в дереве навыков
+        """
+        scores = self.score(text_lower)
+        candidates = ((score, skill_id) for skill_id, score in scores.items() if score >= min_score)
+        top = heapq.nsmallest(max_skills, candidates, key=lambda item: (-item[0], item[1]))
+        return [(skill_id, score) for score, skill_id in top]
+
+
+class RuleTables:
+    """
+    Направления и уровни сложности, скомпилированные в один автомат
+    Оценки совпадают с calculate_relevance и подсчётом в determine_difficulty
+    """
+
+    def __init__(self, directions: Dict[str, Dict], difficulty_levels: Dict[str, List[str]]):
+        self.matcher = KeywordAutomaton()
+        # Ключевые слова направлений приводятся к нижнему регистру заранее, уровни сложности - как есть
+        self.directions = [
+            (code, [self.matcher.add(keyword.lower()) for keyword in data["keywords"]])
+            for code, data in directions.items()
+        ]
+        self.difficulty_levels = [
+            (level, [self.matcher.add(keyword) for keyword in keywords])
+            for level, keywords in difficulty_levels.items()
+        ]
+        self.matcher.compile()
+
+    def _scan(self, text_lower: str) -> Dict[int, bool]:
+        """{шаблон: есть ли вхождение, окружённое пробелами или краями текста}"""
+        hits: Dict[int, bool] = {}
+        text_len = len(text_lower)
+        patterns = self.matcher.patterns
+
+        for start, pattern_id in self.matcher.iter_matches(text_lower):
+            if hits.get(pattern_id):
+                continue
+            end = start + len(patterns[pattern_id])
+            hits[pattern_id] = (
+                    (start == 0 or text_lower[start - 1] == ' ') and
+                    (end == text_len or text_lower[end] == ' ')
+            )
+
+        # Пустая строка автоматом находится только в начале текста
+        empty_id = self.matcher.pattern_ids.get('')
+        if empty_id is not None:
+            hits[empty_id] = "  " in f" {text_lower} "
+        return hits
+
+    def direction_scores(self, text_lower: str) -> Dict[str, float]:
+        """Релевантность направлений: 3 за отдельное слово, 1 за подстроку"""
+        hits = self._scan(text_lower)
+        scores = {}
+        for code, keyword_ids in self.directions:
+            scores[code] = sum(
+                (3 if hits[keyword_id] else 1) for keyword_id in keyword_ids if keyword_id in hits
+            )
+        return scores
+
+    def difficulty_scores(self, text_lower: str) -> Dict[str, int]:
+        """Сколько ключевых слов каждого уровня встречается в тексте"""
+        found = self.matcher.find_all(text_lower)
+        return {
+            level: sum(1 for keyword_id in keyword_ids if keyword_id in found)
+            for level, keyword_ids in self.difficulty_levels
+        }
+
+
 class SkillTreeProcessor:
     """Обработка дерева навыков для поиска компетенций"""
 
@@ -114,7 +272,21 @@ class SkillTreeProcessor:
         with open(skill_tree_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         self.skill_tree = data.get('skills_tree', {})
-        self.flat_skills = self._flatten_tree()
+
+        compiled = self.compile()
+        self.flat_skills = compiled['flat_skills']
+        self.index = compiled['index']
+        self.rules = compiled['rules']
+        self._matchers = {}
+
+    def compile(self) -> Dict:
+        """Собрать все структуры тегировщика из словарей"""
+        flat_skills = self._flatten_tree()
+        return {
+            'flat_skills': flat_skills,
+            'index': SkillIndex(flat_skills),
+            'rules': RuleTables(OFFICIAL_DIRECTIONS, DIFFICULTY_LEVELS),
+        }
 
     def _flatten_tree(self) -> List[Dict]:
         """Преобразуем дерево в плоский список навыков с ключевыми словами"""
@@ -172,65 +344,50 @@ class SkillTreeProcessor:
         """Находим подходящие навыки из дерева на основе текста курса"""
         full_text = f"{title} {description}".lower()
 
-        skill_scores = []
+        # Фильтруем - берем только те, у которых score >= 3 (достаточно релевантные)
+        top = self.index.top_skills(full_text, max_skills, min_score=3)
 
-        for skill in self.flat_skills:
-            score = 0
-            matched_keywords = []
+        # Возвращаем топ навыков
+        return [self.flat_skills[skill_id] for skill_id, _ in top]
 
-            # Проверяем вхождение названия навыка в текст (более точная проверка)
-            skill_name_lower = skill['name'].lower()
-            skill_words = skill_name_lower.split()
+    def skill_matcher(self, scheme: str = 'tfidf'):
+        """Матричный TF-IDF/BM25 матчер навыков (нужны numpy и scipy), строится при первом обращении"""
+        if scheme not in self._matchers:
+            from skill_matrix import TfidfSkillMatcher
+            self._matchers[scheme] = TfidfSkillMatcher(self.flat_skills, scheme)
+        return self._matchers[scheme]
 
-            # Если название навыка полностью есть в тексте - большой бонус
-            if skill_name_lower in full_text:
-                score += 10
-                matched_keywords.append(skill_name_lower)
-            # Или если большинство слов из названия есть в тексте
-            elif len(skill_words) > 1:
-                words_found = sum(1 for word in skill_words if word in full_text and len(word) > 2)
-                if words_found >= len(skill_words) * 0.6:  # 60% слов найдено
-                    score += 5
-                    matched_keywords.extend(skill_words)
-
-            # Считаем релевантность на основе ключевых слов
-            for keyword in skill['keywords']:
-                if len(keyword) < 3:  # Игнорируем короткие слова
-                    continue
+    def match_catalog(self, texts: List[str], max_skills: int = 7, min_score: Optional[float] = None,
+                      scheme: str = 'tfidf') -> List[List[Dict]]:
+        """Навыки для всего списка курсов одним матричным проходом (min_score - порог схемы)"""
+        top = self.skill_matcher(scheme).top_skills(texts, max_skills, min_score)
+        return [[self.flat_skills[skill_id] for skill_id, _ in row] for row in top]
 
-                if keyword in full_text:
-                    # Точное совпадение слова
-                    if f" {keyword} " in f" {full_text} " or full_text.startswith(keyword) or full_text.endswith(
-                            keyword):
-                        score += 2
-                        matched_keywords.append(keyword)
-                    # Подстрока
-                    else:
-                        score += 0.5
-
-            if score > 0:
-                skill_scores.append({
-                    'skill': skill,
-                    'score': score,
-                    'matched_keywords': list(set(matched_keywords))
-                })
-
-        # Сортируем по релевантности
-        skill_scores.sort(key=lambda x: x['score'], reverse=True)
 
-        # Фильтруем - берем только те, у которых score >= 3 (достаточно релевантные)
-        filtered_skills = [item for item in skill_scores if item['score'] >= 3]
+class CourseTagGenerator:
+    def __init__(self, skill_tree_processor: SkillTreeProcessor, engine: str = 'index',
+                 min_score: Optional[float] = None):
+        """
+        engine - как искать компетенции: 'index' (ключевые слова, по курсу),
+        'tfidf' или 'bm25' (матричный проход по пачке курсов, см. generate_tags_batch)
+        """
+        self.skill_tree = skill_tree_processor
+        self.rules = skill_tree_processor.rules
+        self.engine = engine
+        self.min_score = min_score
 
-        # Возвращаем топ навыков
-        return [item['skill'] for item in filtered_skills[:max_skills]]
+    # Модели Natasha берутся из общего реестра и загружаются при первом обращении
+    @property
+    def segmenter(self):
+        return get_segmenter()
 
+    @property
+    def morph_tagger(self):
+        return get_morph_tagger()
 
-class CourseTagGenerator:
-    def __init__(self, skill_tree_processor: SkillTreeProcessor):
-        self.segmenter = segmenter
-        self.morph_tagger = morph_tagger
-        self.morph_vocab = morph_vocab
-        self.skill_tree = skill_tree_processor
+    @property
+    def morph_vocab(self):
+        return get_morph_vocab()
 
     def calculate_relevance(self, text: str, keywords: List[str]) -> float:
         """Вычисляем релевантность текста к набору ключевых слов"""
@@ -250,23 +407,28 @@ class CourseTagGenerator:
         """Определяем направление подготовки"""
         full_text = f"{title} {description}".lower()
 
-        direction_scores = {}
-
-        for code, data in OFFICIAL_DIRECTIONS.items():
-            score = self.calculate_relevance(full_text, data["keywords"])
-            if score > 0:
-                direction_scores[code] = score
+        direction_scores = {
+            code: score for code, score in self.rules.direction_scores(full_text).items() if score > 0
+        }
 
         if direction_scores:
             return max(direction_scores, key=direction_scores.get)
 
+        get_profiler().count('direction.fallback_default')
         return "44.00.00"
 
     def extract_competencies(self, title: str, description: str) -> List[str]:
         """Извлекаем компетенции ТОЛЬКО из дерева навыков"""
         # Ищем навыки в дереве
-        matching_skills = self.skill_tree.find_matching_skills(title, description, max_skills=7)
-
+        if self.engine == 'index':
+            matching_skills = self.skill_tree.find_matching_skills(title, description, max_skills=7)
+        else:
+            matching_skills = self.skill_tree.match_catalog(
+                [f"{title} {description}"], max_skills=7, min_score=self.min_score, scheme=self.engine
+            )[0]
+        return self._competencies(matching_skills)
+
+    def _competencies(self, matching_skills: List[Dict]) -> List[str]:
         # Формируем список компетенций ТОЛЬКО из найденных навыков
         competencies = []
         for skill in matching_skills:
@@ -276,31 +438,36 @@ class CourseTagGenerator:
 
         # Если не нашли НИЧЕГО - возвращаем пустой список
         # НЕ добавляем дефолтные компетенции
+        if not competencies:
+            get_profiler().count('competencies.empty')
         return competencies[:7]
 
     def determine_difficulty(self, title: str, description: str) -> str:
         """Определяем уровень сложности"""
         full_text = f"{title} {description}".lower()
 
-        scores = {}
-        for level, keywords in DIFFICULTY_LEVELS.items():
-            score = sum(1 for keyword in keywords if keyword in full_text)
-            scores[level] = score
+        scores = self.rules.difficulty_scores(full_text)
 
         if scores and max(scores.values()) > 0:
             return max(scores, key=scores.get)
 
+        get_profiler().count('difficulty.fallback_default')
         return "Начальный"
 
-    def generate_tags(self, course: Dict) -> Dict:
-        """Генерация всех тегов для курса"""
+    def generate_tags(self, course: Dict, competencies: Optional[List[str]] = None) -> Dict:
+        """Генерация всех тегов для курса (competencies - если уже найдены пакетно)"""
         title = course.get('name', '')
         description = course.get('description', '')
         url = course.get('url', '')
 
-        direction_code = self.determine_direction(title, description)
-        competencies = self.extract_competencies(title, description)
-        difficulty = self.determine_difficulty(title, description)
+        profiler = get_profiler()
+        with profiler.stage('determine_direction'):
+            direction_code = self.determine_direction(title, description)
+        if competencies is None:
+            with profiler.stage('extract_competencies'):
+                competencies = self.extract_competencies(title, description)
+        with profiler.stage('determine_difficulty'):
+            difficulty = self.determine_difficulty(title, description)
 
         return {
             "name": title,
@@ -317,44 +484,163 @@ class CourseTagGenerator:
         }
 
 
-def process_courses(courses_file: str, skill_tree_file: str, output_file: str):
-    """Обработка курсов и сохранение результата"""
-    print(f"📖 Загрузка дерева навыков из {skill_tree_file}...")
-    skill_processor = SkillTreeProcessor(skill_tree_file)
-    print(f"✅ Загружено навыков: {len(skill_processor.flat_skills)}\n")
+    def generate_tags_batch(self, courses: List[Dict]) -> List[Dict]:
+        """Теги для пачки курсов; для матричных движков компетенции всей пачки считаются одним проходом"""
+        if self.engine == 'index':
+            return [self.generate_tags(course) for course in courses]
 
-    print(f"📖 Загрузка курсов из {courses_file}...")
-    with open(courses_file, 'r', encoding='utf-8') as f:
-        courses = json.load(f)
+        with get_profiler().stage('match_catalog'):
+            texts = [f"{course.get('name', '')} {course.get('description', '')}" for course in courses]
+            matches = self.skill_tree.match_catalog(texts, max_skills=7, min_score=self.min_score, scheme=self.engine)
 
-    print(f"✅ Найдено курсов: {len(courses)}\n")
-    print("🤖 Начинаем тегирование...\n")
+        return [
+            self.generate_tags(course, self._competencies(matching_skills))
+            for course, matching_skills in zip(courses, matches)
+        ]
 
-    generator = CourseTagGenerator(skill_processor)
-    tagged_courses = []
-    courses_without_competencies = []
 
-    for i, course in enumerate(courses, 1):
-        if i <= 10 or i % 20 == 0:
-            print(f"[{i}/{len(courses)}] {course['name'][:50]}...")
-        tagged_course = generator.generate_tags(course)
-        tagged_courses.append(tagged_course)
+def dictionaries_fingerprint(skill_tree: Dict, engine: str = 'index', min_score: Optional[float] = None) -> str:
+    """Отпечаток всех словарей тегировщика (и движка поиска компетенций) для ключа кэша"""
+    if engine == 'index':
+        return fingerprint('tags', TAGGER_VERSION, OFFICIAL_DIRECTIONS, DIFFICULTY_LEVELS, skill_tree)
+    return fingerprint('tags', TAGGER_VERSION, OFFICIAL_DIRECTIONS, DIFFICULTY_LEVELS, skill_tree, engine, min_score)
 
-        # Считаем курсы без компетенций
-        if not tagged_course['tags']['competencies']:
-            courses_without_competencies.append(course['name'])
 
-    print(f"\n💾 Сохранение в {output_file}...")
+# --- Воркер параллельного тегирования ---
+_worker_generator = None
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(tagged_courses, f, ensure_ascii=False, indent=2)
 
-    print("✅ Готово!\n")
+def _init_tagging_worker(skill_tree_file: str, profile: bool = False, engine: str = 'index',
+                         min_score: Optional[float] = None):
+    """Один раз на процесс: загружаем дерево навыков и собираем словари"""
+    global _worker_generator
+    if profile:
+        enable_profiling()
+    processor = SkillTreeProcessor(skill_tree_file)
+    _worker_generator = CourseTagGenerator(processor, engine, min_score)
 
-    # Статистика
-    direction_counter = Counter(c['tags']['direction']['code'] for c in tagged_courses)
-    difficulty_counter = Counter(c['tags']['difficulty'] for c in tagged_courses)
 
+def _tag_course(course: Dict) -> Dict:
+    return _worker_generator.generate_tags(course)
+
+
+def _tag_course_profiled(course: Dict) -> Tuple[Dict, Dict]:
+    """Теги курса и снимок профилировщика воркера за этот курс"""
+    tagged_course = _tag_course(course)
+    return tagged_course, get_profiler().pop_snapshot()
+
+
+def _tag_courses(courses: List[Dict]) -> List[Dict]:
+    """Пачка курсов целиком (матричные движки считают её одним проходом)"""
+    return _worker_generator.generate_tags_batch(courses)
+
+
+def _tag_courses_profiled(courses: List[Dict]) -> Tuple[List[Dict], Dict]:
+    tagged_courses = _tag_courses(courses)
+    return tagged_courses, get_profiler().pop_snapshot()
+
+
+def process_courses(
+        courses_file: str,
+        skill_tree_file: str,
+        output_file: str,
+        workers: int = 1,
+        chunksize: int = DEFAULT_CHUNK_SIZE,
+        cache_file: Optional[str] = None,
+        stream: bool = False,
+        profile: bool = False,
+        engine: str = 'index',
+        min_score: Optional[float] = None
+) -> Optional[TaggingProfiler]:
+    """
+    Обработка курсов и сохранение результата
+    workers > 1 - тегирование в пуле процессов, порядок и результат как при последовательном запуске
+    cache_file - SQLite кэш: перетегируются только новые и изменённые курсы
+    stream - читать курсы потоково (JSON массив или .jsonl), не загружая каталог целиком
+    profile - замерять этапы и считать fallback'и; отчёт печатается со статистикой и возвращается
+    engine - поиск компетенций: 'index' (по ключевым словам) или 'tfidf'/'bm25' (матрицы по пачкам курсов),
+    min_score - порог релевантности матричного движка (по умолчанию - порог схемы)
+
+    Результаты пишутся в output_file по мере готовности (.jsonl - построчно),
+    статистика считается на лету, поэтому память не растёт с размером каталога
+    """
+    print(f"📖 Загрузка дерева навыков из {skill_tree_file}...")
+    skill_processor = SkillTreeProcessor(skill_tree_file)
+    print(f"✅ Загружено навыков: {len(skill_processor.flat_skills)}\n")
+
+    print(f"📖 Загрузка курсов из {courses_file}...")
+    if stream:
+        courses = iter_json_records(courses_file)
+        total = '?'
+        print("✅ Потоковый режим: курсы читаются по мере обработки\n")
+    else:
+        with open(courses_file, 'r', encoding='utf-8') as f:
+            courses = json.load(f)
+        total = len(courses)
+        print(f"✅ Найдено курсов: {total}\n")
+
+    print("🤖 Начинаем тегирование...\n")
+    if workers > 1:
+        print(f"⚙️  Параллельный режим: {workers} процессов, пачки по {chunksize} курсов\n")
+
+    cache = None
+    if cache_file:
+        cache = TagCache(cache_file, dictionaries_fingerprint(skill_processor.skill_tree, engine, min_score))
+        print(f"🗄️  Кэш тегов: {cache_file}\n")
+
+    print(f"💾 Результаты пишутся в {output_file} по мере готовности\n")
+
+    # Статистика на лету
+    direction_counter = Counter()
+    difficulty_counter = Counter()
+    without_competencies_count = 0
+    without_competencies_examples = []
+    examples = []
+
+    # Снимки профилировщиков воркеров сливаются в один отчёт
+    profiler = TaggingProfiler() if profile else None
+
+    batch_size = max(DEFAULT_BATCH_SIZE, workers * chunksize * 4)
+    worker_args = (skill_tree_file, profile, engine, min_score)
+    with preserved_profiler(), TaggingPool(workers, _init_tagging_worker, worker_args, chunksize) as pool, \
+            JsonRecordWriter(output_file) as writer:
+        if engine != 'index':
+            # Матричный движок: каждый воркер получает непрерывный кусок пачки и считает его целиком
+            def tag_many(batch):
+                if profiler is None:
+                    parts = pool.imap(_tag_courses, pool.split(batch), chunksize=1)
+                else:
+                    parts = collect_snapshots(pool.imap(_tag_courses_profiled, pool.split(batch), chunksize=1), profiler)
+                return chain.from_iterable(parts)
+        elif profiler is None:
+            tag_many = lambda batch: pool.imap(_tag_course, batch)
+        else:
+            tag_many = lambda batch: collect_snapshots(pool.imap(_tag_course_profiled, batch), profiler)
+        results = iter_tagged_with_cache(courses, cache, tag_many, batch_size)
+
+        for i, (course, tagged_course) in enumerate(results, 1):
+            if i <= 10 or i % 20 == 0:
+                print(f"[{i}/{total}] {course['name'][:50]}...")
+            writer.write(tagged_course)
+
+            direction_counter[tagged_course['tags']['direction']['code']] += 1
+            difficulty_counter[tagged_course['tags']['difficulty']] += 1
+
+            # Считаем курсы без компетенций
+            if not tagged_course['tags']['competencies']:
+                without_competencies_count += 1
+                if len(without_competencies_examples) < 5:
+                    without_competencies_examples.append(course['name'])
+            elif len(examples) < 5:
+                examples.append(tagged_course)
+
+    print("\n✅ Готово!\n")
+
+    if cache is not None:
+        print(f"🗄️  Кэш: {cache.summary()}\n")
+        cache.close()
+
+    # Статистика
     print("=" * 80)
     print("СТАТИСТИКА")
     print("=" * 80)
@@ -368,32 +654,52 @@ def process_courses(courses_file: str, skill_tree_file: str, output_file: str):
         print(f"  {difficulty}: {count}")
 
     # Курсы без компетенций
-    print(f"\n⚠️  Курсы без найденных компетенций: {len(courses_without_competencies)}")
-    if courses_without_competencies:
+    print(f"\n⚠️  Курсы без найденных компетенций: {without_competencies_count}")
+    if without_competencies_count:
         print("   (для этих курсов нужно расширить дерево навыков)")
-        for name in courses_without_competencies[:5]:
+        for name in without_competencies_examples:
             print(f"   • {name}")
-        if len(courses_without_competencies) > 5:
-            print(f"   ... и еще {len(courses_without_competencies) - 5}")
+        if without_competencies_count > 5:
+            print(f"   ... и еще {without_competencies_count - 5}")
 
     print("\n" + "=" * 80)
     print("ПРИМЕРЫ КОМПЕТЕНЦИЙ")
     print("=" * 80)
 
     # Показываем примеры с компетенциями
-    examples_shown = 0
-    for i, course in enumerate(tagged_courses):
-        if course['tags']['competencies']:
-            print(f"\n📚 {course['name']}")
-            print(f"   🎓 Направление: {course['tags']['direction']['code']} - {course['tags']['direction']['name']}")
-            print(f"   📊 Сложность: {course['tags']['difficulty']}")
-            print(f"   ✨ Компетенции:")
-            for comp in course['tags']['competencies']:
-                print(f"      • {comp}")
-            examples_shown += 1
-            if examples_shown >= 5:
-                break
+    for course in examples:
+        print(f"\n📚 {course['name']}")
+        print(f"   🎓 Направление: {course['tags']['direction']['code']} - {course['tags']['direction']['name']}")
+        print(f"   📊 Сложность: {course['tags']['difficulty']}")
+        print(f"   ✨ Компетенции:")
+        for comp in course['tags']['competencies']:
+            print(f"      • {comp}")
+
+    if profiler is not None:
+        print("\n" + "=" * 80)
+        print("ПРОФИЛЬ ТЕГИРОВАНИЯ")
+        print("=" * 80)
+        profiler.print_summary()
+
+    return profiler
 
 
 if __name__ == "__main__":
-    process_courses(INPUT_COURSES, INPUT_SKILL_TREE, OUTPUT_FILE)
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Тегирование курсов по дереву навыков")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Количество процессов для тегирования")
+    arg_parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE, help="Размер пачки курсов для воркера")
+    arg_parser.add_argument("--cache", default=None, help="Путь к SQLite кэшу тегов для инкрементального перетегирования")
+    arg_parser.add_argument("--stream", action="store_true", help="Читать курсы потоково (JSON массив или .jsonl)")
+    arg_parser.add_argument("--profile", action="store_true", help="Замерить этапы тегирования и fallback'и")
+    arg_parser.add_argument("--engine", choices=("index", "tfidf", "bm25"), default="index",
+                            help="Поиск компетенций: по ключевым словам или матричный TF-IDF/BM25 по пачкам")
+    arg_parser.add_argument("--min-score", type=float, default=None, help="Порог релевантности для tfidf/bm25")
+    arg_parser.add_argument("--input", default=INPUT_COURSES, help="Файл с курсами (.json или .jsonl)")
+    arg_parser.add_argument("--output", default=OUTPUT_FILE, help="Файл результата (.json или .jsonl)")
+    args = arg_parser.parse_args()
+
+    process_courses(args.input, INPUT_SKILL_TREE, args.output, workers=args.workers, chunksize=args.chunksize,
+                    cache_file=args.cache, stream=args.stream,
+                    profile=args.profile, engine=args.engine, min_score=args.min_score)
@@ -1,17 +1,24 @@
 # pip install natasha
 
-from natasha import Doc, Segmenter, NewsEmbedding, NewsMorphTagger, MorphVocab
 from collections import Counter, defaultdict
+import multiprocessing.util
 import re
 import json
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, Iterable, List, Set, Tuple, Optional
 from pathlib import Path
 
-# --- Инициализация Natasha ---
-segmenter = Segmenter()
-emb = NewsEmbedding()
-morph_tagger = NewsMorphTagger(emb)
-morph_vocab = MorphVocab()
+from keyword_matcher import KeywordAutomaton
+from nlp_models import (
+    get_segmenter, get_morph_tagger, get_morph_vocab, get_lemma_cache, configure_lemma_cache, lemmatize, warm_up
+)
+from lemma_cache import DEFAULT_LEMMA_CACHE_SIZE
+from tagging_profiler import get_profiler, enable_profiling, collect_snapshots, preserved_profiler, TaggingProfiler
+from parallel import TaggingPool, DEFAULT_CHUNK_SIZE
+from tag_cache import TagCache, fingerprint, iter_tagged_with_cache, DEFAULT_BATCH_SIZE
+from json_stream import iter_json_records, JsonRecordWriter
+
+# Версия логики тегирования: увеличивать при изменениях, влияющих на результат (сбрасывает кэш)
+TAGGER_VERSION = 1
 
 # --- Стоп-слова ---
 STOPWORDS = {
@@ -197,23 +204,281 @@ DIFFICULTY_INDICATORS = {
 }
 
 
+class DictionaryScorer:
+    """
+    Скоринг текста сразу по всем словарям за один проход
+
+    Даёт те же оценки, что и CourseTagGenerator.score_match: ключевое слово стоит 2, если совпадает
+    с токеном текста, и 1, если входит в одну из униграмм/биграмм/триграмм.
+    Вхождение в n-грамму (n <= 3) равносильно вхождению в строку слов через пробел
+    при не более чем двух пробелах в самом ключевом слове, поэтому подстроки ищутся одним автоматом.
+    """
+
+    MAX_PHRASE_SPACES = 2
+
+    def __init__(self, dictionaries: Dict[str, Dict[str, List[str]]]):
+        self.automaton = KeywordAutomaton()
+        # {словарь: [(запись, [id ключевых слов])]}
+        self.entries: Dict[str, List[Tuple[str, List[int]]]] = {}
+        # Ключевые слова, которые не могут войти в n-грамму (больше двух пробелов)
+        self.token_only: Set[int] = set()
+
+        for name, dictionary in dictionaries.items():
+            compiled = []
+            for entry, keywords in dictionary.items():
+                keyword_ids = []
+                for keyword in keywords:
+                    keyword_lower = keyword.lower()
+                    keyword_id = self.automaton.add(keyword_lower)
+                    if keyword_lower.count(' ') > self.MAX_PHRASE_SPACES:
+                        self.token_only.add(keyword_id)
+                    keyword_ids.append(keyword_id)
+                compiled.append((entry, keyword_ids))
+            self.entries[name] = compiled
+
+        self.automaton.compile()
+
+    def keyword_scores(self, text: str) -> List[int]:
+        """Оценка каждого ключевого слова (2 - токен, 1 - часть фразы, 0 - нет)"""
+        text_lower = text.lower()
+        tokens = set(text_lower.split())
+        words = re.findall(r'\w+', text_lower)
+
+        found = self.automaton.find_all(" ".join(words)) if words else set()
+
+        scores = []
+        for keyword_id, keyword in enumerate(self.automaton.patterns):
+            if keyword in tokens:
+                scores.append(2)
+            elif keyword_id in found and keyword_id not in self.token_only:
+                scores.append(1)
+            else:
+                scores.append(0)
+        return scores
+
+    def score_all(self, text: str) -> Dict[str, Dict[str, float]]:
+        """Оценки всех записей всех словарей: {словарь: {запись: оценка}}"""
+        keyword_scores = self.keyword_scores(text)
+        return {
+            name: {
+                entry: sum(keyword_scores[keyword_id] for keyword_id in keyword_ids)
+                for entry, keyword_ids in compiled
+            }
+            for name, compiled in self.entries.items()
+        }
+
+
+# Словари, которые оцениваются по полному тексту курса
+SCORED_DICTIONARIES = {
+    "areas": {area: data["keywords"] for area, data in AREAS.items()},
+    "areas_related": {area: data.get("related_words", []) for area, data in AREAS.items()},
+    "technologies": TECHNOLOGIES,
+    "domain_concepts": DOMAIN_CONCEPTS,
+    "categories": CATEGORIES,
+    "attributes": ATTRIBUTES,
+    "difficulty": DIFFICULTY,
+    "difficulty_indicators": DIFFICULTY_INDICATORS,
+}
+
+_dictionary_scorer: Optional[DictionaryScorer] = None
+
+
+def get_dictionary_scorer() -> DictionaryScorer:
+    """Скорер словарей, собирается один раз на процесс"""
+    global _dictionary_scorer
+    if _dictionary_scorer is None:
+        _dictionary_scorer = DictionaryScorer(SCORED_DICTIONARIES)
+    return _dictionary_scorer
+
+
+class AnalyzedText:
+    """Результат одного прохода Natasha по тексту: токены, леммы, части речи и позиции"""
+
+    def __init__(self, text: str, tokens: List[Tuple[str, str, Optional[str], int, int]]):
+        self.text = text
+        # (текст, лемма, часть_речи, начало, конец)
+        self.tokens = tokens
+
+    @property
+    def lemmas(self) -> List[str]:
+        return [lemma for _, lemma, _, _, _ in self.tokens]
+
+    @property
+    def pos_tags(self) -> List[Optional[str]]:
+        return [pos for _, _, pos, _, _ in self.tokens]
+
+    @property
+    def spans(self) -> List[Tuple[int, int]]:
+        return [(start, stop) for _, _, _, start, stop in self.tokens]
+
+
+class CourseDocument:
+    """
+    Разобранный курс, общий для всех шагов generate_tags
+    Название, описание и полный текст анализируются лениво и не больше одного раза
+    """
+
+    def __init__(self, title: str, description: str, analyzer, scorer: Optional[DictionaryScorer] = None):
+        self.title = title
+        self.description = description
+        self.full_text = f"{title} {description}"
+        self._analyzer = analyzer
+        self._analyses: Dict[str, AnalyzedText] = {}
+        self._scorer = scorer
+        self._scores: Optional[Dict[str, Dict[str, float]]] = None
+
+    def _analysis(self, section: str, text: str) -> AnalyzedText:
+        if section not in self._analyses:
+            self._analyses[section] = self._analyzer(text)
+        return self._analyses[section]
+
+    def preload(self, section: str, analysis: AnalyzedText):
+        """Подставить готовый разбор части курса (например, из пакетного analyze_texts)"""
+        self._analyses[section] = analysis
+
+    @property
+    def title_analysis(self) -> AnalyzedText:
+        return self._analysis('title', self.title)
+
+    @property
+    def description_analysis(self) -> AnalyzedText:
+        return self._analysis('description', self.description)
+
+    @property
+    def full_analysis(self) -> AnalyzedText:
+        return self._analysis('full', self.full_text)
+
+    @property
+    def scores(self) -> Dict[str, Dict[str, float]]:
+        """Оценки полного текста по всем словарям, считаются один раз"""
+        if self._scores is None:
+            scorer = self._scorer or get_dictionary_scorer()
+            self._scores = scorer.score_all(self.full_text)
+        return self._scores
+
+
+class TagDeduplicator:
+    """
+    Уже принятые теги для проверки кандидатов, решения те же, что у is_similar_or_contains
+    против каждого принятого тега, но без перебора всех пар:
+    - кандидат внутри принятого тега - один поиск по склеенной строке всех тегов;
+    - принятый тег внутри кандидата - поиск подстрок кандидата по длинам принятых тегов;
+    - пересечение слов - через индекс слово -> теги
+    """
+
+    _SEPARATOR = "\x00"
+
+    def __init__(self, tags: Iterable[str] = ()):
+        self._count = 0
+        self._joined = ""
+        self._by_length: Dict[int, Set[str]] = defaultdict(set)
+        self._word_index: Dict[str, List[int]] = defaultdict(list)
+        self._word_counts: List[int] = []
+        for tag in tags:
+            self.add(tag)
+
+    def add(self, tag: str):
+        tag_lower = tag.lower()
+        self._joined += self._SEPARATOR + tag_lower
+        self._by_length[len(tag_lower)].add(tag_lower)
+
+        words = set(tag_lower.split())
+        for word in words:
+            self._word_index[word].append(self._count)
+        self._word_counts.append(len(words))
+        self._count += 1
+
+    def is_duplicate(self, tag: str) -> bool:
+        """Похож ли тег на один из принятых или содержится в нём (и наоборот)"""
+        if not self._count:
+            return False
+        tag_lower = tag.lower()
+
+        if tag_lower in self._joined:
+            return True
+
+        for length, accepted in self._by_length.items():
+            if length <= len(tag_lower) and any(
+                    tag_lower[i:i + length] in accepted for i in range(len(tag_lower) - length + 1)
+            ):
+                return True
+
+        words = set(tag_lower.split())
+        if words:
+            intersections = Counter(index for word in words for index in self._word_index.get(word, ()))
+            for index, intersection in intersections.items():
+                if intersection / min(len(words), self._word_counts[index]) > 0.5:
+                    return True
+
+        return False
+
+    def add_if_new(self, tag: str) -> bool:
+        """Принять тег, если он не дублирует уже принятые"""
+        if self.is_duplicate(tag):
+            return False
+        self.add(tag)
+        return True
+
+
 class CourseTagGenerator:
-    def __init__(self):
-        self.segmenter = segmenter
-        self.morph_tagger = morph_tagger
-        self.morph_vocab = morph_vocab
+    # Модели Natasha берутся из общего реестра и загружаются при первом обращении
+    @property
+    def segmenter(self):
+        return get_segmenter()
+
+    @property
+    def morph_tagger(self):
+        return get_morph_tagger()
+
+    @property
+    def morph_vocab(self):
+        return get_morph_vocab()
+
+    def analyze_text(self, text: str) -> AnalyzedText:
+        """Сегментация, морфология и лемматизация текста за один проход"""
+        return self.analyze_texts([text])[0]
+
+    def analyze_texts(self, texts: List[str]) -> List[AnalyzedText]:
+        """Разбор нескольких текстов: предложения всех текстов проходят морфологический теггер одним батчем"""
+        from natasha import Doc
+        from natasha.doc import sent_words, inject_morph
+
+        profiler = get_profiler()
+        docs = [Doc(text) for text in texts]
+        with profiler.stage('natasha.segment'):
+            for doc in docs:
+                doc.segment(self.segmenter)
+        with profiler.stage('natasha.morph'):
+            sents = [sent for doc in docs for sent in doc.sents]
+            markups = self.morph_tagger.map([sent_words(sent) for sent in sents])
+            for sent, markup in zip(sents, markups):
+                inject_morph(sent.tokens, markup.tokens)
+
+        analyses = []
+        with profiler.stage('natasha.lemmatize'):
+            for text, doc in zip(texts, docs):
+                tokens = []
+                for token in doc.tokens:
+                    # Лемма берётся из общего LRU кэша: словарь курсов сильно повторяется
+                    token.lemma = lemmatize(token.text, token.pos, token.feats)
+                    tokens.append((token.text, token.lemma, token.pos, token.start, token.stop))
+                profiler.count('natasha.tokens', len(tokens))
+                analyses.append(AnalyzedText(text, tokens))
+
+        return analyses
+
+    def analyze_course(self, title: str, description: str) -> CourseDocument:
+        """Подготовить разбор курса для повторного использования во всех determine_*"""
+        return CourseDocument(title, description, self.analyze_text, get_dictionary_scorer())
 
     def analyze_tokens(self, text: str) -> List[Tuple[str, str]]:
         """Анализ токенов с определением части речи"""
-        doc = Doc(text)
-        doc.segment(self.segmenter)
-        doc.tag_morph(self.morph_tagger)
+        return self._tokens_info(self.analyze_text(text))
 
+    def _tokens_info(self, analysis: AnalyzedText) -> List[Tuple[str, str]]:
         tokens_info = []
-        for token in doc.tokens:
-            token.lemmatize(self.morph_vocab)
-            lemma = token.lemma.lower()
-            pos = token.pos
+        for _, lemma, pos, _, _ in analysis.tokens:
+            lemma = lemma.lower()
             if len(lemma) > 2 and lemma not in STOPWORDS and lemma.isalpha():
                 tokens_info.append((lemma, pos))
 
@@ -221,22 +486,18 @@ class CourseTagGenerator:
 
     def extract_meaningful_phrases(self, text: str) -> List[str]:
         """Извлекаем только ОСМЫСЛЕННЫЕ словосочетания"""
-        doc = Doc(text)
-        doc.segment(self.segmenter)
-        doc.tag_morph(self.morph_tagger)
-
-        for token in doc.tokens:
-            token.lemmatize(self.morph_vocab)
+        return self._meaningful_phrases(self.analyze_text(text))
 
+    def _meaningful_phrases(self, analysis: AnalyzedText) -> List[str]:
         phrases = []
-        tokens = [t for t in doc.tokens if len(t.lemma) > 2 and t.lemma.lower() not in STOPWORDS]
+        tokens = [
+            (lemma.lower(), pos) for _, lemma, pos, _, _ in analysis.tokens
+            if len(lemma) > 2 and lemma.lower() not in STOPWORDS
+        ]
 
         for i in range(len(tokens) - 1):
-            current = tokens[i]
-            next_token = tokens[i + 1]
-
-            current_lemma = current.lemma.lower()
-            next_lemma = next_token.lemma.lower()
+            current_lemma, current_pos = tokens[i]
+            next_lemma, next_pos = tokens[i + 1]
 
             if current_lemma in GENERIC_ADJECTIVES:
                 continue
@@ -244,12 +505,12 @@ class CourseTagGenerator:
             if current_lemma in PROCESS_WORDS:
                 continue
 
-            if current.pos == 'NOUN' and next_token.pos == 'NOUN':
+            if current_pos == 'NOUN' and next_pos == 'NOUN':
                 if next_lemma not in PROCESS_WORDS and next_lemma not in GENERIC_ADJECTIVES:
                     phrase = f"{current_lemma} {next_lemma}"
                     phrases.append(phrase)
 
-            elif current.pos == 'ADJ' and next_token.pos == 'NOUN':
+            elif current_pos == 'ADJ' and next_pos == 'NOUN':
                 if next_lemma not in PROCESS_WORDS:
                     phrase = f"{current_lemma} {next_lemma}"
                     phrases.append(phrase)
@@ -258,7 +519,10 @@ class CourseTagGenerator:
 
     def normalize_text(self, text: str) -> List[str]:
         """Нормализация текста: только существительные и значимые термины"""
-        tokens_info = self.analyze_tokens(text)
+        return self._normalized_terms(self.analyze_text(text))
+
+    def _normalized_terms(self, analysis: AnalyzedText) -> List[str]:
+        tokens_info = self._tokens_info(analysis)
 
         normalized = []
         for lemma, pos in tokens_info:
@@ -319,21 +583,28 @@ class CourseTagGenerator:
 
         return False
 
-    def determine_area(self, title: str, description: str) -> str:
+    def determine_area(self, title: str, description: str, document: Optional[CourseDocument] = None) -> str:
         """Определяем основную область курса"""
-        full_text = f"{title} {description}"
+        document = document or self.analyze_course(title, description)
+        full_text = document.full_text
+        area_scores = document.scores["areas"]
+        related_scores = document.scores["areas_related"]
 
         scores = {}
         for area, data in AREAS.items():
-            match_score = self.score_match(full_text, data["keywords"])
-            related_score = self.score_match(full_text, data.get("related_words", []))
+            match_score = area_scores[area]
+            related_score = related_scores[area]
             scores[area] = (match_score + related_score * 0.5) * data["priority"]
 
         if scores and max(scores.values()) > 0:
             return max(scores, key=scores.get)
 
-        for tech, keywords in TECHNOLOGIES.items():
-            if self.score_match(full_text, keywords) > 0:
+        # Fallback: область по найденной технологии
+        profiler = get_profiler()
+        profiler.count('area.fallback_technology')
+        tech_scores = document.scores["technologies"]
+        for tech in TECHNOLOGIES:
+            if tech_scores[tech] > 0:
                 if tech in ["python", "java", "javascript", "c++"]:
                     return "программирование"
                 elif tech in ["tensorflow", "pytorch"]:
@@ -347,37 +618,43 @@ class CourseTagGenerator:
 
         tech_indicators = ["программ", "код", "разработ", "техн", "it"]
         if any(ind in full_text.lower() for ind in tech_indicators):
+            profiler.count('area.fallback_indicators')
             return "программирование"
 
+        profiler.count('area.fallback_default')
         return "общее обучение"
 
-    def determine_thematic_tags(self, title: str, description: str, area: str) -> List[str]:
+    def determine_thematic_tags(self, title: str, description: str, area: str,
+                                document: Optional[CourseDocument] = None) -> List[str]:
         """Определяем тематические теги: технологии + предметные концепции"""
-        full_text = f"{title} {description}"
+        document = document or self.analyze_course(title, description)
 
         tags = []
         excluded_tags = [area] if area else []
+        excluded = TagDeduplicator(excluded_tags)
 
         # 1. Ищем технологии
         tech_scores = {}
-        for tech, keywords in TECHNOLOGIES.items():
-            score = self.score_match(full_text, keywords)
+        for tech, score in document.scores["technologies"].items():
             if score > 0:
                 tech_scores[tech] = score
 
         if tech_scores:
             sorted_techs = sorted(tech_scores.items(), key=lambda x: x[1], reverse=True)
             for tech, _ in sorted_techs:
-                if not any(self.is_similar_or_contains(tech, ex) for ex in excluded_tags):
+                if not excluded.is_duplicate(tech):
                     tags.append(tech)
                 if len(tags) >= 2:
                     break
 
+        # Дальше кандидаты сверяются и с уже выбранными тегами
+        for tag in tags:
+            excluded.add(tag)
+
         # 2. Ищем предметные концепции
         if len(tags) < 3:
             concept_scores = {}
-            for concept, keywords in DOMAIN_CONCEPTS.items():
-                score = self.score_match(full_text, keywords)
+            for concept, score in document.scores["domain_concepts"].items():
                 if score > 0:
                     concept_scores[concept] = score
 
@@ -386,22 +663,26 @@ class CourseTagGenerator:
                 for concept, _ in sorted_concepts:
                     if len(tags) >= 3:
                         break
-                    if not any(self.is_similar_or_contains(concept, ex) for ex in excluded_tags + tags):
+                    if excluded.add_if_new(concept):
                         tags.append(concept)
 
+        profiler = get_profiler()
+
         # 3. Извлекаем осмысленные словосочетания
         if len(tags) < 3:
-            noun_phrases = self.extract_meaningful_phrases(full_text)
+            profiler.count('thematic.fallback_phrases')
+            noun_phrases = self._meaningful_phrases(document.full_analysis)
 
             for phrase in noun_phrases:
                 if len(tags) >= 3:
                     break
-                if not any(self.is_similar_or_contains(phrase, ex) for ex in excluded_tags + tags):
+                if excluded.add_if_new(phrase):
                     tags.append(phrase)
 
         # 4. Последний fallback: существительные
         if len(tags) < 1:
-            normalized = self.normalize_text(full_text)
+            profiler.count('thematic.fallback_nouns')
+            normalized = self._normalized_terms(document.full_analysis)
 
             if area and area in AREAS:
                 area_words = set()
@@ -412,14 +693,15 @@ class CourseTagGenerator:
             if normalized:
                 counter = Counter(normalized)
                 for word, _ in counter.most_common(3):
-                    if not any(self.is_similar_or_contains(word, ex) for ex in excluded_tags + tags):
+                    if excluded.add_if_new(word):
                         tags.append(word)
                     if len(tags) >= 3:
                         break
 
         # Финальный fallback
         if not tags:
-            title_words = self.normalize_text(title)
+            profiler.count('thematic.fallback_title')
+            title_words = self._normalized_terms(document.title_analysis)
             if title_words:
                 tags = [title_words[0]]
             else:
@@ -427,79 +709,85 @@ class CourseTagGenerator:
 
         return tags[:3]
 
-    def determine_categories(self, title: str, description: str, area: str, thematic_tags: List[str]) -> List[str]:
+    def determine_categories(self, title: str, description: str, area: str, thematic_tags: List[str],
+                             document: Optional[CourseDocument] = None) -> List[str]:
         """Определяем категории с умными fallback'ами"""
-        full_text = f"{title} {description}"
+        document = document or self.analyze_course(title, description)
 
-        excluded = [area] + thematic_tags
+        excluded = TagDeduplicator([area] + thematic_tags)
 
-        scores = {}
-        for category, keywords in CATEGORIES.items():
-            scores[category] = self.score_match(full_text, keywords)
+        scores = dict(document.scores["categories"])
 
         sorted_categories = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         categories = []
 
         # Берём категории с положительным скором
         for cat, score in sorted_categories:
-            if score > 0 and not any(self.is_similar_or_contains(cat, ex) for ex in excluded + categories):
+            if score > 0 and excluded.add_if_new(cat):
                 categories.append(cat)
             if len(categories) >= 3:
                 break
 
+        profiler = get_profiler()
+
         # Fallback 1: ищем предметные концепции
         if not categories:
-            for concept, keywords in DOMAIN_CONCEPTS.items():
-                if self.score_match(full_text, keywords) > 0:
-                    if not any(self.is_similar_or_contains(concept, ex) for ex in excluded + categories):
+            profiler.count('categories.fallback_concepts')
+            for concept, score in document.scores["domain_concepts"].items():
+                if score > 0:
+                    if excluded.add_if_new(concept):
                         categories.append(concept)
                     if len(categories) >= 3:
                         break
 
         # Fallback 2: используем дефолтные категории для области
         if not categories and area in AREAS:
+            profiler.count('categories.fallback_area_defaults')
             default_cats = AREAS[area].get("default_categories", [])
             for cat in default_cats:
-                if not any(self.is_similar_or_contains(cat, ex) for ex in excluded + categories):
+                if excluded.add_if_new(cat):
                     categories.append(cat)
                 if len(categories) >= 3:
                     break
 
         # Fallback 3: извлекаем осмысленные словосочетания из описания
         if not categories:
-            noun_phrases = self.extract_meaningful_phrases(description)
+            profiler.count('categories.fallback_phrases')
+            noun_phrases = self._meaningful_phrases(document.description_analysis)
             for phrase in noun_phrases:
-                if not any(self.is_similar_or_contains(phrase, ex) for ex in excluded + categories):
+                if excluded.add_if_new(phrase):
                     categories.append(phrase)
                 if len(categories) >= 1:
                     break
 
         # Fallback 4: берём самые частые существительные
         if not categories:
-            normalized = self.normalize_text(description)
+            profiler.count('categories.fallback_nouns')
+            normalized = self._normalized_terms(document.description_analysis)
             if normalized:
                 counter = Counter(normalized)
                 for word, _ in counter.most_common(3):
-                    if not any(self.is_similar_or_contains(word, ex) for ex in excluded + categories):
+                    if excluded.add_if_new(word):
                         categories.append(word)
                     if len(categories) >= 1:
                         break
 
         # Последний fallback: используем thematic_tags как категории
         if not categories and thematic_tags:
+            profiler.count('categories.fallback_thematic')
             categories = [thematic_tags[0]]
 
         return categories[:3]
 
-    def determine_attributes(self, title: str, description: str) -> List[str]:
+    def determine_attributes(self, title: str, description: str, document: Optional[CourseDocument] = None) -> List[str]:
         """Определяем атрибуты курса"""
-        full_text = f"{title} {description}"
+        document = document or self.analyze_course(title, description)
+        full_text = document.full_text
 
         attrs = []
         scores = {}
 
-        for attr, keywords in ATTRIBUTES.items():
-            score = self.score_match(full_text, keywords)
+        for attr, score in document.scores["attributes"].items():
             if score > 0:
                 scores[attr] = score
 
@@ -507,6 +795,7 @@ class CourseTagGenerator:
             attrs = [attr for attr, _ in sorted(scores.items(), key=lambda x: x[1], reverse=True)]
 
         if not attrs:
+            get_profiler().count('attributes.fallback_heuristic')
             practice_words = ["делать", "создать", "разработать", "проект", "применить", "реализовать", "упражнение",
                               "задание", "задача"]
             if any(word in full_text.lower() for word in practice_words):
@@ -521,21 +810,20 @@ class CourseTagGenerator:
 
         return attrs
 
-    def determine_difficulty(self, title: str, description: str) -> str:
+    def determine_difficulty(self, title: str, description: str, document: Optional[CourseDocument] = None) -> str:
         """Определяем уровень сложности"""
-        full_text = f"{title} {description}"
+        document = document or self.analyze_course(title, description)
+        full_text = document.full_text
 
-        scores = {}
-        for level, keywords in DIFFICULTY.items():
-            scores[level] = self.score_match(full_text, keywords)
+        scores = dict(document.scores["difficulty"])
 
-        for level, indicators in DIFFICULTY_INDICATORS.items():
-            indicator_score = self.score_match(full_text, indicators)
+        for level, indicator_score in document.scores["difficulty_indicators"].items():
             scores[level] = scores.get(level, 0) + indicator_score * 0.5
 
         if scores and max(scores.values()) > 0:
             return max(scores, key=scores.get)
 
+        get_profiler().count('difficulty.fallback_heuristic')
         full_lower = full_text.lower()
 
         if any(word in full_lower for word in ["начин", "основ", "введение", "базов", "первый"]):
@@ -546,13 +834,22 @@ class CourseTagGenerator:
 
         return "средний"
 
-    def generate_tags(self, title: str, description: str) -> Dict:
+    def generate_tags(self, title: str, description: str, document: Optional[CourseDocument] = None) -> Dict:
         """Главная функция: генерация всех тегов с дедупликацией"""
-        area = self.determine_area(title, description)
-        thematic_tags = self.determine_thematic_tags(title, description, area)
-        categories = self.determine_categories(title, description, area, thematic_tags)
-        attributes = self.determine_attributes(title, description)
-        difficulty = self.determine_difficulty(title, description)
+        # Natasha разбирает каждую часть курса не больше одного раза на все шаги
+        document = document or self.analyze_course(title, description)
+        profiler = get_profiler()
+
+        with profiler.stage('determine_area'):
+            area = self.determine_area(title, description, document)
+        with profiler.stage('determine_thematic_tags'):
+            thematic_tags = self.determine_thematic_tags(title, description, area, document)
+        with profiler.stage('determine_categories'):
+            categories = self.determine_categories(title, description, area, thematic_tags, document)
+        with profiler.stage('determine_attributes'):
+            attributes = self.determine_attributes(title, description, document)
+        with profiler.stage('determine_difficulty'):
+            difficulty = self.determine_difficulty(title, description, document)
 
         return {
             "area": area,
@@ -562,76 +859,180 @@ class CourseTagGenerator:
             "difficulty": difficulty
         }
 
-
-def tag_courses_from_json(input_file: str, output_file: str):
+    def generate_tags_batch(self, courses: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Теги для нескольких курсов (title, description) в исходном порядке
+        Полные тексты курсов (нужны почти всегда) размечаются одним проходом морфологического теггера
+        """
+        documents = [self.analyze_course(title, description) for title, description in courses]
+        for document, analysis in zip(documents, self.analyze_texts([d.full_text for d in documents])):
+            document.preload('full', analysis)
+
+        return [
+            self.generate_tags(title, description, document)
+            for (title, description), document in zip(courses, documents)
+        ]
+
+
+def dictionaries_fingerprint() -> str:
+    """Отпечаток всех словарей тегировщика для ключа кэша"""
+    return fingerprint(
+        'tags_to_json', TAGGER_VERSION, STOPWORDS, PROCESS_WORDS, GENERIC_ADJECTIVES, AREAS, TECHNOLOGIES,
+        DOMAIN_CONCEPTS, CATEGORIES, ATTRIBUTES, DIFFICULTY, DIFFICULTY_INDICATORS
+    )
+
+
+# --- Воркер параллельного тегирования ---
+_worker_generator = None
+
+
+def _init_tagging_worker(
+        lemma_cache_file: Optional[str] = None,
+        lemma_cache_size: int = DEFAULT_LEMMA_CACHE_SIZE,
+        profile: bool = False
+):
+    """Один раз на процесс: загружаем модели Natasha, словари, кэш лемм и создаём генератор"""
+    global _worker_generator
+    if profile:
+        enable_profiling()
+    warm_up()
+    get_dictionary_scorer()
+
+    if lemma_cache_file or lemma_cache_size != DEFAULT_LEMMA_CACHE_SIZE:
+        lemma_cache = configure_lemma_cache(lemma_cache_size, lemma_cache_file)
+        if lemma_cache_file:
+            # Воркер дописывает выученные леммы в файл при штатном завершении пула
+            multiprocessing.util.Finalize(lemma_cache, lemma_cache.save, exitpriority=10)
+
+    _worker_generator = CourseTagGenerator()
+
+
+def _tag_course(course: Dict) -> Dict:
+    return _worker_generator.generate_tags(course.get('name', ''), course.get('description', ''))
+
+
+def _tag_course_batch(courses: List[Dict]) -> List[Dict]:
+    return _worker_generator.generate_tags_batch(
+        [(course.get('name', ''), course.get('description', '')) for course in courses]
+    )
+
+
+def _tag_course_profiled(course: Dict) -> Tuple[Dict, Dict]:
+    """Теги курса и снимок профилировщика воркера за этот курс"""
+    tags = _tag_course(course)
+    return tags, get_profiler().pop_snapshot()
+
+
+def tag_courses_from_json(
+        input_file: str,
+        output_file: str,
+        workers: int = 1,
+        chunksize: int = DEFAULT_CHUNK_SIZE,
+        cache_file: Optional[str] = None,
+        stream: bool = False,
+        lemma_cache_file: Optional[str] = None,
+        lemma_cache_size: int = DEFAULT_LEMMA_CACHE_SIZE,
+        profile: bool = False
+) -> Optional[TaggingProfiler]:
     """
     Читает курсы из JSON файла, тегирует их и сохраняет результат
 
     Args:
         input_file: путь к входному JSON файлу с курсами
-        output_file: путь к выходному JSON файлу с тегами
+        output_file: путь к выходному JSON файлу с тегами (.jsonl - по курсу на строку)
+        workers: количество процессов (1 - последовательно в текущем процессе)
+        chunksize: сколько курсов отдаётся воркеру за раз
+        cache_file: путь к SQLite кэшу, перетегируются только новые и изменённые курсы
+        stream: читать курсы потоково ({"courses": [...]}, массив или .jsonl), не загружая файл целиком
+        lemma_cache_file: путь к SQLite файлу с леммами, общими между запусками
+        lemma_cache_size: максимальное число лемм в LRU кэше каждого процесса
+        profile: замерять этапы тегирования и считать fallback'и; отчёт печатается со статистикой и возвращается
+
+    Каждый курс записывается в output_file сразу после тегирования, статистика считается на лету
     """
     print(f"Загрузка курсов из {input_file}...")
 
     # Читаем входной файл
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if stream:
+        courses = iter_json_records(input_file, array_key='courses')
+        total = '?'
+        print("Потоковый режим: курсы читаются по мере обработки")
+    else:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        courses = data.get('courses', [])
+        total = len(courses)
+        print(f"Найдено курсов: {total}")
+
+    # Инициализируем генератор тегов (в каждом воркере, либо здесь же при workers=1)
+    print("Инициализация генератора тегов...")
+    if workers > 1:
+        print(f"Параллельный режим: {workers} процессов, пачки по {chunksize} курсов")
 
-    courses = data.get('courses', [])
-    print(f"Найдено курсов: {len(courses)}")
+    cache = None
+    if cache_file:
+        cache = TagCache(cache_file, dictionaries_fingerprint())
+        print(f"Кэш тегов: {cache_file}")
 
-    # Инициализируем генератор тегов
-    print("Инициализация генератора тегов...")
-    generator = CourseTagGenerator()
-
-    # Тегируем каждый курс
-    tagged_courses = []
-    for i, course in enumerate(courses, 1):
-        course_id = course.get('id')
-        name = course.get('name', '')
-        description = course.get('description', '')
-
-        print(f"\rОбработка курса {i}/{len(courses)}: {name[:50]}...", end='')
-
-        # Генерируем теги
-        tags = generator.generate_tags(name, description)
-
-        # Добавляем теги к курсу
-        tagged_course = {
-            'id': course_id,
-            'name': name,
-            'description': description,
-            'tags': tags
-        }
+    # Статистика и примеры считаются на лету
+    area_counter = Counter()
+    difficulty_counter = Counter()
+    examples = []
 
-        tagged_courses.append(tagged_course)
+    # Тегируем каждый курс и сразу пишем результат
+    batch_size = max(DEFAULT_BATCH_SIZE, workers * chunksize * 4)
+    # Снимки профилировщиков воркеров сливаются в один отчёт
+    profiler = TaggingProfiler() if profile else None
 
-    print("\n\nСохранение результатов...")
+    worker_args = (lemma_cache_file, lemma_cache_size, profile)
+    with preserved_profiler(), TaggingPool(workers, _init_tagging_worker, worker_args, chunksize) as pool, \
+            JsonRecordWriter(output_file, array_key='courses') as writer:
+        if profiler is None:
+            tag_many = lambda batch: pool.imap(_tag_course, batch)
+        else:
+            tag_many = lambda batch: collect_snapshots(pool.imap(_tag_course_profiled, batch), profiler)
+        results = iter_tagged_with_cache(courses, cache, tag_many, batch_size)
 
-    # Сохраняем результат
-    output_data = {
-        'courses': tagged_courses,
-        'total_courses': len(tagged_courses)
-    }
+        for i, (course, tags) in enumerate(results, 1):
+            name = course.get('name', '')
+
+            print(f"\rОбработка курса {i}/{total}: {name[:50]}...", end='')
+
+            # Добавляем теги к курсу
+            tagged_course = {
+                'id': course.get('id'),
+                'name': name,
+                'description': course.get('description', ''),
+                'tags': tags
+            }
+
+            writer.write(tagged_course)
+
+            area_counter[tags['area']] += 1
+            difficulty_counter[tags['difficulty']] += 1
+            if len(examples) < 5:
+                examples.append(tagged_course)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+        writer.close(footer={'total_courses': writer.count})
 
-    print(f"✅ Готово! Результаты сохранены в {output_file}")
+    print(f"\n\n✅ Готово! Результаты сохранены в {output_file}")
+
+    if cache is not None:
+        print(f"Кэш: {cache.summary()}")
+        cache.close()
+
+    # В параллельном режиме у каждого воркера свой кэш лемм, они сохраняются при завершении воркеров
+    if workers <= 1:
+        lemma_cache = get_lemma_cache()
+        lemma_cache.save()
+        print(f"Кэш лемм: {lemma_cache.summary()}")
 
     # Выводим статистику
     print("\n" + "=" * 60)
     print("СТАТИСТИКА:")
     print("=" * 60)
 
-    # Подсчитываем частоту областей
-    area_counter = Counter()
-    difficulty_counter = Counter()
-
-    for course in tagged_courses:
-        area_counter[course['tags']['area']] += 1
-        difficulty_counter[course['tags']['difficulty']] += 1
-
     print("\nРаспределение по областям:")
     for area, count in area_counter.most_common():
         print(f"  {area}: {count} курсов")
@@ -645,18 +1046,41 @@ def tag_courses_from_json(input_file: str, output_file: str):
     print("ПРИМЕРЫ ТЕГИРОВАНИЯ (первые 5 курсов):")
     print("=" * 60)
 
-    for course in tagged_courses[:5]:
+    for course in examples:
         print(f"\n📚 {course['name']}")
         print(f"   Описание: {course['description'][:80]}...")
         print(f"   Теги:")
         for key, value in course['tags'].items():
             print(f"     {key}: {value}")
 
+    if profiler is not None:
+        print("\n" + "=" * 60)
+        print("ПРОФИЛЬ ТЕГИРОВАНИЯ:")
+        print("=" * 60)
+        profiler.print_summary()
+
+    return profiler
+
 
 if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Тегирование курсов из JSON файла")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Количество процессов для тегирования")
+    arg_parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE, help="Размер пачки курсов для воркера")
+    arg_parser.add_argument("--cache", default=None, help="Путь к SQLite кэшу тегов для инкрементального перетегирования")
+    arg_parser.add_argument("--lemma-cache", default=None, help="Путь к SQLite файлу кэша лемм между запусками")
+    arg_parser.add_argument("--lemma-cache-size", type=int, default=DEFAULT_LEMMA_CACHE_SIZE,
+                            help="Максимальный размер LRU кэша лемм")
+    arg_parser.add_argument("--profile", action="store_true", help="Замерить этапы тегирования и fallback'и")
+    arg_parser.add_argument("--stream", action="store_true", help="Читать курсы потоково (JSON или .jsonl)")
     # Пути к файлам
-    input_file = "courses.json"
-    output_file = "courses_tagged.json"
+    arg_parser.add_argument("--input", default="courses.json", help="Файл с курсами (.json или .jsonl)")
+    arg_parser.add_argument("--output", default="courses_tagged.json", help="Файл результата (.json или .jsonl)")
+    args = arg_parser.parse_args()
 
     # Запускаем тегирование
-    tag_courses_from_json(input_file, output_file)
\ No newline at end of file
+    tag_courses_from_json(args.input, args.output, workers=args.workers, chunksize=args.chunksize,
+                          cache_file=args.cache, stream=args.stream,
+                          lemma_cache_file=args.lemma_cache, lemma_cache_size=args.lemma_cache_size,
+                          profile=args.profile)
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Тесты EmbeddingStore: статистика IDF при обновлении и удалении курсов, рост ёмкости,
+заголовок meta.json, хэши текстов курсов и перенос статистики из формата версии 1,
+видимость изменений для второго экземпляра хранилища над тем же каталогом
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import numpy as np
+
+import course_embeddings
+from course_embeddings import EmbeddingStore
+
+DIM = 8
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+class EmbeddingStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = EmbeddingStore(self.tmp.name, dim=DIM)
+
+    def test_document_frequency_follows_updates(self):
+        self.store.upsert(1, unit(1), ['python', 'данные'])
+        self.store.upsert(2, unit(0, 1), ['python'])
+        self.assertEqual(self.store.idf_stats(), (2, {'python': 2, 'данные': 1}))
+
+        # Повторная запись курса заменяет его леммы, а не добавляет
+        self.store.upsert(1, unit(1), ['java', 'java'])
+        self.assertEqual(self.store.idf_stats(), (2, {'python': 1, 'java': 1}))
+
+        self.store.remove(2)
+        self.store.remove(2)
+        self.assertEqual(self.store.idf_stats(), (1, {'java': 1}))
+        self.assertNotIn(2, self.store)
+
+    def test_most_similar_and_growth(self):
+        original_capacity = course_embeddings.INITIAL_CAPACITY
+        course_embeddings.INITIAL_CAPACITY = 2
+        self.addCleanup(setattr, course_embeddings, 'INITIAL_CAPACITY', original_capacity)
+        store = EmbeddingStore(tempfile.mkdtemp(dir=self.tmp.name), dim=DIM)
+
+        store.upsert(1, unit(1, 0))
+        store.upsert(2, unit(1, 1))
+        store.upsert(3, unit(0, 1))
+        store.upsert(4, unit(-1, 0))
+        self.assertEqual([course_id for course_id, _ in store.most_similar(1, 10)], [2, 3, 4])
+        self.assertEqual(store.most_similar(1, 1)[0][0], 2)
+        self.assertEqual(store.most_similar(99), [])
+
+        # Освободившаяся строка используется повторно
+        store.remove(2)
+        store.upsert(5, unit(1, 0.1))
+        self.assertEqual(store.most_similar(1, 1)[0][0], 5)
+
+    def test_meta_is_header_only(self):
+        self.store.upsert(1, unit(1), ['python', 'данные'])
+        self.store.upsert(2, unit(0, 1), ['python'])
+        with open(os.path.join(self.tmp.name, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.assertEqual(meta, {'version': course_embeddings.STORE_VERSION, 'size': 2, 'dim': DIM, 'documents': 2})
+        # Частоты можно запросить только для нужных лемм
+        self.assertEqual(self.store.idf_stats(['python', 'java']), (2, {'python': 2}))
+        self.assertEqual(self.store.idf_stats([]), (2, {}))
+
+    def test_migrates_version_1_meta(self):
+        self.store.upsert(1, unit(1), ['python'])
+        self.store.upsert(2, unit(0, 1), ['python'])
+        # Формат версии 1: статистика и леммы курсов в meta.json, базы SQLite ещё нет
+        directory = tempfile.mkdtemp(dir=self.tmp.name)
+        for name in ('vectors.npy', 'ids.npy'):
+            shutil.copy(os.path.join(self.tmp.name, name), directory)
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'size': 2, 'dim': DIM, 'documents': 2, 'document_frequency': {'python': 2},
+                       'course_lemmas': {'1': ['python'], '2': ['python']}}, f)
+
+        store = EmbeddingStore(directory, dim=DIM)
+        self.assertEqual(store.idf_stats(), (2, {'python': 2}))
+        self.assertEqual([course_id for course_id, _ in store.most_similar(1)], [2])
+        store.remove(2)
+        self.assertEqual(EmbeddingStore(directory, dim=DIM).idf_stats(), (1, {'python': 1}))
+
+    def test_content_hashes(self):
+        self.store.upsert(1, unit(1), ['python'], 'a')
+        self.store.upsert(2, unit(0, 1), ['python'], 'b')
+        self.store.upsert(1, unit(1), ['java'], 'c')
+        self.store.remove(2)
+        self.assertEqual(self.store.content_hashes(), {1: 'c'})
+
+        # Полная пересборка заменяет хэши целиком
+        embedder = unittest.mock.Mock()
+        embedder.vector.return_value = unit(1)
+        self.store.rebuild([(3, ['python']), (4, ['java'])], embedder, {3: 'd'})
+        self.assertEqual(self.store.content_hashes(), {3: 'd', 4: ''})
+
+    def test_second_instance_sees_changes(self):
+        other = EmbeddingStore(self.tmp.name, dim=DIM)
+        self.store.upsert(1, unit(1), ['python'])
+        other.upsert(2, unit(1, 1), ['python'])
+
+        self.assertIn(1, other)
+        self.assertEqual([course_id for course_id, _ in self.store.most_similar(1)], [2])
+        self.assertEqual(self.store.idf_stats(), (2, {'python': 2}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Тесты потоковой записи и чтения: JsonRecordWriter пишет побайтово то же, что json.dump(..., indent=2),
+iter_json_records читает обратно те же записи
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from json_stream import JsonRecordWriter, iter_json_records
+
+RECORDS = [
+    {'title': 'Python для анализа данных', 'skills': ['python', 'pandas'], 'score': 1.5},
+    {'title': 'Пустые поля', 'skills': [], 'meta': {}, 'nested': {'a': [1, {'b': None}]}},
+    {'title': 'Кавычки "и" \\ слэши\nперенос', 'flag': True},
+]
+
+
+class JsonRecordWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, path: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write_records(self, path: str, records, array_key=None, footer=None):
+        with JsonRecordWriter(path, array_key=array_key) as writer:
+            for record in records:
+                writer.write(record)
+            writer.close(footer)
+        return writer
+
+    def test_array_matches_json_dump(self):
+        for records in (RECORDS, RECORDS[:1], []):
+            path = self.path('out.json')
+            self.write_records(path, records)
+            self.assertEqual(self.read(path), json.dumps(records, ensure_ascii=False, indent=2))
+            self.assertEqual(list(iter_json_records(path)), records)
+
+    def test_object_with_footer_matches_json_dump(self):
+        footer = {'statistics': {'total': len(RECORDS), 'top': [['python', 2]]}, 'version': 2}
+        for records in (RECORDS, []):
+            path = self.path('out.json')
+            writer = self.write_records(path, records, array_key='courses', footer=footer)
+            expected = json.dumps({'courses': records, **footer}, ensure_ascii=False, indent=2)
+            self.assertEqual(self.read(path), expected)
+            self.assertEqual(writer.count, len(records))
+            self.assertEqual(list(iter_json_records(path, array_key='courses')), records)
+
+    def test_jsonl(self):
+        path = self.path('out.jsonl')
+        self.write_records(path, RECORDS, array_key='courses', footer={'ignored': True})
+        self.assertEqual(self.read(path), ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in RECORDS))
+        self.assertEqual(list(iter_json_records(path)), RECORDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
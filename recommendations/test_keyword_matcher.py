@@ -0,0 +1,57 @@
+"""
+Тесты KeywordAutomaton.scan: результат совпадает с прежней проверкой каждого ключевого слова
+по отдельности (подстрока в тексте + вхождение отдельным словом / в начале / в конце текста)
+"""
+
+import random
+import unittest
+
+from keyword_matcher import KeywordAutomaton
+
+
+def baseline_scan(patterns, text):
+    """Прежняя логика find_matching_skills: {шаблон: найден ли отдельным словом} для найденных шаблонов"""
+    hits = {}
+    for pattern in patterns:
+        if pattern in text:
+            hits[pattern] = (f" {pattern} " in f" {text} " or text.startswith(pattern) or text.endswith(pattern))
+    return hits
+
+
+class KeywordAutomatonTest(unittest.TestCase):
+    def assert_same_as_baseline(self, patterns, text):
+        automaton = KeywordAutomaton(patterns)
+        hits = {automaton.patterns[i]: whole_word for i, whole_word in automaton.scan(text).items()}
+        self.assertEqual(hits, baseline_scan(set(patterns), text), (patterns, text))
+
+    def test_examples(self):
+        patterns = ['python', 'java', 'javascript', 'sql', 'анализ данных', 'данн', 'машинное обучение']
+        self.assert_same_as_baseline(patterns, 'курс python и javascript: анализ данных')
+        self.assert_same_as_baseline(patterns, 'sql')
+        self.assert_same_as_baseline(patterns, 'nosql и mysql')
+        self.assert_same_as_baseline(patterns, 'javascript')
+        self.assert_same_as_baseline(patterns, '')
+
+    def test_random_texts(self):
+        # Маленький алфавит даёт много перекрывающихся вхождений и совпадений на границах
+        rnd = random.Random(0)
+        alphabet = 'ab '
+        for _ in range(2000):
+            patterns = [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 4)))
+                        for _ in range(rnd.randint(1, 8))]
+            text = ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+            self.assert_same_as_baseline(patterns, text)
+
+    def test_find_all_and_duplicates(self):
+        automaton = KeywordAutomaton(['he', 'she', 'his', 'hers', 'he'])
+        self.assertEqual(len(automaton), 4)
+        self.assertEqual({automaton.patterns[i] for i in automaton.find_all('ushers')}, {'he', 'she', 'hers'})
+
+    def test_add_after_compile(self):
+        automaton = KeywordAutomaton(['abc'])
+        pattern_id = automaton.add('bc')
+        self.assertEqual(automaton.scan('xabc'), {0: True, pattern_id: True})
+
+
+if __name__ == '__main__':
+    unittest.main()
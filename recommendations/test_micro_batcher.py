@@ -0,0 +1,78 @@
+"""
+Тесты MicroBatcher: результаты по своим запросам, ошибки и неверное число результатов у обработчика, таймаут
+"""
+
+import threading
+import unittest
+
+from micro_batcher import MicroBatcher
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def test_results_in_order(self):
+        batches = []
+
+        def handler(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait=0.05)
+        futures = [batcher.submit(i) for i in range(10)]
+        self.assertEqual([future.result(5) for future in futures], [i * 2 for i in range(10)])
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertLess(len(batches), 10)
+
+    def test_handler_error_affects_only_its_item(self):
+        def handler(items):
+            if 3 in items:
+                raise ValueError(items)
+            return items
+
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait=0.05)
+        futures = [batcher.submit(i) for i in range(6)]
+        for i, future in enumerate(futures):
+            if i == 3:
+                self.assertRaises(ValueError, future.result, 5)
+            else:
+                self.assertEqual(future.result(5), i)
+
+    def test_wrong_result_count(self):
+        # Обработчик теряет последний результат пачки: ни один запрос не должен повиснуть
+        def handler(items):
+            return [item for item in items if item != 2]
+
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait=0.05)
+        futures = [batcher.submit(i) for i in range(5)]
+        for i, future in enumerate(futures):
+            if i == 2:
+                self.assertRaises(RuntimeError, future.result, 5)
+            else:
+                self.assertEqual(future.result(5), i)
+
+        self.assertRaises(RuntimeError, MicroBatcher(lambda items: items * 2).process, 1, 5)
+
+    def test_timeout(self):
+        started, release = threading.Event(), threading.Event()
+        seen = []
+
+        def handler(items):
+            seen.extend(items)
+            started.set()
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(handler, max_wait=0)
+        busy = batcher.submit('busy')
+        started.wait(5)
+        with self.assertRaises(TimeoutError):
+            batcher.process('late', timeout=0.05)
+        release.set()
+        self.assertEqual(busy.result(5), 'busy')
+
+        # Снятый по таймауту запрос в обработчик не попадает
+        self.assertEqual(batcher.process('next', timeout=5), 'next')
+        self.assertEqual(seen, ['busy', 'next'])
+
+
+if __name__ == '__main__':
+    unittest.main()
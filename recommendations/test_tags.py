@@ -0,0 +1,87 @@
+"""
+Тесты SkillIndex: оценки навыков совпадают с прежним перебором всех навыков дерева
+в SkillTreeProcessor.find_matching_skills
+"""
+
+import json
+import os
+import random
+import unittest
+
+from tags import SkillTreeProcessor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SKILL_TREE_FILE = os.path.join(HERE, 'grade_system', 'skill_tree.json')
+COURSES_FILE = os.path.join(HERE, 'courses.json')
+
+
+def baseline_scores(flat_skills, full_text):
+    """Прежняя оценка навыков: {номер навыка: счёт} для ненулевых"""
+    scores = {}
+    for skill_id, skill in enumerate(flat_skills):
+        score = 0
+        skill_name_lower = skill['name'].lower()
+        skill_words = skill_name_lower.split()
+
+        if skill_name_lower in full_text:
+            score += 10
+        elif len(skill_words) > 1:
+            words_found = sum(1 for word in skill_words if word in full_text and len(word) > 2)
+            if words_found >= len(skill_words) * 0.6:
+                score += 5
+
+        for keyword in skill['keywords']:
+            if len(keyword) < 3:
+                continue
+            if keyword in full_text:
+                if f" {keyword} " in f" {full_text} " or full_text.startswith(keyword) or full_text.endswith(keyword):
+                    score += 2
+                else:
+                    score += 0.5
+
+        if score > 0:
+            scores[skill_id] = score
+    return scores
+
+
+def baseline_matching_skills(flat_skills, full_text, max_skills=7):
+    scores = baseline_scores(flat_skills, full_text)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [flat_skills[skill_id] for skill_id, score in ranked if score >= 3][:max_skills]
+
+
+class SkillIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = SkillTreeProcessor(SKILL_TREE_FILE)
+        with open(COURSES_FILE, 'r', encoding='utf-8') as f:
+            courses = json.load(f)
+        cls.texts = [f"{course.get('name', '')} {course.get('description', '')}".lower() for course in courses]
+
+        # Случайные тексты из слов названий и ключевых слов: много частичных совпадений названий
+        rnd = random.Random(0)
+        vocabulary = sorted({word for skill in cls.processor.flat_skills
+                             for word in skill['name'].lower().split() + skill['keywords']})
+        vocabulary += ['и', 'курс', 'xpython', 'данныхх']
+        cls.texts += [' '.join(rnd.choice(vocabulary) for _ in range(rnd.randint(0, 12))) for _ in range(300)]
+        cls.texts += ['', 'python', ' python ', 'pythonic']
+
+    def test_scores_match_baseline(self):
+        flat_skills = self.processor.flat_skills
+        for text in self.texts:
+            self.assertEqual(self.processor.index.score(text), baseline_scores(flat_skills, text), text)
+
+    def test_find_matching_skills_matches_baseline(self):
+        flat_skills = self.processor.flat_skills
+        for text in self.texts:
+            for max_skills in (1, 7, 100):
+                self.assertEqual(
+                    [skill['code'] for skill in self.processor.find_matching_skills(text, '', max_skills)],
+                    # find_matching_skills склеивает название и описание через пробел
+                    [skill['code'] for skill in baseline_matching_skills(flat_skills, f"{text} ", max_skills)],
+                    text
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Тесты tags_to_json против прежних реализаций:
+разбор текста (AnalyzedText/CourseDocument) - против отдельного прохода Natasha на каждый вызов,
+DictionaryScorer - против score_match по каждому словарю,
+TagDeduplicator - против попарного is_similar_or_contains
+"""
+
+import json
+import os
+import random
+import unittest
+from typing import Optional
+
+from natasha import Doc
+
+from tags_to_json import (CourseDocument, CourseTagGenerator, DictionaryScorer, GENERIC_ADJECTIVES, PROCESS_WORDS,
+                          SCORED_DICTIONARIES, STOPWORDS, TECHNOLOGIES, TagDeduplicator)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COURSES_FILE = os.path.join(HERE, 'courses.json')
+
+
+def load_courses(limit: Optional[int] = 30):
+    with open(COURSES_FILE, 'r', encoding='utf-8') as f:
+        return [(course.get('name', ''), course.get('description', '')) for course in json.load(f)[:limit]]
+
+
+def baseline_tokens(generator: CourseTagGenerator, text: str):
+    """Прежний analyze_tokens: свой Doc и лемматизация через morph_vocab"""
+    doc = Doc(text)
+    doc.segment(generator.segmenter)
+    doc.tag_morph(generator.morph_tagger)
+    tokens = []
+    for token in doc.tokens:
+        token.lemmatize(generator.morph_vocab)
+        tokens.append((token.lemma.lower(), token.pos))
+    return tokens
+
+
+def baseline_analyze_tokens(generator, text):
+    return [(lemma, pos) for lemma, pos in baseline_tokens(generator, text)
+            if len(lemma) > 2 and lemma not in STOPWORDS and lemma.isalpha()]
+
+
+def baseline_meaningful_phrases(generator, text):
+    tokens = [(lemma, pos) for lemma, pos in baseline_tokens(generator, text)
+              if len(lemma) > 2 and lemma not in STOPWORDS]
+    phrases = []
+    for (current_lemma, current_pos), (next_lemma, next_pos) in zip(tokens, tokens[1:]):
+        if current_lemma in GENERIC_ADJECTIVES or current_lemma in PROCESS_WORDS:
+            continue
+        if current_pos == 'NOUN' and next_pos == 'NOUN':
+            if next_lemma not in PROCESS_WORDS and next_lemma not in GENERIC_ADJECTIVES:
+                phrases.append(f"{current_lemma} {next_lemma}")
+        elif current_pos == 'ADJ' and next_pos == 'NOUN':
+            if next_lemma not in PROCESS_WORDS:
+                phrases.append(f"{current_lemma} {next_lemma}")
+    return phrases
+
+
+def baseline_normalize_text(generator, text):
+    return [lemma for lemma, pos in baseline_analyze_tokens(generator, text)
+            if lemma not in PROCESS_WORDS and lemma not in GENERIC_ADJECTIVES
+            and (pos in ['NOUN', 'PROPN'] or any(lemma in techs for techs in TECHNOLOGIES.values()))]
+
+
+class CourseDocumentTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = CourseTagGenerator()
+        cls.courses = load_courses()
+
+    def test_text_analysis_matches_baseline(self):
+        for title, description in self.courses:
+            for text in (title, description, f"{title} {description}"):
+                self.assertEqual(self.generator.analyze_tokens(text), baseline_analyze_tokens(self.generator, text))
+                self.assertEqual(self.generator.extract_meaningful_phrases(text),
+                                 baseline_meaningful_phrases(self.generator, text))
+                self.assertEqual(self.generator.normalize_text(text), baseline_normalize_text(self.generator, text))
+
+    def test_batch_analysis_matches_single(self):
+        texts = [f"{title} {description}" for title, description in self.courses] + ['']
+        for batch, text in zip(self.generator.analyze_texts(texts), texts):
+            single = self.generator.analyze_text(text)
+            self.assertEqual(batch.tokens, single.tokens)
+            self.assertEqual(batch.lemmas, [lemma for _, lemma, _, _, _ in single.tokens])
+            self.assertEqual([text[start:stop] for start, stop in batch.spans], [t for t, _, _, _, _ in batch.tokens])
+
+        self.assertEqual(self.generator.generate_tags_batch(self.courses),
+                         [self.generator.generate_tags(title, description) for title, description in self.courses])
+
+    def test_each_section_analyzed_once(self):
+        calls = []
+
+        def analyzer(text):
+            calls.append(text)
+            return self.generator.analyze_text(text)
+
+        title, description = self.courses[0]
+        document = CourseDocument(title, description, analyzer)
+        self.generator.generate_tags(title, description, document)
+        for _ in range(2):
+            document.title_analysis, document.description_analysis, document.full_analysis
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertLessEqual(len(calls), 3)
+
+
+class DictionaryScorerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = CourseTagGenerator()
+        cls.scorer = DictionaryScorer(SCORED_DICTIONARIES)
+
+        texts = [f"{title} {description}" for title, description in load_courses(limit=None)]
+        # Случайные тексты из ключевых слов словарей (в том числе фраз) и их кусков
+        rnd = random.Random(0)
+        keywords = sorted({keyword for dictionary in SCORED_DICTIONARIES.values()
+                           for words in dictionary.values() for keyword in words})
+        pieces = keywords + [keyword[:len(keyword) // 2] for keyword in keywords] + ['и', '-', ',', 'C++']
+        texts += [' '.join(rnd.choice(pieces) for _ in range(rnd.randint(0, 15))) for _ in range(300)]
+        cls.texts = texts + ['', 'Python', 'PYTHON, Django!', 'анализ   данных']
+
+    def test_score_all_matches_score_match(self):
+        for text in self.texts:
+            scores = self.scorer.score_all(text)
+            for name, dictionary in SCORED_DICTIONARIES.items():
+                for entry, keywords in dictionary.items():
+                    self.assertEqual(scores[name][entry], self.generator.score_match(text, keywords), (text, name, entry))
+
+    def test_long_phrase_only_as_token(self):
+        # Ключевое слово с тремя пробелами не помещается в триграмму
+        scorer = DictionaryScorer({'d': {'entry': ['a b c d']}})
+        self.assertEqual(scorer.score_all('x a b c d y'), {'d': {'entry': 0}})
+        self.assertEqual(scorer.score_all('x a b c d y')['d']['entry'],
+                         self.generator.score_match('x a b c d y', ['a b c d']))
+
+
+class TagDeduplicatorTest(unittest.TestCase):
+    def setUp(self):
+        self.generator = CourseTagGenerator()
+
+    def baseline_is_duplicate(self, accepted, tag):
+        return any(self.generator.is_similar_or_contains(tag, existing) for existing in accepted)
+
+    def test_matches_pairwise_checks(self):
+        rnd = random.Random(0)
+        words = ['анализ', 'данных', 'данн', 'python', 'py', 'Python', 'веб', 'веб-разработка', 'a', 'b', 'ab', '']
+        for _ in range(2000):
+            accepted = []
+            deduplicator = TagDeduplicator()
+            for _ in range(rnd.randint(1, 8)):
+                tag = ' '.join(rnd.choice(words) for _ in range(rnd.randint(1, 3)))
+                expected = self.baseline_is_duplicate(accepted, tag)
+                self.assertEqual(deduplicator.is_duplicate(tag), expected, (accepted, tag))
+                self.assertEqual(deduplicator.add_if_new(tag), not expected)
+                if not expected:
+                    accepted.append(tag)
+
+    def test_initial_tags(self):
+        deduplicator = TagDeduplicator(['Машинное обучение'])
+        self.assertTrue(deduplicator.is_duplicate('обучение'))
+        self.assertTrue(deduplicator.is_duplicate('машинное обучение нейросетей'))
+        self.assertFalse(deduplicator.is_duplicate('анализ данных'))
+        self.assertFalse(TagDeduplicator().is_duplicate('анализ данных'))
+
+
+if __name__ == '__main__':
+    unittest.main()